@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+
+from app.core.auth import verify_app_key
+from app.services.reverse.utils.breaker import breaker_snapshot, reset_breakers
+from app.services.reverse.utils.limiter import get_upstream_limiter
+from app.services.reverse.utils.proxy_pool import get_proxy_pool
+
+router = APIRouter()
+
+
+@router.get("/breakers", dependencies=[Depends(verify_app_key)])
+async def get_breakers():
+    """获取熔断器状态"""
+    return {"breakers": breaker_snapshot()}
+
+
+@router.post("/breakers/reset", dependencies=[Depends(verify_app_key)])
+async def reset_breaker(data: dict = None):
+    """重置熔断器（name 为空时重置全部）"""
+    name = str((data or {}).get("name") or "").strip() or None
+    count = reset_breakers(name)
+    return {"status": "success", "reset": count}
+
+
+@router.get("/proxies", dependencies=[Depends(verify_app_key)])
+async def get_proxies():
+    """获取代理池健康状态"""
+    return get_proxy_pool().snapshot()
+
+
+@router.get("/ratelimits", dependencies=[Depends(verify_app_key)])
+async def get_ratelimits():
+    """获取上游限速器学习到的限速状态"""
+    limiter = get_upstream_limiter()
+    await limiter.sync(force=True)
+    return limiter.snapshot()
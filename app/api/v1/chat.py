@@ -57,6 +57,9 @@ class ChatCompletionRequest(BaseModel):
     temperature: Optional[float] = Field(0.8, description="采样温度: 0-2")
     top_p: Optional[float] = Field(0.95, description="nucleus 采样: 0-1")
     n: Optional[int] = Field(None, ge=1, le=10, description="通用生成数量（视频可作为并发回退）")
+    stream_coalesce_ms: Optional[int] = Field(
+        None, ge=0, le=1000, description="流式内容合并窗口（毫秒），0 为逐 token 输出"
+    )
     # 视频生成配置
     video_config: Optional[VideoConfig] = Field(None, description="视频生成参数")
     # 图片生成配置
@@ -781,6 +784,7 @@ async def chat_completions(request: ChatCompletionRequest):
             reasoning_effort=request.reasoning_effort,
             temperature=request.temperature,
             top_p=request.top_p,
+            stream_coalesce_ms=request.stream_coalesce_ms,
         )
 
     if isinstance(result, dict):
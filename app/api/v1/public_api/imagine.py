@@ -216,9 +216,11 @@ def _normalize_imagine_ratio(value: Optional[str]) -> str:
     return mapped if mapped in _RATIO_ALLOWED else "2:3"
 
 
-def _parse_sse_chunk(chunk: str) -> Optional[Dict[str, Any]]:
+def _parse_sse_chunk(chunk: str | bytes) -> Optional[Dict[str, Any]]:
     if not chunk:
         return None
+    if isinstance(chunk, (bytes, bytearray)):
+        chunk = chunk.decode("utf-8", errors="ignore")
     event = None
     data_lines: List[str] = []
     for raw in str(chunk).splitlines():
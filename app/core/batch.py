@@ -2,6 +2,7 @@
 Batch utilities.
 
 - run_batch: generic batch concurrency runner
+- run_adaptive: sliding-window runner with rate limit and AIMD concurrency
 - BatchTask: SSE task manager for admin batch operations
 """
 
@@ -11,6 +12,7 @@ import uuid
 from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
 
 from app.core.logger import logger
+from app.core.ratelimit import AIMDConcurrency, TokenBucket
 
 T = TypeVar("T")
 
@@ -81,6 +83,94 @@ async def run_batch(
     return results
 
 
+async def run_adaptive(
+    items: List[Any],
+    worker: Callable[[Any], Awaitable[T]],
+    *,
+    concurrency: AIMDConcurrency,
+    bucket: Optional[TokenBucket] = None,
+    is_congested: Optional[Callable[[Any, Optional[Exception]], bool]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    滑动窗口并发执行：限速 + AIMD 自适应并发，单项失败不影响整体
+
+    与 run_batch 不同，任一项完成即补位，不等待整批结束。
+
+    Args:
+        items: 待处理项列表
+        worker: 异步处理函数
+        concurrency: 自适应并发窗口
+        bucket: 令牌桶（可选，限制启动速率）
+        is_congested: (data, error) -> 是否为拥塞信号（触发并发减半）
+        on_progress: (done, total) 进度回调
+
+    Returns:
+        与 items 顺序一致的 [{"ok": bool, "data": ..., "error": ...}]
+    """
+    total = len(items)
+    results: List[Dict[str, Any]] = [
+        {"ok": False, "error": "cancelled", "cancelled": True} for _ in items
+    ]
+    pending: set = set()
+    done = 0
+
+    async def _one(idx: int, item: Any):
+        nonlocal done
+        data = None
+        error: Optional[Exception] = None
+        try:
+            data = await worker(item)
+            results[idx] = {"ok": True, "data": data}
+        except Exception as e:
+            error = e
+            logger.warning(f"Adaptive item failed: {str(item)[:16]}... - {e}")
+            results[idx] = {"ok": False, "error": str(e)}
+        finally:
+            await concurrency.release()
+
+        congested = False
+        if is_congested:
+            try:
+                congested = is_congested(data, error)
+            except Exception:
+                congested = False
+        if congested:
+            if concurrency.on_congestion():
+                logger.info(
+                    f"Adaptive runner: congestion, concurrency -> {concurrency.limit}"
+                )
+        elif error is None:
+            concurrency.on_success()
+
+        done += 1
+        if on_progress:
+            try:
+                on_progress(done, total)
+            except Exception:
+                pass
+
+    try:
+        for idx, item in enumerate(items):
+            if should_cancel and should_cancel():
+                break
+            await concurrency.acquire()
+            if bucket:
+                await bucket.acquire()
+            t = asyncio.create_task(_one(idx, item))
+            pending.add(t)
+            t.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+    except asyncio.CancelledError:
+        for t in pending:
+            t.cancel()
+        raise
+
+    return results
+
+
 class BatchTask:
     def __init__(self, total: int):
         self.id = uuid.uuid4().hex
@@ -225,6 +315,7 @@ async def expire_task(task_id: str, delay: int = 300) -> None:
 
 __all__ = [
     "run_batch",
+    "run_adaptive",
     "BatchTask",
     "create_task",
     "get_task",
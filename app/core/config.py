@@ -199,6 +199,13 @@ class Config:
         self._defaults = {}
         self._code_defaults = {}
         self._defaults_loaded = False
+        # 配置版本号，每次加载 / 更新后递增，供派生缓存失效
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """配置版本号"""
+        return self._version
 
     def register_defaults(self, defaults: Dict[str, Any]):
         """注册代码中定义的默认值"""
@@ -267,6 +274,8 @@ class Config:
         except Exception as e:
             logger.error(f"Error loading config: {e}")
             self._config = {}
+        finally:
+            self._version += 1
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -296,6 +305,7 @@ class Config:
             merged = _deep_merge(base, new_config or {})
             await storage.save_config(merged)
             self._config = merged
+            self._version += 1
 
 
 # 全局配置实例
@@ -0,0 +1,155 @@
+"""
+请求级截止时间（Deadline）
+
+每个客户端请求携带一个截止时间（来自请求头或 app.request_timeout），
+Token 重试循环、retry_on_status、上传下载与流空闲检测都以剩余时间收紧
+各自的超时，客户端预算耗尽时尽早放弃，避免继续消耗上游额度。
+
+请求头（秒）：X-Request-Timeout。OpenAI SDK 自动发送的 X-Stainless-Timeout 是 httpx 的
+单次读写超时而非总时长，不作为截止时间。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.core.config import get_config
+from app.core.exceptions import DeadlineExceededError
+
+TIMEOUT_HEADER = b"x-request-timeout"
+# 需要截止时间的路径前缀（管理接口触发的后台任务不受客户端超时约束）
+DEADLINE_PATH_PREFIX = "/v1/"
+EXCLUDED_PATH_PREFIXES = ("/v1/admin", "/v1/files")
+
+
+class Deadline:
+    """截止时间"""
+
+    __slots__ = ("expires_at", "timeout")
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+_deadline_var: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """当前请求的截止时间（未设置时为 None）"""
+    return _deadline_var.get()
+
+
+def remaining_time() -> Optional[float]:
+    """剩余秒数（未设置截止时间时为 None）"""
+    deadline = _deadline_var.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def check_deadline(stage: str = ""):
+    """
+    检查截止时间
+
+    Raises:
+        DeadlineExceededError: 截止时间已过
+    """
+    deadline = _deadline_var.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceededError(deadline.timeout, stage)
+
+
+def clamp_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    以剩余时间收紧超时（timeout <= 0 或 None 视为不限）
+
+    Raises:
+        DeadlineExceededError: 截止时间已过
+    """
+    deadline = _deadline_var.get()
+    if deadline is None:
+        return timeout
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceededError(deadline.timeout)
+    if timeout is None or float(timeout) <= 0:
+        return remaining
+    return min(float(timeout), remaining)
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    设置截止时间（timeout <= 0 或 None 时不设置；嵌套时取更早者）
+    """
+    outer = _deadline_var.get()
+    if timeout is None or timeout <= 0:
+        yield outer
+        return
+    deadline = Deadline(float(timeout))
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        yield outer
+        return
+    reset_token = _deadline_var.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline_var.reset(reset_token)
+
+
+def _header_timeout(headers) -> Optional[float]:
+    for name, value in headers:
+        if name.lower() == TIMEOUT_HEADER:
+            try:
+                timeout = float(value.decode("latin-1").strip())
+            except ValueError:
+                continue
+            if timeout > 0:
+                return timeout
+    return None
+
+
+def request_timeout(headers) -> Optional[float]:
+    """请求头与配置中的超时，取更小者"""
+    try:
+        configured = float(get_config("app.request_timeout", 0) or 0)
+    except (TypeError, ValueError):
+        configured = 0.0
+    requested = _header_timeout(headers)
+    values = [v for v in (configured, requested) if v and v > 0]
+    return min(values) if values else None
+
+
+class DeadlineMiddleware:
+    """为 API 请求设置截止时间（纯 ASGI，流式响应同样受约束）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        if not path.startswith(DEADLINE_PATH_PREFIX) or path.startswith(
+            EXCLUDED_PATH_PREFIXES
+        ):
+            await self.app(scope, receive, send)
+            return
+        with deadline_scope(request_timeout(scope.get("headers") or [])):
+            await self.app(scope, receive, send)
+
+
+__all__ = [
+    "Deadline",
+    "DeadlineMiddleware",
+    "current_deadline",
+    "remaining_time",
+    "check_deadline",
+    "clamp_timeout",
+    "deadline_scope",
+]
@@ -114,6 +114,21 @@ class StreamIdleTimeoutError(Exception):
         super().__init__(f"Stream idle timeout after {idle_seconds}s")
 
 
+class DeadlineExceededError(UpstreamException):
+    """请求截止时间已过（客户端预算耗尽，放弃后续上游请求）"""
+
+    def __init__(self, timeout: float, stage: str = ""):
+        self.timeout = timeout
+        self.stage = stage
+        super().__init__(
+            message=f"Request deadline exceeded ({timeout:g}s)"
+            + (f" during {stage}" if stage else ""),
+            details={"status": 504, "error_code": "deadline_exceeded"},
+            status_code=504,
+        )
+        self.code = "deadline_exceeded"
+
+
 # ============= 异常处理器 =============
 
 
@@ -232,6 +247,7 @@ __all__ = [
     "AuthenticationException",
     "UpstreamException",
     "StreamIdleTimeoutError",
+    "DeadlineExceededError",
     "error_response",
     "register_exception_handlers",
 ]
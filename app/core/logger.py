@@ -17,6 +17,9 @@ if not hasattr(logger, "isEnabledFor"):
 DEFAULT_LOG_DIR = Path(__file__).parent.parent.parent / "logs"
 LOG_DIR = Path(os.getenv("LOG_DIR", str(DEFAULT_LOG_DIR)))
 _LOG_DIR_READY = False
+# 当前最低日志级别（setup_logging 前按 DEBUG 处理）
+_MIN_LEVEL_NO = 0
+_DEBUG_LEVEL_NO = logger.level("DEBUG").no
 
 
 def _prepare_log_dir() -> bool:
@@ -104,7 +107,12 @@ def setup_logging(
     file_logging: bool = True,
 ):
     """设置日志配置"""
+    global _MIN_LEVEL_NO
     logger.remove()
+    try:
+        _MIN_LEVEL_NO = logger.level(str(level).upper()).no
+    except (TypeError, ValueError):
+        _MIN_LEVEL_NO = 0
     file_logging = _env_flag("LOG_FILE_ENABLED", file_logging)
 
     # 控制台输出
@@ -138,6 +146,11 @@ def setup_logging(
     return logger
 
 
+def is_debug_enabled() -> bool:
+    """DEBUG 日志是否会输出（用于跳过昂贵的调试信息构建）"""
+    return _MIN_LEVEL_NO <= _DEBUG_LEVEL_NO
+
+
 def get_logger(trace_id: str = "", span_id: str = ""):
     """获取绑定了 trace 上下文的 logger"""
     bound = {}
@@ -148,4 +161,4 @@ def get_logger(trace_id: str = "", span_id: str = ""):
     return logger.bind(**bound) if bound else logger
 
 
-__all__ = ["logger", "setup_logging", "get_logger", "LOG_DIR"]
+__all__ = ["logger", "setup_logging", "get_logger", "is_debug_enabled", "LOG_DIR"]
@@ -0,0 +1,126 @@
+"""
+Rate limiting utilities.
+
+- TokenBucket: 令牌桶限速（平滑请求速率）
+- AIMDConcurrency: 加性增 / 乘性减的自适应并发窗口
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    rate 为每秒补充的令牌数，burst 为桶容量；rate <= 0 表示不限速。
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = max(0.0, float(rate))
+        self.burst = max(1.0, float(burst if burst is not None else self.rate or 1))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """立即尝试获取令牌"""
+        if self.rate <= 0:
+            return True
+        self._refill(time.monotonic())
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """获取令牌还需等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(time.monotonic())
+        missing = tokens - self._tokens
+        return max(0.0, missing / self.rate)
+
+    async def acquire(self, tokens: float = 1.0):
+        """等待直到获取令牌"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep(self.wait_time(tokens))
+
+    def set_rate(self, rate: float):
+        """调整补充速率"""
+        self._refill(time.monotonic())
+        self.rate = max(0.0, float(rate))
+
+
+class AIMDConcurrency:
+    """
+    AIMD 自适应并发窗口
+
+    - 成功：窗口每满一轮加 1（加性增）
+    - 拥塞（429 / 5xx）：窗口减半（乘性减），同一冷却期内只减一次
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.decrease_factor = min(max(decrease_factor, 0.1), 0.9)
+        self.cooldown = max(0.0, cooldown)
+        self._window = float(min(max(int(initial), self.minimum), self.maximum))
+        self._inflight = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """当前并发上限"""
+        return int(self._window)
+
+    @property
+    def inflight(self) -> int:
+        """当前进行中的数量"""
+        return self._inflight
+
+    async def acquire(self):
+        """等待可用并发槽位"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight < self.limit)
+            self._inflight += 1
+
+    async def release(self):
+        """释放并发槽位"""
+        async with self._cond:
+            self._inflight = max(0, self._inflight - 1)
+            self._cond.notify_all()
+
+    def on_success(self):
+        """加性增"""
+        self._window = min(float(self.maximum), self._window + 1.0 / self._window)
+
+    def on_congestion(self) -> bool:
+        """乘性减，返回是否实际缩小了窗口"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return False
+        self._last_decrease = now
+        self._window = max(float(self.minimum), self._window * self.decrease_factor)
+        return True
+
+
+__all__ = ["TokenBucket", "AIMDConcurrency"]
@@ -15,7 +15,9 @@ import asyncio
 import hashlib
 import time
 import tomllib
-from typing import Any, Dict, Optional
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
 from pathlib import Path
 from enum import Enum
 
@@ -38,6 +40,15 @@ CONFIG_FILE = DATA_DIR / "config.toml"
 TOKEN_FILE = DATA_DIR / "token.json"
 LOCK_DIR = DATA_DIR / ".locks"
 
+# Token 变更流保留条数（Redis Stream 近似裁剪）
+TOKEN_CHANGES_MAXLEN = 10000
+# 单次读取的变更条数上限
+TOKEN_CHANGES_BATCH = 5000
+# SQL 轮询的时间窗口重叠（毫秒），容忍 worker 间时钟偏差
+SQL_CHANGES_OVERLAP_MS = 2000
+# SQL 轮询校验 Token 总数（感知删除）的间隔（秒），COUNT(*) 需要扫描全表
+SQL_COUNT_INTERVAL_SEC = 60.0
+
 
 # JSON 序列化优化助手函数
 def json_dumps(obj: Any) -> str:
@@ -48,6 +59,57 @@ def json_loads(obj: str | bytes) -> Any:
     return orjson.loads(obj)
 
 
+def _merge_token_deltas(
+    data: Dict[str, Any],
+    updated: Dict[str, List[Dict[str, Any]]],
+    deleted: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, Any]:
+    """将增量变更合并到全量 Token 数据（原地修改）"""
+    for pool_name, tokens in (deleted or {}).items():
+        if not tokens or pool_name not in data:
+            continue
+        removed = set(tokens)
+        data[pool_name] = [
+            t for t in data[pool_name] if t.get("token") not in removed
+        ]
+
+    for pool_name, tokens in (updated or {}).items():
+        if not tokens:
+            continue
+        pool_list = data.setdefault(pool_name, [])
+        positions = {t.get("token"): i for i, t in enumerate(pool_list)}
+        for t in tokens:
+            token_str = t.get("token")
+            if not token_str:
+                continue
+            idx = positions.get(token_str)
+            if idx is None:
+                positions[token_str] = len(pool_list)
+                pool_list.append(t)
+            else:
+                pool_list[idx] = t
+    return data
+
+
+@dataclass
+class TokenChanges:
+    """
+    Token 变更集（用于多 worker 增量同步）
+
+    - cursor: 读取后的新游标
+    - updated: pool_name -> 变更后的 Token 数据
+    - deleted: pool_name -> 被删除的 token
+    - full_reload: 无法增量同步（不支持 / 游标过期 / 全量覆盖），需要全量重载
+    - total: 存储中的 Token 总数（可选，用于校验无法感知的删除）
+    """
+
+    cursor: Any = None
+    updated: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    deleted: Dict[str, List[str]] = field(default_factory=dict)
+    full_reload: bool = False
+    total: Optional[int] = None
+
+
 class StorageError(Exception):
     """存储服务基础异常"""
 
@@ -77,6 +139,41 @@ class BaseStorage(abc.ABC):
         """保存所有 Token"""
         pass
 
+    async def save_token_deltas(
+        self,
+        updated: Dict[str, List[Dict[str, Any]]],
+        deleted: Optional[Dict[str, List[str]]] = None,
+    ):
+        """
+        增量保存 Token
+
+        Args:
+            updated: pool_name -> 需要写入（新增或更新）的 Token 列表
+            deleted: pool_name -> 需要删除的 token 字符串列表
+
+        默认实现读取全量数据合并后整体写回，各后端可覆盖为真正的增量写入。
+        """
+        data = await self._load_tokens_for_merge()
+        _merge_token_deltas(data, updated, deleted)
+        await self.save_tokens(data)
+
+    async def _load_tokens_for_merge(self) -> Dict[str, Any]:
+        """
+        读取合并增量所需的全量数据
+
+        读取失败必须抛出 StorageError：把空数据当作全量写回会丢掉所有未变更的 Token。
+        load_tokens 吞掉异常的后端需要覆盖此方法。
+        """
+        return await self.load_tokens() or {}
+
+    async def token_change_cursor(self) -> Any:
+        """当前 Token 变更游标（在加载 Token 之前获取）"""
+        return None
+
+    async def load_token_changes(self, cursor: Any) -> TokenChanges:
+        """读取游标之后的 Token 变更，默认不支持增量，要求全量重载"""
+        return TokenChanges(cursor=cursor, full_reload=True)
+
     @abc.abstractmethod
     async def close(self):
         """关闭资源"""
@@ -110,6 +207,9 @@ class LocalStorage(BaseStorage):
 
     def __init__(self):
         self._lock = asyncio.Lock()
+        # 本进程最后一次写入后的文件版本，及期间是否有其他进程写入
+        self._last_write_mtime: Optional[int] = None
+        self._foreign_write = False
 
     @asynccontextmanager
     async def acquire_lock(self, name: str, timeout: int = 10):
@@ -200,15 +300,24 @@ class LocalStorage(BaseStorage):
             raise StorageError(f"保存配置失败: {e}")
 
     async def load_tokens(self) -> Dict[str, Any]:
+        try:
+            return await self._load_tokens_for_merge()
+        except StorageError as e:
+            logger.error(f"LocalStorage: {e}")
+            return {}
+
+    async def _load_tokens_for_merge(self) -> Dict[str, Any]:
         if not TOKEN_FILE.exists():
             return {}
         try:
             async with aiofiles.open(TOKEN_FILE, "rb") as f:
                 content = await f.read()
-                return json_loads(content)
+            data = json_loads(content)
         except Exception as e:
-            logger.error(f"LocalStorage: 加载 Token 失败: {e}")
-            return {}
+            raise StorageError(f"加载 Token 失败: {e}")
+        if not isinstance(data, dict):
+            raise StorageError("加载 Token 失败: 数据格式错误")
+        return data
 
     async def save_tokens(self, data: Dict[str, Any]):
         try:
@@ -219,17 +328,165 @@ class LocalStorage(BaseStorage):
             async with aiofiles.open(temp_path, "wb") as f:
                 await f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
+            # 写入前文件已被其他进程修改，提示同步方全量重载
+            current = self._token_mtime()
+            if current and current != self._last_write_mtime:
+                self._foreign_write = True
+
             # 使用 os.replace 保证原子性
             os.replace(temp_path, TOKEN_FILE)
+            self._last_write_mtime = self._token_mtime()
 
         except Exception as e:
             logger.error(f"LocalStorage: 保存 Token 失败: {e}")
             raise StorageError(f"保存 Token 失败: {e}")
 
+    async def save_token_deltas(
+        self,
+        updated: Dict[str, List[Dict[str, Any]]],
+        deleted: Optional[Dict[str, List[str]]] = None,
+    ):
+        # 单文件存储无法局部写入，合并到磁盘上的最新数据，避免覆盖其他进程的变更；
+        # 读取失败时抛出，由调用方保留增量稍后重试
+        data = await self._load_tokens_for_merge()
+        _merge_token_deltas(data, updated, deleted)
+        await self.save_tokens(data)
+
+    @staticmethod
+    def _token_mtime() -> int:
+        try:
+            return TOKEN_FILE.stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    async def token_change_cursor(self) -> Any:
+        return self._token_mtime()
+
+    async def load_token_changes(self, cursor: Any) -> TokenChanges:
+        # 文件无法定位变更内容：版本未变或仅为本进程写入时跳过，否则全量重载
+        current = self._token_mtime()
+        if current == cursor or (
+            current == self._last_write_mtime and not self._foreign_write
+        ):
+            return TokenChanges(cursor=current)
+        self._foreign_write = False
+        return TokenChanges(cursor=current, full_reload=True)
+
     async def close(self):
         pass
 
 
+# ==================== Redis 原子额度脚本 ====================
+# KEYS[1] = token hash, KEYS[2] = 变更流
+# ARGV[1] = 变更记录 updated 字段, ARGV[2] = 来源标识, ARGV[3] = 变更流长度, ARGV[4] = 当前毫秒时间
+# 其余参数按脚本定义；token 不存在时返回 false，否则返回更新后的 HGETALL
+
+_LUA_TOKEN_PUBLISH = """
+local function publish()
+    redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*',
+        'op', 'delta', 'updated', ARGV[1], 'deleted', '{}', 'src', ARGV[2])
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local quota = tonumber(redis.call('HGET', KEYS[1], 'quota')) or 0
+local status = redis.call('HGET', KEYS[1], 'status') or 'active'
+"""
+
+# ARGV[5] = 扣减额度（与 TokenInfo.consume 一致）
+_LUA_TOKEN_CONSUME = _LUA_TOKEN_PUBLISH + """
+local actual = math.max(0, math.min(tonumber(ARGV[5]), quota))
+quota = math.max(0, quota - actual)
+if quota == 0 then
+    status = 'cooling'
+elseif status == 'cooling' then
+    status = 'active'
+end
+redis.call('HSET', KEYS[1], 'quota', quota, 'status', status, 'last_used_at', ARGV[4])
+redis.call('HINCRBY', KEYS[1], 'use_count', actual)
+publish()
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# ARGV[5] = 失败原因, ARGV[6] = 失败阈值（与 TokenInfo.record_fail 一致）
+_LUA_TOKEN_RECORD_FAIL = _LUA_TOKEN_PUBLISH + """
+local fails = redis.call('HINCRBY', KEYS[1], 'fail_count', 1)
+redis.call('HSET', KEYS[1], 'last_fail_at', ARGV[4], 'last_fail_reason', ARGV[5])
+if fails >= tonumber(ARGV[6]) then
+    redis.call('HSET', KEYS[1], 'status', 'expired')
+end
+publish()
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# 配额耗尽（与 TokenPool.mark_rate_limited 一致）
+_LUA_TOKEN_RATE_LIMITED = _LUA_TOKEN_PUBLISH + """
+redis.call('HSET', KEYS[1], 'quota', 0, 'status', 'cooling')
+publish()
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# ARGV[5] = 新配额, ARGV[6] = 是否计为一次使用（与 update_quota + record_success 一致）
+_LUA_TOKEN_SYNC_QUOTA = _LUA_TOKEN_PUBLISH + """
+quota = math.max(0, tonumber(ARGV[5]))
+if quota == 0 then
+    status = 'cooling'
+else
+    status = 'active'
+end
+redis.call('HSET', KEYS[1], 'quota', quota, 'status', status, 'fail_count', 0)
+redis.call('HDEL', KEYS[1], 'last_fail_at', 'last_fail_reason')
+if ARGV[6] == '1' then
+    redis.call('HINCRBY', KEYS[1], 'use_count', 1)
+    redis.call('HSET', KEYS[1], 'last_used_at', ARGV[4])
+end
+publish()
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# ARGV[5] = 写入的字段数 n，随后 n 组 field/value，其余为需要删除的字段
+# （管理操作直接写入额度类字段，如重置、刷新结果、标记过期）
+_LUA_TOKEN_SET_FIELDS = _LUA_TOKEN_PUBLISH + """
+local n = tonumber(ARGV[5])
+local i = 6
+for _ = 1, n do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    i = i + 2
+end
+for j = i, #ARGV do
+    redis.call('HDEL', KEYS[1], ARGV[j])
+end
+publish()
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# 增量保存（原子额度模式）：额度类字段由原子脚本维护，仅在新建 Token 时写入
+# KEYS[1] = token hash
+# ARGV[1] = 仅新建时写入的字段数 n，ARGV[2] = 总是写入的字段数 m，
+# 随后 n + m 组 field/value，其余为需要删除的字段
+_LUA_TOKEN_SAVE = """
+local n = tonumber(ARGV[1])
+local m = tonumber(ARGV[2])
+local i = 3
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    for _ = 1, n do
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+        i = i + 2
+    end
+else
+    i = i + 2 * n
+end
+for _ = 1, m do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+    i = i + 2
+end
+for j = i, #ARGV do
+    redis.call('HDEL', KEYS[1], ARGV[j])
+end
+return 1
+"""
+
+
 class RedisStorage(BaseStorage):
     """
     Redis 存储
@@ -253,7 +510,19 @@ class RedisStorage(BaseStorage):
         self.key_pools = "grok2api:pools"  # Set: pool_names
         self.prefix_pool_set = "grok2api:pool:"  # Set: pool -> token_ids
         self.prefix_token_hash = "grok2api:token:"  # Hash: token_id -> token_data
+        self.key_token_changes = "grok2api:token_changes"  # Stream: token 变更流
         self.lock_prefix = "grok2api:lock:"
+        # 变更来源标识，读取变更流时跳过本实例写入的条目
+        self.source_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # 原子额度脚本（首次调用时加载到服务端）
+        self._script_consume = self.redis.register_script(_LUA_TOKEN_CONSUME)
+        self._script_record_fail = self.redis.register_script(_LUA_TOKEN_RECORD_FAIL)
+        self._script_rate_limited = self.redis.register_script(
+            _LUA_TOKEN_RATE_LIMITED
+        )
+        self._script_sync_quota = self.redis.register_script(_LUA_TOKEN_SYNC_QUOTA)
+        self._script_set_fields = self.redis.register_script(_LUA_TOKEN_SET_FIELDS)
+        self._script_save = self.redis.register_script(_LUA_TOKEN_SAVE)
 
     @asynccontextmanager
     async def acquire_lock(self, name: str, timeout: int = 10):
@@ -363,31 +632,7 @@ class RedisStorage(BaseStorage):
                 t_data = token_data_list[i]
                 if not t_data:
                     continue
-
-                # 恢复 tags (JSON -> List)
-                if "tags" in t_data:
-                    try:
-                        t_data["tags"] = json_loads(t_data["tags"])
-                    except Exception:
-                        t_data["tags"] = []
-
-                # 类型转换 (Redis 返回全 string)
-                for int_field in [
-                    "quota",
-                    "created_at",
-                    "use_count",
-                    "fail_count",
-                    "last_used_at",
-                    "last_fail_at",
-                    "last_sync_at",
-                ]:
-                    if t_data.get(int_field) and t_data[int_field] != "None":
-                        try:
-                            t_data[int_field] = int(t_data[int_field])
-                        except Exception:
-                            pass
-
-                token_lookup[tid] = t_data
+                token_lookup[tid] = self._parse_token_hash(t_data)
 
             # 按 Pool 分组返回
             for pool_name in pool_names:
@@ -402,6 +647,33 @@ class RedisStorage(BaseStorage):
             logger.error(f"RedisStorage: 加载 Token 失败: {e}")
             return None
 
+    @staticmethod
+    def _parse_token_hash(t_data: Dict[str, str]) -> Dict[str, Any]:
+        """Redis Hash 还原为 Token 数据"""
+        # 恢复 tags (JSON -> List)
+        if "tags" in t_data:
+            try:
+                t_data["tags"] = json_loads(t_data["tags"])
+            except Exception:
+                t_data["tags"] = []
+
+        # 类型转换 (Redis 返回全 string)
+        for int_field in [
+            "quota",
+            "created_at",
+            "use_count",
+            "fail_count",
+            "last_used_at",
+            "last_fail_at",
+            "last_sync_at",
+        ]:
+            if t_data.get(int_field) and t_data[int_field] != "None":
+                try:
+                    t_data[int_field] = int(t_data[int_field])
+                except Exception:
+                    pass
+        return t_data
+
     async def save_tokens(self, data: Dict[str, Any]):
         """保存所有 Token"""
         if data is None:
@@ -459,27 +731,303 @@ class RedisStorage(BaseStorage):
                         token_str = t.get("token")
                         if not token_str:
                             continue
-                        t_flat = t.copy()
-                        if "tags" in t_flat:
-                            t_flat["tags"] = json_dumps(t_flat["tags"])
-                        status = t_flat.get("status")
-                        if isinstance(status, str) and status.startswith(
-                            "TokenStatus."
-                        ):
-                            t_flat["status"] = status.split(".", 1)[1].lower()
-                        elif isinstance(status, Enum):
-                            t_flat["status"] = status.value
-                        t_flat = {k: str(v) for k, v in t_flat.items() if v is not None}
                         pipe.hset(
-                            f"{self.prefix_token_hash}{token_str}", mapping=t_flat
+                            f"{self.prefix_token_hash}{token_str}",
+                            mapping=self._flatten_token(t),
                         )
 
+                # 全量覆盖：通知其他 worker 全量重载
+                self._publish_change(pipe, {"op": "full"})
                 await pipe.execute()
 
         except Exception as e:
             logger.error(f"RedisStorage: 保存 Token 失败: {e}")
             raise
 
+    @staticmethod
+    def _flatten_token(t: Dict[str, Any]) -> Dict[str, str]:
+        """Token 数据扁平化为 Redis Hash 字段"""
+        t_flat = t.copy()
+        if "tags" in t_flat:
+            t_flat["tags"] = json_dumps(t_flat["tags"])
+        status = t_flat.get("status")
+        if isinstance(status, str) and status.startswith("TokenStatus."):
+            t_flat["status"] = status.split(".", 1)[1].lower()
+        elif isinstance(status, Enum):
+            t_flat["status"] = status.value
+        return {k: str(v) for k, v in t_flat.items() if v is not None}
+
+    async def save_token_deltas(
+        self,
+        updated: Dict[str, List[Dict[str, Any]]],
+        deleted: Optional[Dict[str, List[str]]] = None,
+        atomic_fields: Iterable[str] = (),
+    ):
+        """
+        增量保存 Token（仅写入变更的 Hash 与池集合）
+
+        Args:
+            atomic_fields: 由原子脚本维护的字段（原子额度模式），已存在的 Token 不覆盖这些字段，
+                避免用本地副本改写其他 worker 刚更新的计数
+        """
+        atomic_fields = frozenset(atomic_fields)
+        try:
+            removed: Dict[str, List[str]] = {
+                pool_name: [t for t in tokens if t]
+                for pool_name, tokens in (deleted or {}).items()
+                if tokens
+            }
+
+            async with self.redis.pipeline() as pipe:
+                for pool_name, tokens in removed.items():
+                    pipe.srem(f"{self.prefix_pool_set}{pool_name}", *tokens)
+
+                for pool_name, tokens in (updated or {}).items():
+                    tids = [t.get("token") for t in tokens if t.get("token")]
+                    if not tids:
+                        continue
+                    pipe.sadd(self.key_pools, pool_name)
+                    pipe.sadd(f"{self.prefix_pool_set}{pool_name}", *tids)
+                    for t in tokens:
+                        token_str = t.get("token")
+                        if not token_str:
+                            continue
+                        key = f"{self.prefix_token_hash}{token_str}"
+                        if atomic_fields:
+                            await self._save_token_fields(pipe, key, t, atomic_fields)
+                            continue
+                        # 先删除再写入，保证置空的字段不会残留旧值
+                        pipe.delete(key)
+                        pipe.hset(key, mapping=self._flatten_token(t))
+
+                self._publish_change(
+                    pipe,
+                    {
+                        "op": "delta",
+                        "updated": json_dumps(
+                            {
+                                pool_name: [
+                                    t.get("token") for t in tokens if t.get("token")
+                                ]
+                                for pool_name, tokens in (updated or {}).items()
+                                if tokens
+                            }
+                        ),
+                        "deleted": json_dumps(removed),
+                    },
+                )
+                await pipe.execute()
+
+            if not removed:
+                return
+
+            # 仅当 token 不再属于任何池时删除其 Hash
+            candidates = {t for tokens in removed.values() for t in tokens}
+            pool_names = list(await self.redis.smembers(self.key_pools) or [])
+            if pool_names:
+                async with self.redis.pipeline() as pipe:
+                    for token_str in candidates:
+                        for pool_name in pool_names:
+                            pipe.sismember(
+                                f"{self.prefix_pool_set}{pool_name}", token_str
+                            )
+                    res = await pipe.execute()
+                orphans = []
+                for i, token_str in enumerate(candidates):
+                    chunk = res[i * len(pool_names) : (i + 1) * len(pool_names)]
+                    if not any(chunk):
+                        orphans.append(token_str)
+            else:
+                orphans = list(candidates)
+
+            if orphans:
+                await self.redis.delete(
+                    *[f"{self.prefix_token_hash}{t}" for t in orphans]
+                )
+
+        except Exception as e:
+            logger.error(f"RedisStorage: 增量保存 Token 失败: {e}")
+            raise
+
+    async def _save_token_fields(
+        self, pipe, key: str, t: Dict[str, Any], atomic_fields: frozenset
+    ):
+        """原子额度模式的单个 Token 写入：额度类字段仅在新建时写入，置空字段逐个删除"""
+        flat = self._flatten_token(t)
+        init = [(k, v) for k, v in flat.items() if k in atomic_fields]
+        always = [(k, v) for k, v in flat.items() if k not in atomic_fields]
+        cleared = [k for k, v in t.items() if v is None and k not in atomic_fields]
+        args: List[Any] = [len(init), len(always)]
+        for k, v in init + always:
+            args.extend((k, v))
+        args.extend(cleared)
+        await self._script_save(keys=[key], args=args, client=pipe)
+
+    def _publish_change(self, pipe, fields: Dict[str, str]):
+        """在写入管道中追加一条变更记录"""
+        pipe.xadd(
+            self.key_token_changes,
+            {**fields, "src": self.source_id},
+            maxlen=TOKEN_CHANGES_MAXLEN,
+            approximate=True,
+        )
+
+    # ========== 原子额度 ==========
+
+    async def _run_token_script(
+        self, script, pool_name: str, token: str, *args
+    ) -> Optional[Dict[str, Any]]:
+        """执行 Token 原子脚本，返回更新后的 Token 数据（不存在时返回 None）"""
+        res = await script(
+            keys=[f"{self.prefix_token_hash}{token}", self.key_token_changes],
+            args=[
+                json_dumps({pool_name: [token]}),
+                self.source_id,
+                TOKEN_CHANGES_MAXLEN,
+                int(time.time() * 1000),
+                *args,
+            ],
+        )
+        if not res:
+            return None
+        if isinstance(res, dict):
+            t_data = dict(res)
+        else:
+            t_data = dict(zip(res[::2], res[1::2]))
+        return self._parse_token_hash(t_data)
+
+    async def atomic_consume(
+        self, pool_name: str, token: str, cost: int
+    ) -> Optional[Dict[str, Any]]:
+        """原子扣减额度"""
+        return await self._run_token_script(
+            self._script_consume, pool_name, token, int(cost)
+        )
+
+    async def atomic_record_fail(
+        self, pool_name: str, token: str, reason: str, threshold: int
+    ) -> Optional[Dict[str, Any]]:
+        """原子记录失败，达到阈值后标记为 expired"""
+        return await self._run_token_script(
+            self._script_record_fail, pool_name, token, reason or "", int(threshold)
+        )
+
+    async def atomic_mark_rate_limited(
+        self, pool_name: str, token: str
+    ) -> Optional[Dict[str, Any]]:
+        """原子标记配额耗尽（COOLING）"""
+        return await self._run_token_script(
+            self._script_rate_limited, pool_name, token
+        )
+
+    async def atomic_sync_quota(
+        self, pool_name: str, token: str, quota: int, is_usage: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """原子写入 API 同步的配额并记录成功"""
+        return await self._run_token_script(
+            self._script_sync_quota,
+            pool_name,
+            token,
+            int(quota),
+            "1" if is_usage else "0",
+        )
+
+    async def atomic_set_fields(
+        self, pool_name: str, token: str, fields: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """原子写入指定字段（值为 None 时删除）"""
+        flat = self._flatten_token(fields)
+        cleared = [k for k, v in fields.items() if v is None]
+        args: List[Any] = [len(flat)]
+        for k, v in flat.items():
+            args.extend((k, v))
+        args.extend(cleared)
+        return await self._run_token_script(
+            self._script_set_fields, pool_name, token, *args
+        )
+
+    @staticmethod
+    def _stream_id(entry_id: str) -> tuple:
+        ms, _, seq = str(entry_id).partition("-")
+        return int(ms or 0), int(seq or 0)
+
+    async def token_change_cursor(self) -> Any:
+        try:
+            entries = await self.redis.xrevrange(self.key_token_changes, count=1)
+        except Exception as e:
+            logger.warning(f"RedisStorage: 获取变更游标失败: {e}")
+            return None
+        return entries[0][0] if entries else "0-0"
+
+    async def load_token_changes(self, cursor: Any) -> TokenChanges:
+        if cursor is None:
+            return TokenChanges(
+                cursor=await self.token_change_cursor(), full_reload=True
+            )
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xrange(self.key_token_changes, count=1)
+            pipe.xread({self.key_token_changes: cursor}, count=TOKEN_CHANGES_BATCH)
+            first, streams = await pipe.execute()
+
+        # 游标已被裁剪出变更流，可能丢失变更
+        if (
+            first
+            and cursor != "0-0"
+            and self._stream_id(cursor) < self._stream_id(first[0][0])
+        ):
+            return TokenChanges(
+                cursor=await self.token_change_cursor(), full_reload=True
+            )
+
+        entries = streams[0][1] if streams else []
+        if not entries:
+            return TokenChanges(cursor=cursor)
+
+        # pool_name -> token -> 最后一次操作是否为删除
+        ops: Dict[str, Dict[str, bool]] = {}
+        for _, fields in entries:
+            if fields.get("src") == self.source_id:
+                continue
+            if fields.get("op") != "delta":
+                return TokenChanges(cursor=entries[-1][0], full_reload=True)
+            try:
+                updated = json_loads(fields.get("updated") or "{}")
+                deleted = json_loads(fields.get("deleted") or "{}")
+            except Exception:
+                return TokenChanges(cursor=entries[-1][0], full_reload=True)
+            for pool_name, tokens in deleted.items():
+                for token_str in tokens:
+                    ops.setdefault(pool_name, {})[token_str] = True
+            for pool_name, tokens in updated.items():
+                for token_str in tokens:
+                    ops.setdefault(pool_name, {})[token_str] = False
+
+        changes = TokenChanges(cursor=entries[-1][0])
+        fetch = [
+            (pool_name, token_str)
+            for pool_name, tokens in ops.items()
+            for token_str, is_deleted in tokens.items()
+            if not is_deleted
+        ]
+        for pool_name, tokens in ops.items():
+            removed = [t for t, is_deleted in tokens.items() if is_deleted]
+            if removed:
+                changes.deleted[pool_name] = removed
+
+        if fetch:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for _, token_str in fetch:
+                    pipe.hgetall(f"{self.prefix_token_hash}{token_str}")
+                token_data_list = await pipe.execute()
+            for (pool_name, _), t_data in zip(fetch, token_data_list):
+                # Hash 已不存在说明随后被删除，由对应的删除记录处理
+                if t_data:
+                    changes.updated.setdefault(pool_name, []).append(
+                        self._parse_token_hash(t_data)
+                    )
+        return changes
+
     async def close(self):
         try:
             await self.redis.close()
@@ -517,6 +1065,7 @@ class SQLStorage(BaseStorage):
         )
         self.async_session = async_sessionmaker(self.engine, expire_on_commit=False)
         self._initialized = False
+        self._last_count_at = 0.0
 
     async def _ensure_schema(self):
         """确保数据库表存在"""
@@ -557,6 +1106,13 @@ class SQLStorage(BaseStorage):
                     )
                 except Exception:
                     pass
+                # 变更轮询按 updated_at 范围查询
+                try:
+                    await conn.execute(
+                        text("CREATE INDEX idx_tokens_updated ON tokens (updated_at)")
+                    )
+                except Exception:
+                    pass
 
                 # 尝试兼容旧表结构
                 try:
@@ -725,19 +1281,36 @@ class SQLStorage(BaseStorage):
         await self._ensure_schema()
         from sqlalchemy import text
 
+        now = int(time.time() * 1000)
         try:
             async with self.async_session() as session:
+                # 未变化的行沿用原 updated_at，避免下一次轮询把全表推送给所有 worker
+                res = await session.execute(
+                    text("SELECT token, pool_name, data, updated_at FROM tokens")
+                )
+                existing = {
+                    token_str: (pool_name, data_json, updated_at)
+                    for token_str, pool_name, data_json, updated_at in res.fetchall()
+                }
                 await session.execute(text("DELETE FROM tokens"))
 
                 params = []
                 for pool_name, tokens in data.items():
                     for t in tokens:
+                        data_json = json_dumps(t)
+                        old = existing.get(t.get("token"))
+                        unchanged = (
+                            old is not None
+                            and old[0] == pool_name
+                            and old[1] == data_json
+                            and old[2]
+                        )
                         params.append(
                             {
                                 "token": t.get("token"),
                                 "pool_name": pool_name,
-                                "data": json_dumps(t),
-                                "updated_at": 0,
+                                "data": data_json,
+                                "updated_at": int(old[2]) if unchanged else now,
                             }
                         )
 
@@ -754,6 +1327,137 @@ class SQLStorage(BaseStorage):
             logger.error(f"SQLStorage: 保存 Token 失败: {e}")
             raise
 
+    def _upsert_tokens_sql(self) -> Optional[str]:
+        """按方言生成 Token Upsert 语句，不支持时返回 None"""
+        insert = (
+            "INSERT INTO tokens (token, pool_name, data, updated_at) "
+            "VALUES (:token, :pool_name, :data, :updated_at)"
+        )
+        if self.dialect in ("mysql", "mariadb"):
+            return (
+                f"{insert} ON DUPLICATE KEY UPDATE pool_name=VALUES(pool_name), "
+                "data=VALUES(data), updated_at=VALUES(updated_at)"
+            )
+        if self.dialect in ("postgres", "postgresql", "pgsql"):
+            return (
+                f"{insert} ON CONFLICT (token) DO UPDATE SET "
+                "pool_name=EXCLUDED.pool_name, data=EXCLUDED.data, "
+                "updated_at=EXCLUDED.updated_at"
+            )
+        return None
+
+    async def save_token_deltas(
+        self,
+        updated: Dict[str, List[Dict[str, Any]]],
+        deleted: Optional[Dict[str, List[str]]] = None,
+    ):
+        """增量保存 Token（仅 Upsert / 删除变更的行）"""
+        await self._ensure_schema()
+        from sqlalchemy import text
+
+        now = int(time.time() * 1000)
+        params = []
+        for pool_name, tokens in (updated or {}).items():
+            for t in tokens:
+                if not t.get("token"):
+                    continue
+                params.append(
+                    {
+                        "token": t.get("token"),
+                        "pool_name": pool_name,
+                        "data": json_dumps(t),
+                        "updated_at": now,
+                    }
+                )
+        delete_params = [
+            {"token": token_str, "pool_name": pool_name}
+            for pool_name, tokens in (deleted or {}).items()
+            for token_str in tokens
+            if token_str
+        ]
+
+        try:
+            async with self.async_session() as session:
+                if delete_params:
+                    await session.execute(
+                        text(
+                            "DELETE FROM tokens WHERE token=:token AND pool_name=:pool_name"
+                        ),
+                        delete_params,
+                    )
+                if params:
+                    upsert_sql = self._upsert_tokens_sql()
+                    if upsert_sql:
+                        await session.execute(text(upsert_sql), params)
+                    else:
+                        await session.execute(
+                            text("DELETE FROM tokens WHERE token=:token"),
+                            [{"token": p["token"]} for p in params],
+                        )
+                        await session.execute(
+                            text(
+                                "INSERT INTO tokens (token, pool_name, data, updated_at) VALUES (:token, :pool_name, :data, :updated_at)"
+                            ),
+                            params,
+                        )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"SQLStorage: 增量保存 Token 失败: {e}")
+            raise
+
+    async def token_change_cursor(self) -> Any:
+        await self._ensure_schema()
+        from sqlalchemy import text
+
+        try:
+            async with self.async_session() as session:
+                res = await session.execute(text("SELECT MAX(updated_at) FROM tokens"))
+                return int(res.scalar() or 0)
+        except Exception as e:
+            logger.warning(f"SQLStorage: 获取变更游标失败: {e}")
+            return None
+
+    async def load_token_changes(self, cursor: Any) -> TokenChanges:
+        # 按 updated_at 轮询；删除无法直接感知，定期通过 total 交由调用方校验
+        if cursor is None:
+            return TokenChanges(
+                cursor=await self.token_change_cursor(), full_reload=True
+            )
+        await self._ensure_schema()
+        from sqlalchemy import text
+
+        since = int(cursor) - SQL_CHANGES_OVERLAP_MS
+        async with self.async_session() as session:
+            res = await session.execute(
+                text(
+                    "SELECT pool_name, data, updated_at FROM tokens WHERE updated_at > :since"
+                ),
+                {"since": since},
+            )
+            rows = res.fetchall()
+            total = None
+            if time.monotonic() - self._last_count_at >= SQL_COUNT_INTERVAL_SEC:
+                total = int(
+                    (
+                        await session.execute(text("SELECT COUNT(*) FROM tokens"))
+                    ).scalar()
+                    or 0
+                )
+                self._last_count_at = time.monotonic()
+
+        changes = TokenChanges(cursor=int(cursor), total=total)
+        for pool_name, data_json, updated_at in rows:
+            try:
+                t_data = (
+                    json_loads(data_json) if isinstance(data_json, str) else data_json
+                )
+            except Exception:
+                continue
+            changes.updated.setdefault(pool_name, []).append(t_data)
+            if updated_at and int(updated_at) > changes.cursor:
+                changes.cursor = int(updated_at)
+        return changes
+
     async def close(self):
         await self.engine.dispose()
 
@@ -11,6 +11,7 @@ from app.core.config import get_config
 from app.core.logger import logger
 from app.services.reverse.assets_list import AssetsListReverse
 from app.services.reverse.assets_delete import AssetsDeleteReverse
+from app.services.reverse.utils.session import get_session_pool
 from app.core.batch import run_batch
 
 
@@ -19,16 +20,19 @@ class BaseAssetsService:
 
     def __init__(self):
         self._session: Optional[AsyncSession] = None
+        self._session_key = None
 
     async def _get_session(self) -> AsyncSession:
         if self._session is None:
-            self._session = AsyncSession()
+            self._session_key, self._session = get_session_pool().acquire("assets")
         return self._session
 
     async def close(self):
         if self._session:
-            await self._session.close()
+            # 共享会话只归还，不关闭
+            get_session_pool().release(self._session_key)
             self._session = None
+            self._session_key = None
 
 
 _LIST_SEMAPHORE = None
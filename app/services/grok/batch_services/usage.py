@@ -5,11 +5,10 @@ Batch usage service.
 import asyncio
 from typing import Callable, Awaitable, Dict, Any, Optional, List
 
-from curl_cffi.requests import AsyncSession
-
 from app.core.logger import logger
 from app.core.config import get_config
 from app.services.reverse.rate_limits import RateLimitsReverse
+from app.services.reverse.utils.session import borrow_session
 from app.core.batch import run_batch
 
 _USAGE_SEMAPHORE = None
@@ -43,7 +42,7 @@ class UsageService:
         """
         async with _get_usage_semaphore():
             try:
-                async with AsyncSession() as session:
+                async with borrow_session("usage") as session:
                     response = await RateLimitsReverse.request(session, token)
                 data = response.json()
                 remaining = data.get("remainingTokens")
@@ -4,11 +4,10 @@ Grok Chat 服务
 
 import asyncio
 import re
-import uuid
-from typing import Dict, List, Any, AsyncGenerator, AsyncIterable
+import time
+from typing import Dict, List, Any, AsyncGenerator, AsyncIterable, Optional
 
 import orjson
-from curl_cffi.requests import AsyncSession
 from curl_cffi.requests.errors import RequestsError
 
 from app.core.logger import logger
@@ -19,18 +18,43 @@ from app.core.exceptions import (
     ErrorType,
     UpstreamException,
     StreamIdleTimeoutError,
+    DeadlineExceededError,
 )
+from app.core.deadline import check_deadline
 from app.services.grok.services.model import ModelService
 from app.services.grok.utils.upload import UploadService
 from app.services.grok.utils import process as proc_base
-from app.services.grok.utils.retry import pick_token, rate_limited
+from app.services.grok.utils.retry import (
+    locally_throttled,
+    pick_token,
+    rate_limited,
+    token_fatal,
+)
+from app.services.grok.utils.coalesce import (
+    FLUSH_TICK,
+    TokenCoalescer,
+    with_flush_ticks,
+)
+from app.services.grok.utils.hedge import (
+    FirstLineLatency,
+    await_first_line,
+    hedge_stream,
+)
+from app.services.grok.utils.sse import DONE, ChunkEncoder
+from app.services.grok.utils.render_queue import ImageRenderQueue
+from app.services.grok.utils.stream_line import parse_token_line
+from app.services.grok.utils.tag_filter import TagFilter
 from app.services.reverse.app_chat import AppChatReverse
+from app.services.reverse.utils.retry import retry_budget_scope
+from app.services.reverse.utils.session import get_session_pool
 from app.services.grok.utils.stream import wrap_stream_with_usage
-from app.services.token import get_token_manager, EffortType
+from app.services.token import get_token_manager, EffortType, TokenLease
 
 
 _CHAT_SEMAPHORE = None
 _CHAT_SEM_VALUE = None
+# 上游首行耗时统计（用于对冲延迟）
+_FIRST_LINE_LATENCY = FirstLineLatency()
 
 
 def extract_tool_text(raw: str) -> str:
@@ -88,6 +112,16 @@ def extract_tool_text(raw: str) -> str:
     return re.sub(r"<[^>]+>", "", raw, flags=re.DOTALL).strip()
 
 
+def _tool_card_text(raw: str) -> str:
+    line = extract_tool_text(raw)
+    return f"{line}\n" if line else ""
+
+
+def _tag_filter(filter_tags) -> Optional[TagFilter]:
+    """按 app.filter_tags 创建标签过滤器（工具卡片替换为摘要行）"""
+    return TagFilter.create(filter_tags, {"xai:tool_usage_card": _tool_card_text})
+
+
 def _get_chat_semaphore() -> asyncio.Semaphore:
     global _CHAT_SEMAPHORE, _CHAT_SEM_VALUE
     value = max(1, int(get_config("chat.concurrent")))
@@ -193,7 +227,7 @@ class GrokChatService:
         browser = get_config("proxy.browser")
 
         async def _stream():
-            session = AsyncSession(impersonate=browser)
+            session_key, session = get_session_pool().acquire("chat", browser)
             try:
                 async with _get_chat_semaphore():
                     stream_response = await AppChatReverse.request(
@@ -218,10 +252,7 @@ class GrokChatService:
             except Exception:
                 raise
             finally:
-                try:
-                    await session.close()
-                except Exception:
-                    pass
+                get_session_pool().release(session_key)
 
         return _stream()
 
@@ -295,6 +326,71 @@ class GrokChatService:
 class ChatService:
     """Chat 业务服务"""
 
+    @staticmethod
+    def _hedge_eligible(model: str, messages: List[Dict[str, Any]]) -> bool:
+        """对冲仅用于非 heavy 模型且无附件的请求（附件上传绑定 Token 账号）"""
+        if not get_config("chat.hedge_enabled", False):
+            return False
+        model_info = ModelService.get(model)
+        if model_info and model_info.cost.value == "high":
+            return False
+        _, files, images = MessageExtractor.extract(messages)
+        return not files and not images
+
+    @staticmethod
+    async def _hedge(
+        token_mgr,
+        service: GrokChatService,
+        lease: TokenLease,
+        response: AsyncGenerator,
+        model: str,
+        tried_tokens: set,
+        chat_kwargs: Dict[str, Any],
+    ) -> tuple[TokenLease, AsyncIterable]:
+        """
+        对冲首行：超过延迟阈值时换 Token 发起重复请求
+
+        返回胜出方的租约与响应流；落败方的租约回滚，只有胜出方计费。
+        """
+        leases = [lease]
+
+        async def _start_hedge() -> Optional[AsyncGenerator]:
+            hedge_lease = await pick_token(token_mgr, model, tried_tokens)
+            if not hedge_lease:
+                return None
+            tried_tokens.add(hedge_lease.token)
+            try:
+                hedge_response, _, _ = await service.chat_openai(
+                    hedge_lease.token, **chat_kwargs
+                )
+            except Exception as e:
+                logger.warning(f"Hedge request setup failed: {e}")
+                token_mgr.rollback(hedge_lease)
+                return None
+            leases.append(hedge_lease)
+            return hedge_response
+
+        async def _discard(index: int, error: Optional[BaseException], elapsed: float):
+            loser = leases[index]
+            if error is None:
+                token_mgr.observe(loser.token, ttfb=elapsed)
+            elif locally_throttled(error):
+                pass
+            elif rate_limited(error):
+                await token_mgr.mark_rate_limited(loser.token)
+            else:
+                token_mgr.observe(loser.token, error=True)
+            token_mgr.rollback(loser)
+
+        delay = _FIRST_LINE_LATENCY.hedge_delay(
+            float(get_config("chat.hedge_percentile", 95)),
+            float(get_config("chat.hedge_min_delay_sec", 1.0)),
+        )
+        index, stream = await hedge_stream(
+            response, _start_hedge, delay, _discard, _FIRST_LINE_LATENCY
+        )
+        return leases[index], stream
+
     @staticmethod
     async def completions(
         model: str,
@@ -303,6 +399,7 @@ class ChatService:
         reasoning_effort: str | None = None,
         temperature: float = 0.8,
         top_p: float = 0.95,
+        stream_coalesce_ms: int | None = None,
     ):
         """Chat Completions 入口"""
         # 获取 token
@@ -320,73 +417,128 @@ class ChatService:
         tried_tokens = set()
         max_token_retries = int(get_config("retry.max_retry"))
         last_error = None
+        hedge = ChatService._hedge_eligible(model, messages)
+        chat_kwargs = {
+            "model": model,
+            "messages": messages,
+            "stream": is_stream,
+            "reasoning_effort": reasoning_effort,
+            "temperature": temperature,
+            "top_p": top_p,
+        }
 
-        for attempt in range(max_token_retries):
-            # 选择 token
-            token = await pick_token(token_mgr, model, tried_tokens)
-            if not token:
-                if last_error:
-                    raise last_error
-                raise AppException(
-                    message="No available tokens. Please try again later.",
-                    error_type=ErrorType.RATE_LIMIT.value,
-                    code="rate_limit_exceeded",
-                    status_code=429,
-                )
-
-            tried_tokens.add(token)
-
-            try:
-                # 请求 Grok
-                service = GrokChatService()
-                response, _, model_name = await service.chat_openai(
-                    token,
-                    model,
-                    messages,
-                    stream=is_stream,
-                    reasoning_effort=reasoning_effort,
-                    temperature=temperature,
-                    top_p=top_p,
-                )
-
-                # 处理响应
-                if is_stream:
-                    logger.debug(f"Processing stream response: model={model}")
-                    processor = StreamProcessor(model_name, token, show_think)
-                    return wrap_stream_with_usage(
-                        processor.process(response), token_mgr, token, model
+        # 重试预算跨 Token 共享：换 Token 不会重置退避预算
+        with retry_budget_scope() as budget:
+            for attempt in range(max_token_retries):
+                # 客户端截止时间已过则不再换 token
+                check_deadline("token retry")
+                # 选择 token
+                lease = await pick_token(token_mgr, model, tried_tokens)
+                if not lease:
+                    if last_error:
+                        raise last_error
+                    raise AppException(
+                        message="No available tokens. Please try again later.",
+                        error_type=ErrorType.RATE_LIMIT.value,
+                        code="rate_limit_exceeded",
+                        status_code=429,
                     )
 
-                # 非流式
-                logger.debug(f"Processing non-stream response: model={model}")
-                result = await CollectProcessor(model_name, token).process(response)
+                token = lease.token
+                tried_tokens.add(token)
+                # 租约由 commit 或 wrap_stream_with_usage 结算，否则回滚
+                settled = False
+
                 try:
-                    model_info = ModelService.get(model)
-                    effort = (
-                        EffortType.HIGH
-                        if (model_info and model_info.cost.value == "high")
-                        else EffortType.LOW
+                    # 请求 Grok
+                    started = time.monotonic()
+                    service = GrokChatService()
+                    response, _, model_name = await service.chat_openai(
+                        token, **chat_kwargs
                     )
-                    await token_mgr.consume(token, effort)
-                    logger.info(f"Chat completed: model={model}, effort={effort.value}")
-                except Exception as e:
-                    logger.warning(f"Failed to record usage: {e}")
-                return result
-
-            except UpstreamException as e:
-                last_error = e
-
-                if rate_limited(e):
-                    # 配额不足，标记 token 为 cooling 并换 token 重试
-                    await token_mgr.mark_rate_limited(token)
-                    logger.warning(
-                        f"Token {token[:10]}... rate limited (429), "
-                        f"trying next token (attempt {attempt + 1}/{max_token_retries})"
-                    )
-                    continue
+                    if hedge:
+                        lease, response = await ChatService._hedge(
+                            token_mgr,
+                            service,
+                            lease,
+                            response,
+                            model,
+                            tried_tokens,
+                            chat_kwargs,
+                        )
+                        token = lease.token
+                    elif is_stream:
+                        # 先取首行：连接阶段的 401 / 403 仍在本轮换 Token 重试内处理
+                        response = await await_first_line(response)
+
+                    # 处理响应
+                    if is_stream:
+                        logger.debug(f"Processing stream response: model={model}")
+                        processor = StreamProcessor(
+                            model_name, token, show_think, stream_coalesce_ms
+                        )
+                        settled = True
+                        return wrap_stream_with_usage(
+                            processor.process(response),
+                            token_mgr,
+                            lease,
+                            model,
+                            started=started,
+                        )
 
-                # 非 429 错误，不换 token，直接抛出
-                raise
+                    # 非流式
+                    logger.debug(f"Processing non-stream response: model={model}")
+                    result = await CollectProcessor(model_name, token).process(response)
+                    try:
+                        model_info = ModelService.get(model)
+                        effort = (
+                            EffortType.HIGH
+                            if (model_info and model_info.cost.value == "high")
+                            else EffortType.LOW
+                        )
+                        settled = True
+                        await token_mgr.commit(lease, effort)
+                        logger.info(f"Chat completed: model={model}, effort={effort.value}")
+                    except Exception as e:
+                        logger.warning(f"Failed to record usage: {e}")
+                    return result
+
+                except DeadlineExceededError:
+                    raise
+                except UpstreamException as e:
+                    last_error = e
+
+                    if locally_throttled(e):
+                        # 本地限速预估需等待过久，换 token，不冷却
+                        logger.info(
+                            f"Token {token[:10]}... throttled locally, "
+                            f"trying next token (attempt {attempt + 1}/{max_token_retries})"
+                        )
+                        continue
+
+                    if rate_limited(e):
+                        # 配额不足，标记 token 为 cooling 并换 token 重试
+                        await token_mgr.mark_rate_limited(token)
+                        logger.warning(
+                            f"Token {token[:10]}... rate limited (429), "
+                            f"trying next token (attempt {attempt + 1}/{max_token_retries})"
+                        )
+                        continue
+
+                    token_mgr.observe(token, error=True)
+                    if token_fatal(e) and not budget.exhausted:
+                        # Token 失效（401 / 403），立即换 token，不在原 token 上退避
+                        logger.warning(
+                            f"Token {token[:10]}... failed ({e.details.get('status')}), "
+                            f"trying next token (attempt {attempt + 1}/{max_token_retries})"
+                        )
+                        continue
+
+                    # 其他错误，不换 token，直接抛出
+                    raise
+                finally:
+                    if not settled:
+                        token_mgr.rollback(lease)
 
         # 所有 token 都 429，抛出最后的错误
         if last_error:
@@ -402,130 +554,119 @@ class ChatService:
 class StreamProcessor(proc_base.BaseProcessor):
     """Stream response processor."""
 
-    def __init__(self, model: str, token: str = "", show_think: bool = None):
+    def __init__(
+        self,
+        model: str,
+        token: str = "",
+        show_think: bool = None,
+        coalesce_ms: float = None,
+    ):
         super().__init__(model, token)
         self.response_id: str = None
         self.fingerprint: str = ""
         self.think_opened: bool = False
         self.role_sent: bool = False
         self.filter_tags = get_config("app.filter_tags")
-        self.tool_usage_enabled = (
-            "xai:tool_usage_card" in (self.filter_tags or [])
-        )
-        self._tool_usage_opened = False
-        self._tool_usage_buffer = ""
+        self._tag_filter = _tag_filter(self.filter_tags)
+        self._encoder = ChunkEncoder(model, self.created)
+        # 内容增量合并（None 表示逐 token 输出）
+        self._coalescer = TokenCoalescer.from_config(coalesce_ms)
+        # 图片渲染队列（出现图片时创建）
+        self._images: Optional[ImageRenderQueue] = None
 
         self.show_think = bool(show_think)
 
-    def _filter_tool_card(self, token: str) -> str:
-        if not token or not self.tool_usage_enabled:
-            return token
-
-        output_parts: list[str] = []
-        rest = token
-        start_tag = "<xai:tool_usage_card"
-        end_tag = "</xai:tool_usage_card>"
-
-        while rest:
-            if self._tool_usage_opened:
-                end_idx = rest.find(end_tag)
-                if end_idx == -1:
-                    self._tool_usage_buffer += rest
-                    return "".join(output_parts)
-                end_pos = end_idx + len(end_tag)
-                self._tool_usage_buffer += rest[:end_pos]
-                line = extract_tool_text(self._tool_usage_buffer)
-                if line:
-                    if output_parts and not output_parts[-1].endswith("\n"):
-                        output_parts[-1] += "\n"
-                    output_parts.append(f"{line}\n")
-                self._tool_usage_buffer = ""
-                self._tool_usage_opened = False
-                rest = rest[end_pos:]
-                continue
-
-            start_idx = rest.find(start_tag)
-            if start_idx == -1:
-                output_parts.append(rest)
-                break
-
-            if start_idx > 0:
-                output_parts.append(rest[:start_idx])
-
-            end_idx = rest.find(end_tag, start_idx)
-            if end_idx == -1:
-                self._tool_usage_opened = True
-                self._tool_usage_buffer = rest[start_idx:]
-                break
-
-            end_pos = end_idx + len(end_tag)
-            raw_card = rest[start_idx:end_pos]
-            line = extract_tool_text(raw_card)
-            if line:
-                if output_parts and not output_parts[-1].endswith("\n"):
-                    output_parts[-1] += "\n"
-                output_parts.append(f"{line}\n")
-            rest = rest[end_pos:]
-
-        return "".join(output_parts)
-
     def _filter_token(self, token: str) -> str:
-        """Filter special tags in current token only."""
-        if not token:
-            return token
-
-        if self.tool_usage_enabled:
-            token = self._filter_tool_card(token)
-            if not token:
-                return ""
-
-        if not self.filter_tags:
+        """Filter special tags in the token stream."""
+        if not token or self._tag_filter is None:
             return token
+        return self._tag_filter.feed(token)
+
+    def _token_chunks(self, token: str, is_thinking: bool) -> List[bytes]:
+        """Build SSE chunks for one upstream token."""
+        if not token or (is_thinking and not self.show_think):
+            return []
+        return self._content_chunks(self._filter_token(token), is_thinking)
+
+    def _content_chunks(self, filtered: str, is_thinking: bool) -> List[bytes]:
+        """Build SSE chunks for filtered content."""
+        if not filtered:
+            return []
+        chunks = []
+        if is_thinking:
+            if not self.think_opened:
+                chunks.extend(self._flush())
+                chunks.append(self._sse("<think>\n"))
+                self.think_opened = True
+        elif self.think_opened:
+            chunks.extend(self._flush())
+            chunks.append(self._sse("\n</think>\n"))
+            self.think_opened = False
+        if self._coalescer is None:
+            chunks.append(
+                self._encoder.content(filtered, self.response_id, self.fingerprint)
+            )
+        elif self._coalescer.add(filtered):
+            chunks.extend(self._flush())
+        return chunks
+
+    def _flush(self) -> List[bytes]:
+        """输出合并缓冲中的内容"""
+        if self._coalescer is None or not self._coalescer.pending:
+            return []
+        return [
+            self._encoder.content(
+                self._coalescer.take(), self.response_id, self.fingerprint
+            )
+        ]
 
-        for tag in self.filter_tags:
-            if tag == "xai:tool_usage_card":
-                continue
-            if f"<{tag}" in token or f"</{tag}" in token:
-                return ""
-
-        return token
+    def _image_chunks(self, rendered: List[str]) -> List[bytes]:
+        """Build SSE chunks for rendered images, in submission order."""
+        if not rendered:
+            return []
+        chunks = self._flush()
+        chunks.extend(self._sse(f"{item}\n") for item in rendered)
+        return chunks
 
-    def _sse(self, content: str = "", role: str = None, finish: str = None) -> str:
+    def _sse(self, content: str = "", role: str = None, finish: str = None) -> bytes:
         """Build SSE response."""
-        delta = {}
-        if role:
-            delta["role"] = role
-            delta["content"] = ""
-        elif content:
-            delta["content"] = content
-
-        chunk = {
-            "id": self.response_id or f"chatcmpl-{uuid.uuid4().hex[:24]}",
-            "object": "chat.completion.chunk",
-            "created": self.created,
-            "model": self.model,
-            "system_fingerprint": self.fingerprint,
-            "choices": [
-                {"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish}
-            ],
-        }
-        return f"data: {orjson.dumps(chunk).decode()}\n\n"
+        return self._encoder.chunk(
+            content, role, finish, self.response_id, self.fingerprint
+        )
 
-    async def process(self, response: AsyncIterable[bytes]) -> AsyncGenerator[str, None]:
+    async def process(self, response: AsyncIterable[bytes]) -> AsyncGenerator[bytes, None]:
         """Process stream response.
         
         Args:
             response: AsyncIterable[bytes], async iterable of bytes
 
         Returns:
-            AsyncGenerator[str, None], async generator of strings
+            AsyncGenerator[bytes, None], async generator of SSE chunks
         """
         idle_timeout = get_config("chat.stream_timeout")
+        lines = proc_base._with_idle_timeout(response, idle_timeout, self.model)
+        if self._coalescer is not None:
+            lines = with_flush_ticks(lines, self._coalescer)
 
         try:
-            async for line in proc_base._with_idle_timeout(
-                response, idle_timeout, self.model
-            ):
+            async for line in lines:
+                if self._images is not None:
+                    for chunk in self._image_chunks(self._images.ready()):
+                        yield chunk
+                if line is FLUSH_TICK:
+                    for chunk in self._flush():
+                        yield chunk
+                    continue
+                # 快速路径：单 token 行直接从原始字节中取出
+                fast = parse_token_line(line, self.response_id is None)
+                if fast is not None:
+                    if not self.role_sent:
+                        yield self._sse(role="assistant")
+                        self.role_sent = True
+                    for chunk in self._token_chunks(*fast):
+                        yield chunk
+                    continue
+
                 line = proc_base._normalize_line(line)
                 if not line:
                     continue
@@ -551,6 +692,8 @@ class StreamProcessor(proc_base.BaseProcessor):
                 if img := resp.get("streamingImageGenerationResponse"):
                     if not self.show_think:
                         continue
+                    for chunk in self._flush():
+                        yield chunk
                     if is_thinking and not self.think_opened:
                         yield self._sse("<think>\n")
                         self.think_opened = True
@@ -565,14 +708,11 @@ class StreamProcessor(proc_base.BaseProcessor):
                     continue
 
                 if mr := resp.get("modelResponse"):
+                    # 图片在后台并发渲染，文本继续输出，结果按序插入
                     for url in proc_base._collect_images(mr):
-                        parts = url.split("/")
-                        img_id = parts[-2] if len(parts) >= 2 else "image"
-                        dl_service = self._get_dl()
-                        rendered = await dl_service.render_image(
-                            url, self.token, img_id
-                        )
-                        yield self._sse(f"{rendered}\n")
+                        if self._images is None:
+                            self._images = ImageRenderQueue(self.render_image)
+                        self._images.submit(url)
 
                     if (
                         (meta := mr.get("metadata", {}))
@@ -594,6 +734,8 @@ class StreamProcessor(proc_base.BaseProcessor):
                             original = image.get("original")
                             title = image.get("title") or ""
                             if original:
+                                for chunk in self._flush():
+                                    yield chunk
                                 title_safe = title.replace("\n", " ").strip()
                                 if title_safe:
                                     yield self._sse(f"![{title_safe}]({original})\n")
@@ -602,27 +744,23 @@ class StreamProcessor(proc_base.BaseProcessor):
                     continue
 
                 if (token := resp.get("token")) is not None:
-                    if not token:
-                        continue
-                    filtered = self._filter_token(token)
-                    if not filtered:
-                        continue
-                    if is_thinking:
-                        if not self.show_think:
-                            continue
-                        if not self.think_opened:
-                            yield self._sse("<think>\n")
-                            self.think_opened = True
-                    else:
-                        if self.think_opened:
-                            yield self._sse("\n</think>\n")
-                            self.think_opened = False
-                    yield self._sse(filtered)
-
+                    for chunk in self._token_chunks(token, is_thinking):
+                        yield chunk
+
+            if self._tag_filter is not None:
+                for chunk in self._content_chunks(
+                    self._tag_filter.finish(), self.think_opened
+                ):
+                    yield chunk
+            if self._images is not None:
+                for chunk in self._image_chunks(await self._images.drain()):
+                    yield chunk
+            for chunk in self._flush():
+                yield chunk
             if self.think_opened:
                 yield self._sse("</think>\n")
             yield self._sse(finish="stop")
-            yield "data: [DONE]\n\n"
+            yield DONE
         except asyncio.CancelledError:
             logger.debug("Stream cancelled by client", extra={"model": self.model})
             raise
@@ -657,6 +795,8 @@ class StreamProcessor(proc_base.BaseProcessor):
             )
             raise
         finally:
+            if self._images is not None:
+                self._images.cancel()
             await self.close()
 
 
@@ -669,29 +809,10 @@ class CollectProcessor(proc_base.BaseProcessor):
 
     def _filter_content(self, content: str) -> str:
         """Filter special tags in content."""
-        if not content or not self.filter_tags:
+        if not content:
             return content
-
-        result = content
-        if "xai:tool_usage_card" in self.filter_tags:
-            result = re.sub(
-                r"<xai:tool_usage_card[^>]*>.*?</xai:tool_usage_card>",
-                lambda match: (
-                    f"{extract_tool_text(match.group(0))}\n"
-                    if extract_tool_text(match.group(0))
-                    else ""
-                ),
-                result,
-                flags=re.DOTALL,
-            )
-
-        for tag in self.filter_tags:
-            if tag == "xai:tool_usage_card":
-                continue
-            pattern = rf"<{re.escape(tag)}[^>]*>.*?</{re.escape(tag)}>|<{re.escape(tag)}[^>]*/>"
-            result = re.sub(pattern, "", result, flags=re.DOTALL)
-
-        return result
+        tag_filter = _tag_filter(self.filter_tags)
+        return tag_filter.filter(content) if tag_filter else content
 
     async def process(self, response: AsyncIterable[bytes]) -> dict[str, Any]:
         """Process and collect full response."""
@@ -699,6 +820,8 @@ class CollectProcessor(proc_base.BaseProcessor):
         fingerprint = ""
         content = ""
         idle_timeout = get_config("chat.stream_timeout")
+        # 最后一个 modelResponse 的图片（后台并发渲染，结束时按序拼接）
+        images: Optional[ImageRenderQueue] = None
 
         try:
             async for line in proc_base._with_idle_timeout(
@@ -761,16 +884,13 @@ class CollectProcessor(proc_base.BaseProcessor):
                             flags=re.DOTALL,
                         )
 
+                    if images is not None:
+                        images.cancel()
+                        images = None
                     if urls := proc_base._collect_images(mr):
-                        content += "\n"
+                        images = ImageRenderQueue(self.render_image)
                         for url in urls:
-                            parts = url.split("/")
-                            img_id = parts[-2] if len(parts) >= 2 else "image"
-                            dl_service = self._get_dl()
-                            rendered = await dl_service.render_image(
-                                url, self.token, img_id
-                            )
-                            content += f"{rendered}\n"
+                            images.submit(url)
 
                     if (
                         (meta := mr.get("metadata", {}))
@@ -781,6 +901,8 @@ class CollectProcessor(proc_base.BaseProcessor):
 
         except asyncio.CancelledError:
             logger.debug("Collect cancelled by client", extra={"model": self.model})
+            if images is not None:
+                images.cancel()
             raise
         except StreamIdleTimeoutError as e:
             logger.warning(f"Collect idle timeout: {e}", extra={"model": self.model})
@@ -797,7 +919,14 @@ class CollectProcessor(proc_base.BaseProcessor):
                 extra={"model": self.model, "error_type": type(e).__name__},
             )
         finally:
-            await self.close()
+            try:
+                if images is not None:
+                    rendered = await images.drain()
+                    content += "\n" + "".join(f"{item}\n" for item in rendered)
+            finally:
+                if images is not None:
+                    images.cancel()
+                await self.close()
 
         content = self._filter_content(content)
 
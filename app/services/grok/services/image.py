@@ -10,16 +10,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, AsyncGenerator, AsyncIterable, Dict, List, Optional, Union
 
-import orjson
-
 from app.core.config import get_config
 from app.core.logger import logger
 from app.core.storage import DATA_DIR
 from app.core.exceptions import AppException, ErrorType, UpstreamException
 from app.services.grok.utils.process import BaseProcessor
-from app.services.grok.utils.retry import pick_token, rate_limited
+from app.services.grok.utils.retry import locally_throttled, pick_token, rate_limited
+from app.services.grok.utils.sse import sse_event
 from app.services.grok.utils.stream import wrap_stream_with_usage
-from app.services.token import EffortType
+from app.services.token import EffortType, TokenLease
 from app.services.reverse.ws_imagine import ImagineWebSocketReverse
 
 
@@ -29,7 +28,7 @@ image_service = ImagineWebSocketReverse()
 @dataclass
 class ImageGenerationResult:
     stream: bool
-    data: Union[AsyncGenerator[str, None], List[str]]
+    data: Union[AsyncGenerator[bytes, None], List[str]]
     usage_override: Optional[dict] = None
 
 
@@ -55,14 +54,14 @@ class ImageGenerationService:
         last_error: Optional[Exception] = None
 
         if stream:
-            async def _stream_retry() -> AsyncGenerator[str, None]:
+            async def _stream_retry() -> AsyncGenerator[bytes, None]:
                 nonlocal last_error
                 for attempt in range(max_token_retries):
                     preferred = token if attempt == 0 else None
-                    current_token = await pick_token(
+                    lease = await pick_token(
                         token_mgr, model_info.model_id, tried_tokens, preferred=preferred
                     )
-                    if not current_token:
+                    if not lease:
                         if last_error:
                             raise last_error
                         raise AppException(
@@ -72,12 +71,14 @@ class ImageGenerationService:
                             status_code=429,
                         )
 
+                    current_token = lease.token
                     tried_tokens.add(current_token)
                     yielded = False
+                    settled = False
                     try:
                         result = await self._stream_ws(
                             token_mgr=token_mgr,
-                            token=current_token,
+                            lease=lease,
                             model_info=model_info,
                             prompt=prompt,
                             n=n,
@@ -86,12 +87,16 @@ class ImageGenerationService:
                             aspect_ratio=aspect_ratio,
                             enable_nsfw=enable_nsfw,
                         )
+                        settled = True
                         async for chunk in result.data:
                             yielded = True
                             yield chunk
                         return
                     except UpstreamException as e:
                         last_error = e
+                        if locally_throttled(e) and not yielded:
+                            # 本地限速预估，换 token，不冷却
+                            continue
                         if rate_limited(e):
                             if yielded:
                                 raise
@@ -102,6 +107,9 @@ class ImageGenerationService:
                             )
                             continue
                         raise
+                    finally:
+                        if not settled:
+                            token_mgr.rollback(lease)
 
                 if last_error:
                     raise last_error
@@ -116,10 +124,10 @@ class ImageGenerationService:
 
         for attempt in range(max_token_retries):
             preferred = token if attempt == 0 else None
-            current_token = await pick_token(
+            lease = await pick_token(
                 token_mgr, model_info.model_id, tried_tokens, preferred=preferred
             )
-            if not current_token:
+            if not lease:
                 if last_error:
                     raise last_error
                 raise AppException(
@@ -129,11 +137,14 @@ class ImageGenerationService:
                     status_code=429,
                 )
 
+            current_token = lease.token
             tried_tokens.add(current_token)
+            # 租约由 _collect_ws 结算，否则回滚
+            settled = False
             try:
-                return await self._collect_ws(
+                result = await self._collect_ws(
                     token_mgr=token_mgr,
-                    token=current_token,
+                    lease=lease,
                     model_info=model_info,
                     prompt=prompt,
                     n=n,
@@ -141,8 +152,13 @@ class ImageGenerationService:
                     aspect_ratio=aspect_ratio,
                     enable_nsfw=enable_nsfw,
                 )
+                settled = True
+                return result
             except UpstreamException as e:
                 last_error = e
+                if locally_throttled(e):
+                    # 本地限速预估，换 token，不冷却
+                    continue
                 if rate_limited(e):
                     await token_mgr.mark_rate_limited(current_token)
                     logger.warning(
@@ -150,7 +166,11 @@ class ImageGenerationService:
                         f"trying next token (attempt {attempt + 1}/{max_token_retries})"
                     )
                     continue
+                token_mgr.observe(current_token, error=True)
                 raise
+            finally:
+                if not settled:
+                    token_mgr.rollback(lease)
 
         if last_error:
             raise last_error
@@ -165,7 +185,7 @@ class ImageGenerationService:
         self,
         *,
         token_mgr: Any,
-        token: str,
+        lease: TokenLease,
         model_info: Any,
         prompt: str,
         n: int,
@@ -174,6 +194,7 @@ class ImageGenerationService:
         aspect_ratio: str,
         enable_nsfw: Optional[bool] = None,
     ) -> ImageGenerationResult:
+        token = lease.token
         if enable_nsfw is None:
             enable_nsfw = bool(get_config("image.nsfw"))
         upstream = image_service.stream(
@@ -193,7 +214,7 @@ class ImageGenerationService:
         stream = wrap_stream_with_usage(
             processor.process(upstream),
             token_mgr,
-            token,
+            lease,
             model_info.model_id,
         )
         return ImageGenerationResult(stream=True, data=stream)
@@ -202,7 +223,7 @@ class ImageGenerationService:
         self,
         *,
         token_mgr: Any,
-        token: str,
+        lease: TokenLease,
         model_info: Any,
         prompt: str,
         n: int,
@@ -210,6 +231,7 @@ class ImageGenerationService:
         aspect_ratio: str,
         enable_nsfw: Optional[bool] = None,
     ) -> ImageGenerationResult:
+        token = lease.token
         if enable_nsfw is None:
             enable_nsfw = bool(get_config("image.nsfw"))
         all_images: List[str] = []
@@ -255,7 +277,7 @@ class ImageGenerationService:
                 break
 
         try:
-            await token_mgr.consume(token, self._get_effort(model_info))
+            await token_mgr.commit(lease, self._get_effort(model_info))
         except Exception as e:
             logger.warning(f"Failed to consume token: {e}")
 
@@ -422,10 +444,10 @@ class ImageWSStreamProcessor(ImageWSBaseProcessor):
         self._index_map[image_id] = len(self._index_map)
         return self._index_map[image_id]
 
-    def _sse(self, event: str, data: dict) -> str:
-        return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+    def _sse(self, event: str, data: dict) -> bytes:
+        return sse_event(event, data)
 
-    async def process(self, response: AsyncIterable[dict]) -> AsyncGenerator[str, None]:
+    async def process(self, response: AsyncIterable[dict]) -> AsyncGenerator[bytes, None]:
         images: Dict[str, Dict] = {}
 
         async for item in response:
@@ -27,7 +27,8 @@ from app.services.grok.utils.process import (
     _is_http2_error,
 )
 from app.services.grok.utils.upload import UploadService
-from app.services.grok.utils.retry import pick_token, rate_limited
+from app.services.grok.utils.retry import locally_throttled, pick_token, rate_limited
+from app.services.grok.utils.sse import sse_event
 from app.services.grok.services.chat import GrokChatService
 from app.services.grok.services.video import VideoService
 from app.services.grok.utils.stream import wrap_stream_with_usage
@@ -37,7 +38,7 @@ from app.services.token import EffortType
 @dataclass
 class ImageEditResult:
     stream: bool
-    data: Union[AsyncGenerator[str, None], List[str]]
+    data: Union[AsyncGenerator[bytes, None], List[str]]
 
 
 class ImageEditService:
@@ -82,10 +83,10 @@ class ImageEditService:
 
         for attempt in range(max_token_retries):
             preferred = token if attempt == 0 else None
-            current_token = await pick_token(
+            lease = await pick_token(
                 token_mgr, model_info.model_id, tried_tokens, preferred=preferred
             )
-            if not current_token:
+            if not lease:
                 if last_error:
                     raise last_error
                 raise AppException(
@@ -95,7 +96,10 @@ class ImageEditService:
                     status_code=429,
                 )
 
+            current_token = lease.token
             tried_tokens.add(current_token)
+            # 租约由 commit 或 wrap_stream_with_usage 结算，否则回滚
+            settled = False
             await self._emit_progress(
                 progress_cb,
                 "token_selected",
@@ -166,12 +170,13 @@ class ImageEditService:
                         n=n,
                         response_format=response_format,
                     )
+                    settled = True
                     return ImageEditResult(
                         stream=True,
                         data=wrap_stream_with_usage(
                             processor.process(response),
                             token_mgr,
-                            current_token,
+                            lease,
                             model_info.model_id,
                         ),
                     )
@@ -204,7 +209,8 @@ class ImageEditService:
                         if (model_info and model_info.cost.value == "high")
                         else EffortType.LOW
                     )
-                    await token_mgr.consume(current_token, effort)
+                    settled = True
+                    await token_mgr.commit(lease, effort)
                     logger.debug(
                         f"Image edit completed, recorded usage (effort={effort.value})"
                     )
@@ -214,6 +220,9 @@ class ImageEditService:
 
             except UpstreamException as e:
                 last_error = e
+                if locally_throttled(e):
+                    # 本地限速预估，换 token，不冷却
+                    continue
                 if rate_limited(e):
                     await token_mgr.mark_rate_limited(current_token)
                     await self._emit_progress(
@@ -227,7 +236,11 @@ class ImageEditService:
                         f"trying next token (attempt {attempt + 1}/{max_token_retries})"
                     )
                     continue
+                token_mgr.observe(current_token, error=True)
                 raise
+            finally:
+                if not settled:
+                    token_mgr.rollback(lease)
 
         if last_error:
             raise last_error
@@ -258,10 +271,10 @@ class ImageEditService:
 
         for attempt in range(max_token_retries):
             preferred = token if attempt == 0 else None
-            current_token = await pick_token(
+            lease = await pick_token(
                 token_mgr, model_info.model_id, tried_tokens, preferred=preferred
             )
-            if not current_token:
+            if not lease:
                 if last_error:
                     raise last_error
                 raise AppException(
@@ -271,7 +284,10 @@ class ImageEditService:
                     status_code=429,
                 )
 
+            current_token = lease.token
             tried_tokens.add(current_token)
+            # 租约由 commit 或 wrap_stream_with_usage 结算，否则回滚
+            settled = False
             await self._emit_progress(
                 progress_cb,
                 "token_selected",
@@ -352,12 +368,13 @@ class ImageEditService:
                         n=1,
                         response_format=response_format,
                     )
+                    settled = True
                     return ImageEditResult(
                         stream=True,
                         data=wrap_stream_with_usage(
                             processor.process(response),
                             token_mgr,
-                            current_token,
+                            lease,
                             model_info.model_id,
                         ),
                     )
@@ -390,7 +407,8 @@ class ImageEditService:
                         if (model_info and model_info.cost.value == "high")
                         else EffortType.LOW
                     )
-                    await token_mgr.consume(current_token, effort)
+                    settled = True
+                    await token_mgr.commit(lease, effort)
                     logger.debug(
                         "Image edit(parentPostId) completed, "
                         f"recorded usage (effort={effort.value})"
@@ -401,6 +419,9 @@ class ImageEditService:
 
             except UpstreamException as e:
                 last_error = e
+                if locally_throttled(e):
+                    # 本地限速预估，换 token，不冷却
+                    continue
                 if rate_limited(e):
                     await token_mgr.mark_rate_limited(current_token)
                     await self._emit_progress(
@@ -414,7 +435,11 @@ class ImageEditService:
                         f"trying next token (attempt {attempt + 1}/{max_token_retries})"
                     )
                     continue
+                token_mgr.observe(current_token, error=True)
                 raise
+            finally:
+                if not settled:
+                    token_mgr.rollback(lease)
 
         if last_error:
             raise last_error
@@ -533,13 +558,13 @@ class ImageStreamProcessor(BaseProcessor):
         else:
             self.response_field = "b64_json"
 
-    def _sse(self, event: str, data: dict) -> str:
+    def _sse(self, event: str, data: dict) -> bytes:
         """Build SSE response."""
-        return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+        return sse_event(event, data)
 
     async def process(
         self, response: AsyncIterable[bytes]
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Process stream response."""
         final_images = []
         idle_timeout = get_config("image.stream_timeout")
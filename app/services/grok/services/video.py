@@ -8,7 +8,6 @@ import re
 from typing import Any, AsyncGenerator, AsyncIterable, Optional
 
 import orjson
-from curl_cffi.requests import AsyncSession
 from curl_cffi.requests.errors import RequestsError
 
 from app.core.logger import logger
@@ -29,11 +28,13 @@ from app.services.grok.utils.process import (
     _normalize_line,
     _is_http2_error,
 )
-from app.services.grok.utils.retry import rate_limited
+from app.services.grok.utils.retry import locally_throttled, rate_limited
+from app.services.grok.utils.sse import DONE, ChunkEncoder
 from app.services.reverse.app_chat import AppChatReverse
 from app.services.reverse.media_post import MediaPostReverse
 from app.services.reverse.video_upscale import VideoUpscaleReverse
 from app.services.reverse.assets_list import AssetsListReverse
+from app.services.reverse.utils.session import borrow_session, get_session_pool
 
 _VIDEO_SEMAPHORE = None
 _VIDEO_SEM_VALUE = 0
@@ -189,7 +190,7 @@ class VideoService:
             prompt_value = prompt if media_type == "MEDIA_POST_TYPE_VIDEO" else ""
             media_value = media_url or ""
 
-            async with AsyncSession() as session:
+            async with borrow_session("video") as session:
                 async with _get_video_semaphore():
                     response = await MediaPostReverse.request(
                         session,
@@ -254,7 +255,7 @@ class VideoService:
 
         async def _stream():
             for attempt in range(1, moderated_max_retry + 1):
-                session = AsyncSession()
+                session_key, session = get_session_pool().acquire("video")
                 moderated_hit = False
                 try:
                     async with _get_video_semaphore():
@@ -294,10 +295,7 @@ class VideoService:
                         raise
                     raise UpstreamException(f"Video generation error: {str(e)}")
                 finally:
-                    try:
-                        await session.close()
-                    except Exception:
-                        pass
+                    get_session_pool().release(session_key)
 
         return _stream()
 
@@ -342,7 +340,7 @@ class VideoService:
 
         async def _stream():
             for attempt in range(1, moderated_max_retry + 1):
-                session = AsyncSession()
+                session_key, session = get_session_pool().acquire("video")
                 moderated_hit = False
                 try:
                     async with _get_video_semaphore():
@@ -382,10 +380,7 @@ class VideoService:
                         raise
                     raise UpstreamException(f"Video generation error: {str(e)}")
                 finally:
-                    try:
-                        await session.close()
-                    except Exception:
-                        pass
+                    get_session_pool().release(session_key)
 
         return _stream()
 
@@ -461,7 +456,7 @@ class VideoService:
 
         async def _stream():
             for attempt in range(1, moderated_max_retry + 1):
-                session = AsyncSession()
+                session_key, session = get_session_pool().acquire("video")
                 moderated_hit = False
                 try:
                     async with _get_video_semaphore():
@@ -502,10 +497,7 @@ class VideoService:
                         raise
                     raise UpstreamException(f"Video generation error: {str(e)}")
                 finally:
-                    try:
-                        await session.close()
-                    except Exception:
-                        pass
+                    get_session_pool().release(session_key)
 
         return _stream()
 
@@ -590,6 +582,18 @@ class VideoService:
                     token = token[4:]
 
             used_tokens.add(token)
+            model_info = ModelService.get(model)
+            lease = token_mgr.reserve(
+                token,
+                EffortType.HIGH
+                if (model_info and model_info.cost.value == "high")
+                else EffortType.LOW,
+            )
+            if not lease:
+                # Token 已被并发移除
+                continue
+            # 租约由 commit 或 wrap_stream_with_usage 结算，否则回滚
+            settled = False
             should_upscale = bool(get_config("video.auto_upscale", True))
 
             try:
@@ -649,8 +653,9 @@ class VideoService:
                         show_think,
                         upscale_on_finish=should_upscale,
                     )
+                    settled = True
                     return wrap_stream_with_usage(
-                        processor.process(response), token_mgr, token, model
+                        processor.process(response), token_mgr, lease, model
                     )
 
                 result = await VideoCollectProcessor(
@@ -663,7 +668,8 @@ class VideoService:
                         if (model_info and model_info.cost.value == "high")
                         else EffortType.LOW
                     )
-                    await token_mgr.consume(token, effort)
+                    settled = True
+                    await token_mgr.commit(lease, effort)
                     logger.debug(
                         f"Video completed, recorded usage (effort={effort.value})"
                     )
@@ -673,6 +679,9 @@ class VideoService:
 
             except UpstreamException as e:
                 last_error = e
+                if locally_throttled(e):
+                    # 本地限速预估，换 token，不冷却
+                    continue
                 if rate_limited(e):
                     await token_mgr.mark_rate_limited(token)
                     logger.warning(
@@ -680,7 +689,11 @@ class VideoService:
                         f"trying next token (attempt {attempt + 1}/{max_token_retries})"
                     )
                     continue
+                token_mgr.observe(token, error=True)
                 raise
+            finally:
+                if not settled:
+                    token_mgr.rollback(lease)
 
         if last_error:
             raise last_error
@@ -706,6 +719,7 @@ class VideoStreamProcessor(BaseProcessor):
         self.response_id: Optional[str] = None
         self.think_opened: bool = False
         self.role_sent: bool = False
+        self._encoder = ChunkEncoder(model, self.created, with_fingerprint=False)
 
         self.show_think = bool(show_think)
         self.upscale_on_finish = bool(upscale_on_finish)
@@ -730,7 +744,7 @@ class VideoStreamProcessor(BaseProcessor):
             logger.warning("Video upscale skipped: unable to extract video id")
             return video_url
         try:
-            async with AsyncSession() as session:
+            async with borrow_session("video") as session:
                 response = await VideoUpscaleReverse.request(
                     session, self.token, video_id
                 )
@@ -743,29 +757,13 @@ class VideoStreamProcessor(BaseProcessor):
             logger.warning(f"Video upscale failed: {e}")
         return video_url
 
-    def _sse(self, content: str = "", role: str = None, finish: str = None) -> str:
+    def _sse(self, content: str = "", role: str = None, finish: str = None) -> bytes:
         """Build SSE response."""
-        delta = {}
-        if role:
-            delta["role"] = role
-            delta["content"] = ""
-        elif content:
-            delta["content"] = content
-
-        chunk = {
-            "id": self.response_id or f"chatcmpl-{uuid.uuid4().hex[:24]}",
-            "object": "chat.completion.chunk",
-            "created": self.created,
-            "model": self.model,
-            "choices": [
-                {"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish}
-            ],
-        }
-        return f"data: {orjson.dumps(chunk).decode()}\n\n"
+        return self._encoder.chunk(content, role, finish, self.response_id)
 
     async def process(
         self, response: AsyncIterable[bytes]
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """Process video stream response."""
         idle_timeout = get_config("video.stream_timeout")
 
@@ -843,7 +841,7 @@ class VideoStreamProcessor(BaseProcessor):
             if self.think_opened:
                 yield self._sse("</think>\n")
             yield self._sse(finish="stop")
-            yield "data: [DONE]\n\n"
+            yield DONE
         except asyncio.CancelledError:
             logger.debug(
                 "Video stream cancelled by client", extra={"model": self.model}
@@ -912,7 +910,7 @@ class VideoCollectProcessor(BaseProcessor):
             logger.warning("Video upscale skipped: unable to extract video id")
             return video_url
         try:
-            async with AsyncSession() as session:
+            async with borrow_session("video") as session:
                 response = await VideoUpscaleReverse.request(
                     session, self.token, video_id
                 )
@@ -936,7 +934,7 @@ class VideoCollectProcessor(BaseProcessor):
         max_pages = 20
         marker = f"/{asset_id}/"
 
-        async with AsyncSession() as session:
+        async with borrow_session("video") as session:
             for attempt in range(1, retries + 1):
                 params = {
                     "pageSize": page_size,
@@ -4,9 +4,8 @@ Grok Voice Mode Service
 
 from typing import Any, Dict
 
-from curl_cffi.requests import AsyncSession
-
 from app.core.config import get_config
+from app.services.reverse.utils.session import borrow_session
 from app.services.reverse.ws_livekit import LivekitTokenReverse
 
 
@@ -21,7 +20,7 @@ class VoiceService:
         speed: float = 1.0,
     ) -> Dict[str, Any]:
         browser = get_config("proxy.browser")
-        async with AsyncSession(impersonate=browser) as session:
+        async with borrow_session("voice", browser) as session:
             response = await LivekitTokenReverse.request(
                 session,
                 token=token,
@@ -0,0 +1,111 @@
+"""
+流式内容增量合并
+
+默认每个上游 token 对应一个 data: 帧和一次 socket 写入；开启合并后，连续的内容增量先写入缓冲，
+达到时间窗口或大小阈值时合并为一个帧输出。上游停顿时由 with_flush_ticks 产出 FLUSH_TICK，
+保证缓冲内容最迟在窗口到期时发出。
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncGenerator, AsyncIterable, List, Optional
+
+from app.core.config import get_config
+
+# 窗口到期但上游尚无新行时产出的占位项
+FLUSH_TICK = object()
+
+
+class TokenCoalescer:
+    """内容增量缓冲"""
+
+    __slots__ = ("window", "max_bytes", "_parts", "_size", "_since")
+
+    def __init__(self, window_ms: float, max_bytes: int = 0):
+        self.window = max(0.0, float(window_ms or 0) / 1000)
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self._parts: List[str] = []
+        self._size = 0
+        self._since = 0.0
+
+    @classmethod
+    def from_config(cls, window_ms: Optional[float] = None) -> Optional["TokenCoalescer"]:
+        """
+        按请求参数或配置创建（窗口为 0 时返回 None，即不合并）
+
+        Args:
+            window_ms: 请求级窗口（毫秒），None 时取 chat.stream_coalesce_ms
+        """
+        if window_ms is None:
+            window_ms = get_config("chat.stream_coalesce_ms", 0)
+        try:
+            window_ms = float(window_ms or 0)
+        except (TypeError, ValueError):
+            window_ms = 0.0
+        if window_ms <= 0:
+            return None
+        return cls(window_ms, get_config("chat.stream_coalesce_bytes", 1024))
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._parts)
+
+    def add(self, text: str) -> bool:
+        """写入内容，返回是否应立即输出"""
+        if not self._parts:
+            self._since = time.monotonic()
+        self._parts.append(text)
+        # 按 UTF-8 字节计数：CJK 字符占 3 字节，按字符数计会使帧超出阈值
+        self._size += len(text.encode("utf-8"))
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        return time.monotonic() - self._since >= self.window
+
+    def take(self) -> str:
+        """取出并清空缓冲"""
+        text = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return text
+
+    def timeout(self) -> Optional[float]:
+        """距窗口到期的秒数（缓冲为空时为 None）"""
+        if not self._parts:
+            return None
+        return max(0.0, self._since + self.window - time.monotonic())
+
+
+async def with_flush_ticks(
+    iterable: AsyncIterable[Any], coalescer: TokenCoalescer
+) -> AsyncGenerator[Any, None]:
+    """
+    包装上游迭代器：缓冲非空且窗口到期前没有新行时产出 FLUSH_TICK
+
+    等待中的读取不会因窗口到期而取消，下一轮继续等待同一次读取。
+    """
+    iterator = iterable.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=coalescer.timeout())
+            if not done:
+                yield FLUSH_TICK
+                continue
+            task, pending = pending, None
+            try:
+                item = task.result()
+            except StopAsyncIteration:
+                break
+            yield item
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except BaseException:
+                pass
+
+
+__all__ = ["TokenCoalescer", "with_flush_ticks", "FLUSH_TICK"]
@@ -18,8 +18,10 @@ from curl_cffi.requests import AsyncSession
 from app.core.logger import logger
 from app.core.storage import DATA_DIR
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import AppException
 from app.services.reverse.assets_download import AssetsDownloadReverse
+from app.services.reverse.utils.session import get_session_pool
 from app.services.grok.utils.locks import _get_download_semaphore, _file_lock
 
 
@@ -28,6 +30,7 @@ class DownloadService:
 
     def __init__(self):
         self._session: Optional[AsyncSession] = None
+        self._session_key = None
         base_dir = DATA_DIR / "tmp"
         self.image_dir = base_dir / "image"
         self.video_dir = base_dir / "video"
@@ -36,16 +39,17 @@ class DownloadService:
         self._cleanup_running = False
 
     async def create(self) -> AsyncSession:
-        """Create or reuse a session."""
+        """Borrow or reuse a pooled session."""
         if self._session is None:
-            self._session = AsyncSession()
+            self._session_key, self._session = get_session_pool().acquire("download")
         return self._session
 
     async def close(self):
-        """Close the session."""
+        """Release the pooled session."""
         if self._session:
-            await self._session.close()
+            get_session_pool().release(self._session_key)
             self._session = None
+            self._session_key = None
 
     async def resolve_url(
         self, path_or_url: str, token: str, media_type: str = "image"
@@ -133,7 +137,7 @@ class DownloadService:
 
             file_path = self._normalize_path(file_path)
             lock_name = f"dl_b64_{hashlib.sha1(file_path.encode()).hexdigest()[:16]}"
-            lock_timeout = max(1, int(get_config("asset.download_timeout")))
+            lock_timeout = max(1, int(clamp_timeout(get_config("asset.download_timeout"))))
             async with _get_download_semaphore():
                 async with _file_lock(lock_name, timeout=lock_timeout):
                     session = await self.create()
@@ -195,7 +199,7 @@ class DownloadService:
             lock_name = (
                 f"dl_{media_type}_{hashlib.sha1(str(cache_path).encode()).hexdigest()[:16]}"
             )
-            lock_timeout = max(1, int(get_config("asset.download_timeout")))
+            lock_timeout = max(1, int(clamp_timeout(get_config("asset.download_timeout"))))
             async with _file_lock(lock_name, timeout=lock_timeout):
                 session = await self.create()
                 response = await AssetsDownloadReverse.request(session, token, file_path)
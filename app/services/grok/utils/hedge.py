@@ -0,0 +1,191 @@
+"""
+对冲请求（Hedged Requests）
+
+首行在延迟阈值内未到达时，用另一个 Token 发起重复请求，
+取先返回首行的一方继续流式输出，并取消落败方。
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from app.core.logger import logger
+
+# 滚动窗口内保留的首行耗时样本数
+LATENCY_WINDOW = 256
+# 样本不足时使用的对冲延迟（秒）
+HEDGE_WARMUP_SAMPLES = 20
+HEDGE_WARMUP_DELAY_SEC = 3.0
+
+
+class FirstLineLatency:
+    """上游首行耗时统计（滚动窗口分位数）"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(max(0.0, seconds))
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < HEDGE_WARMUP_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        pct = min(max(pct, 0.0), 100.0)
+        index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def hedge_delay(self, pct: float, min_delay: float) -> float:
+        """对冲延迟：首行耗时的 pct 分位数，不低于 min_delay"""
+        value = self.percentile(pct)
+        if value is None:
+            value = HEDGE_WARMUP_DELAY_SEC
+        return max(min_delay, value)
+
+
+async def _prepend(first: Any, stream: AsyncGenerator) -> AsyncGenerator:
+    yield first
+    async for item in stream:
+        yield item
+
+
+async def _empty() -> AsyncGenerator:
+    return
+    yield
+
+
+async def _close(stream: AsyncGenerator):
+    try:
+        await stream.aclose()
+    except Exception:
+        pass
+
+
+async def await_first_line(stream: AsyncGenerator) -> AsyncIterator:
+    """
+    等待首行后返回从首行开始的完整流
+
+    流式响应的上游请求在首次迭代时才发起；先取首行，连接阶段的错误（如 401 / 403）
+    会在调用方的换 Token 重试范围内抛出，而不是在返回给客户端之后。
+    """
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        return _empty()
+    except BaseException:
+        await _close(stream)
+        raise
+    return _prepend(first, stream)
+
+
+async def hedge_stream(
+    primary: AsyncGenerator,
+    start_hedge: Callable[[], Awaitable[Optional[AsyncGenerator]]],
+    delay: float,
+    on_discard: Callable[[int, Optional[BaseException], float], Awaitable[None]],
+    latency: Optional[FirstLineLatency] = None,
+) -> Tuple[int, AsyncIterator]:
+    """
+    对冲等待首行
+
+    Args:
+        primary: 主请求流（首次迭代时才真正发起请求）
+        start_hedge: 发起对冲请求，返回新的流；无可用 Token 时返回 None
+        delay: 首行等待阈值（秒），超时后发起对冲
+        on_discard: 被放弃请求的清理回调 (index, error, elapsed)；
+            error 为 None 表示落败被取消
+        latency: 首行耗时统计
+
+    Returns:
+        (胜出请求序号, 从首行开始的完整流)；0 为主请求，1 为对冲请求
+
+    Raises:
+        全部失败时抛出主请求的异常（主请求不经 on_discard，由调用方处理）
+    """
+    streams: List[AsyncGenerator] = [primary]
+    started: List[float] = [time.monotonic()]
+    errors: Dict[int, BaseException] = {}
+    tasks: Dict[asyncio.Future, int] = {
+        asyncio.ensure_future(primary.__anext__()): 0
+    }
+
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            hedge = await start_hedge()
+            if hedge is not None:
+                logger.info(f"Hedge: first line not received in {delay:.2f}s, hedging")
+                streams.append(hedge)
+                started.append(time.monotonic())
+                tasks[asyncio.ensure_future(hedge.__anext__())] = 1
+
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            # 同时完成时优先主请求
+            for task in sorted(done, key=tasks.get):
+                index = tasks.pop(task)
+                error = task.exception()
+                if error is not None and not isinstance(error, StopAsyncIteration):
+                    errors[index] = error
+                    continue
+
+                elapsed = time.monotonic() - started[index]
+                if latency is not None:
+                    latency.record(elapsed)
+
+                # 胜出：取消并清理其余请求
+                for other in tasks:
+                    other.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                for other_index in tasks.values():
+                    await _close(streams[other_index])
+                    await on_discard(
+                        other_index, None, time.monotonic() - started[other_index]
+                    )
+                tasks.clear()
+                for failed_index, failed in errors.items():
+                    await on_discard(
+                        failed_index, failed, time.monotonic() - started[failed_index]
+                    )
+                if index:
+                    logger.info(f"Hedge: hedged request won ({elapsed:.2f}s)")
+
+                if isinstance(error, StopAsyncIteration):
+                    return index, _empty()
+                return index, _prepend(task.result(), streams[index])
+
+        # 全部失败：清理对冲请求，抛出主请求异常
+        for failed_index, failed in errors.items():
+            if failed_index:
+                await on_discard(
+                    failed_index, failed, time.monotonic() - started[failed_index]
+                )
+        raise errors[0]
+    except asyncio.CancelledError:
+        for task, index in tasks.items():
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for task, index in tasks.items():
+            await _close(streams[index])
+            if index:
+                await on_discard(index, None, time.monotonic() - started[index])
+        for index, failed in errors.items():
+            if index:
+                await on_discard(index, failed, time.monotonic() - started[index])
+        raise
+
+
+__all__ = ["FirstLineLatency", "hedge_stream", "await_first_line"]
@@ -8,7 +8,8 @@ from typing import Any, AsyncGenerator, Optional, AsyncIterable, List, TypeVar
 
 from app.core.config import get_config
 from app.core.logger import logger
-from app.core.exceptions import StreamIdleTimeoutError
+from app.core.deadline import current_deadline
+from app.core.exceptions import DeadlineExceededError, StreamIdleTimeoutError
 from app.services.grok.utils.download import DownloadService
 
 
@@ -76,12 +77,15 @@ async def _with_idle_timeout(
     """
     包装异步迭代器，添加空闲超时检测
 
+    存在请求截止时间时，每次等待不超过剩余时间，到期抛出 DeadlineExceededError。
+
     Args:
         iterable: 原始异步迭代器
         idle_timeout: 空闲超时时间(秒)，0 表示禁用
         model: 模型名称(用于日志)
     """
-    if idle_timeout <= 0:
+    deadline = current_deadline()
+    if idle_timeout <= 0 and deadline is None:
         async for item in iterable:
             yield item
         return
@@ -98,10 +102,24 @@ async def _with_idle_timeout(
             pass
 
     while True:
+        wait = idle_timeout if idle_timeout > 0 else None
+        if deadline is not None:
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                await _maybe_aclose(iterator)
+                raise DeadlineExceededError(deadline.timeout, "stream")
+            wait = remaining if wait is None else min(wait, remaining)
         try:
-            item = await asyncio.wait_for(iterator.__anext__(), timeout=idle_timeout)
+            item = await asyncio.wait_for(iterator.__anext__(), timeout=wait)
             yield item
         except asyncio.TimeoutError:
+            if deadline is not None and deadline.expired:
+                logger.warning(
+                    f"Request deadline exceeded while streaming ({deadline.timeout:g}s)",
+                    extra={"model": model},
+                )
+                await _maybe_aclose(iterator)
+                raise DeadlineExceededError(deadline.timeout, "stream")
             logger.warning(
                 f"Stream idle timeout after {idle_timeout}s",
                 extra={"model": model, "idle_timeout": idle_timeout},
@@ -142,6 +160,11 @@ class BaseProcessor:
         dl_service = self._get_dl()
         return await dl_service.resolve_url(path, self.token, media_type)
 
+    async def render_image(self, url: str, image_id: str = "image") -> str:
+        """渲染图片（按 app.image_format）"""
+        dl_service = self._get_dl()
+        return await dl_service.render_image(url, self.token, image_id)
+
 
 __all__ = [
     "BaseProcessor",
@@ -0,0 +1,89 @@
+"""
+图片渲染队列
+
+modelResponse 中的图片 URL 一出现即在后台开始下载/转换（每个流有并发上限），
+结果按提交顺序取出：流式输出在等待下载时继续转发文本，非流式收集并发渲染后按序拼接。
+"""
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional
+
+from app.core.config import get_config
+from app.core.logger import logger
+
+
+class ImageRenderQueue:
+    """按序输出的并发图片渲染队列（每个流一个实例）"""
+
+    def __init__(
+        self,
+        render: Callable[[str, str], Awaitable[str]],
+        limit: Optional[int] = None,
+    ):
+        """
+        Args:
+            render: 渲染函数 (url, image_id) -> markdown
+            limit: 并发上限，None 时取 chat.image_render_concurrent
+        """
+        if limit is None:
+            limit = get_config("chat.image_render_concurrent", 4)
+        self._render = render
+        self._semaphore = asyncio.Semaphore(max(1, int(limit or 1)))
+        self._tasks: Deque[asyncio.Task] = deque()
+        self._seen = set()
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._tasks)
+
+    def submit(self, url: str):
+        """提交图片 URL（同一 URL 只渲染一次）"""
+        if not url or url in self._seen:
+            return
+        self._seen.add(url)
+        parts = url.split("/")
+        image_id = parts[-2] if len(parts) >= 2 else "image"
+        self._tasks.append(asyncio.create_task(self._run(url, image_id)))
+
+    async def _run(self, url: str, image_id: str) -> str:
+        async with self._semaphore:
+            return await self._render(url, image_id)
+
+    @staticmethod
+    def _result(task: asyncio.Task) -> Optional[str]:
+        if task.cancelled():
+            return None
+        if exc := task.exception():
+            logger.warning(f"Image render failed, skipped: {exc}")
+            return None
+        return task.result()
+
+    def ready(self) -> List[str]:
+        """取出队首已完成的结果（不等待，保持顺序）"""
+        results = []
+        while self._tasks and self._tasks[0].done():
+            if rendered := self._result(self._tasks.popleft()):
+                results.append(rendered)
+        return results
+
+    async def drain(self) -> List[str]:
+        """等待剩余结果并按序返回"""
+        results = []
+        while self._tasks:
+            await asyncio.wait({self._tasks[0]})
+            if rendered := self._result(self._tasks.popleft()):
+                results.append(rendered)
+        return results
+
+    def cancel(self):
+        """取消未完成的渲染"""
+        while self._tasks:
+            task = self._tasks.popleft()
+            if task.done():
+                self._result(task)
+            else:
+                task.cancel()
+
+
+__all__ = ["ImageRenderQueue"]
@@ -6,6 +6,9 @@ from typing import Optional, Set
 
 from app.core.exceptions import UpstreamException
 from app.services.grok.services.model import ModelService
+from app.services.reverse.utils.limiter import THROTTLED_CODE, get_upstream_limiter
+from app.services.reverse.utils.retry import token_fatal_codes
+from app.services.token import EffortType, TokenLease
 
 
 async def pick_token(
@@ -13,13 +16,37 @@ async def pick_token(
     model_id: str,
     tried: Set[str],
     preferred: Optional[str] = None,
-) -> Optional[str]:
+) -> Optional[TokenLease]:
+    """
+    选择 Token 并按模型消耗预留额度
+
+    返回租约（lease.token 为选中的 Token），由调用方在请求结束时凭租约 commit / rollback，
+    或交由 wrap_stream_with_usage 在流结束时自动结算。
+    优先绕开限速器中需要等待的 Token，全部受限时才退回，由请求前的限速等待兜底。
+    """
+    model_info = ModelService.get(model_id)
+    effort = (
+        EffortType.HIGH
+        if (model_info and model_info.cost.value == "high")
+        else EffortType.LOW
+    )
+
     if preferred and preferred not in tried:
-        return preferred
+        lease = token_mgr.reserve(preferred, effort)
+        if lease:
+            return lease
+
+    limiter = get_upstream_limiter()
+    await limiter.sync()
+    throttled = limiter.throttled_tokens()
+    passes = [tried | throttled, tried] if throttled else [tried]
 
     token = None
-    for pool_name in ModelService.pool_candidates_for_model(model_id):
-        token = token_mgr.get_token(pool_name, exclude=tried)
+    for exclude in passes:
+        for pool_name in ModelService.pool_candidates_for_model(model_id):
+            token = token_mgr.get_token(pool_name, exclude=exclude)
+            if token:
+                break
         if token:
             break
 
@@ -31,15 +58,38 @@ async def pick_token(
                 if token:
                     break
 
-    return token
+    if not token:
+        return None
+    return token_mgr.reserve(token, effort)
 
 
 def rate_limited(error: Exception) -> bool:
+    """上游确认的限流（429），调用方应冷却该 Token；本地限速器的预估不算"""
     if not isinstance(error, UpstreamException):
         return False
     status = error.details.get("status") if error.details else None
     code = error.details.get("error_code") if error.details else None
+    if code == THROTTLED_CODE:
+        return False
     return status == 429 or code == "rate_limit_exceeded"
 
 
-__all__ = ["pick_token", "rate_limited"]
+def locally_throttled(error: Exception) -> bool:
+    """本地限速器预估该 Token 需要等待过久，应换 Token 但不冷却"""
+    if not isinstance(error, UpstreamException) or not error.details:
+        return False
+    return (
+        error.details.get("error_code") == THROTTLED_CODE
+        and error.details.get("status") == 429
+    )
+
+
+def token_fatal(error: Exception) -> bool:
+    """Token 级致命错误（如 SSO 过期），同一 Token 重试不会成功，应换 Token"""
+    if not isinstance(error, UpstreamException):
+        return False
+    status = error.details.get("status") if error.details else None
+    return status in token_fatal_codes()
+
+
+__all__ = ["pick_token", "rate_limited", "locally_throttled", "token_fatal"]
@@ -0,0 +1,104 @@
+"""
+SSE chunk encoding.
+
+chat.completion.chunk 的信封（id / object / created / model / system_fingerprint）
+每个流只编码一次，缓存为前缀字节；逐 token 只拼接 JSON 转义后的内容，直接产出 bytes 交给
+StreamingResponse。id 或 fingerprint 变化（如首行取得 responseId）时才重新编码。
+"""
+
+import uuid
+from typing import Any, Optional, Tuple
+
+import orjson
+
+DONE = b"data: [DONE]\n\n"
+
+_DELTA_OPEN = b',"choices":[{"index":0,"delta":'
+_CONTENT_OPEN = b'{"content":'
+_CONTENT_TAIL = b'},"logprobs":null,"finish_reason":null}]}\n\n'
+_FINISH_OPEN = b',"logprobs":null,"finish_reason":'
+_FINISH_TAIL = b"}]}\n\n"
+
+
+class ChunkEncoder:
+    """chat.completion.chunk 编码器（每个流一个实例）"""
+
+    __slots__ = ("model", "created", "with_fingerprint", "_fallback_id", "_key", "_head")
+
+    def __init__(self, model: str, created: int, with_fingerprint: bool = True):
+        self.model = model
+        self.created = created
+        self.with_fingerprint = with_fingerprint
+        # 未取得 responseId 前整个流使用同一个 id
+        self._fallback_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        self._key: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._head = b""
+
+    def _envelope(self, response_id: Optional[str], fingerprint: Optional[str]) -> bytes:
+        key = (response_id, fingerprint)
+        if key != self._key:
+            head = {
+                "id": response_id or self._fallback_id,
+                "object": "chat.completion.chunk",
+                "created": self.created,
+                "model": self.model,
+            }
+            if self.with_fingerprint:
+                head["system_fingerprint"] = fingerprint or ""
+            # 去掉末尾的 "}"，后接 choices
+            self._head = b"data: " + orjson.dumps(head)[:-1] + _DELTA_OPEN
+            self._key = key
+        return self._head
+
+    def content(
+        self,
+        text: str,
+        response_id: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> bytes:
+        """内容增量（热路径：只编码 text）"""
+        return b"".join(
+            (
+                self._envelope(response_id, fingerprint),
+                _CONTENT_OPEN,
+                orjson.dumps(text),
+                _CONTENT_TAIL,
+            )
+        )
+
+    def chunk(
+        self,
+        content: str = "",
+        role: Optional[str] = None,
+        finish: Optional[str] = None,
+        response_id: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> bytes:
+        """通用 chunk（role / finish / 空增量）"""
+        if content and not role and finish is None:
+            return self.content(content, response_id, fingerprint)
+        delta = {}
+        if role:
+            delta["role"] = role
+            delta["content"] = ""
+        elif content:
+            delta["content"] = content
+        return b"".join(
+            (
+                self._envelope(response_id, fingerprint),
+                orjson.dumps(delta),
+                _FINISH_OPEN,
+                orjson.dumps(finish),
+                _FINISH_TAIL,
+            )
+        )
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """命名事件（图片流）"""
+    return b"".join(
+        (b"event: ", event.encode(), b"\ndata: ", orjson.dumps(data), b"\n\n")
+    )
+
+
+__all__ = ["ChunkEncoder", "sse_event", "DONE"]
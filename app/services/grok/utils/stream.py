@@ -2,30 +2,51 @@
 流式响应通用工具
 """
 
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Optional
 
 from app.core.logger import logger
 from app.services.grok.services.model import ModelService
-from app.services.token import EffortType
+from app.services.grok.utils.retry import locally_throttled, rate_limited
+from app.services.token import EffortType, TokenLease
 
 
 async def wrap_stream_with_usage(
-    stream: AsyncGenerator, token_mgr, token: str, model: str
+    stream: AsyncGenerator,
+    token_mgr,
+    lease: TokenLease,
+    model: str,
+    started: Optional[float] = None,
 ) -> AsyncGenerator:
     """
-    包装流式响应，在完成时记录使用
+    包装流式响应，完成时结算 Token 租约，失败或取消时回滚，
+    并记录首字节耗时与错误用于 Token 健康评分
 
     Args:
         stream: 原始 AsyncGenerator
         token_mgr: TokenManager 实例
-        token: Token 字符串
+        lease: pick_token / reserve 返回的租约
         model: 模型名称
+        started: 上游请求发起时刻（monotonic），默认为首次迭代时
     """
+    token = lease.token
     success = False
+    if started is None:
+        started = time.monotonic()
+    first = True
     try:
         async for chunk in stream:
+            if first:
+                first = False
+                token_mgr.observe(token, ttfb=time.monotonic() - started)
             yield chunk
         success = True
+    except Exception as e:
+        if not locally_throttled(e):
+            token_mgr.observe(
+                token, rate_limited=rate_limited(e), error=not rate_limited(e)
+            )
+        raise
     finally:
         if success:
             try:
@@ -35,12 +56,14 @@ async def wrap_stream_with_usage(
                     if (model_info and model_info.cost.value == "high")
                     else EffortType.LOW
                 )
-                await token_mgr.consume(token, effort)
+                await token_mgr.commit(lease, effort)
                 logger.debug(
                     f"Stream completed, recorded usage for token {token[:10]}... (effort={effort.value})"
                 )
             except Exception as e:
                 logger.warning(f"Failed to record stream usage: {e}")
+        else:
+            token_mgr.rollback(lease)
 
 
 __all__ = ["wrap_stream_with_usage"]
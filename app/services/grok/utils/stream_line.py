@@ -0,0 +1,74 @@
+"""
+上游流式行的快速解析
+
+长回答中绝大多数行是单个 token：
+{"result":{"response":{"token":"...","isThinking":false,...}}}
+这类行直接在原始字节上识别并取出 token，跳过解码、strip、完整 JSON 解析与逐层 .get；
+图片进度、modelResponse、卡片、llmInfo 等结构性行（以及非 bytes 行）仍走完整解析。
+"""
+
+from typing import Any, Optional, Tuple
+
+import orjson
+
+TOKEN_PREFIX = b'{"result":{"response":{"token":"'
+RESPONSE_ID_MARKER = b'"responseId"'
+THINKING_MARKER = b'"isThinking":true'
+
+_PREFIX_LEN = len(TOKEN_PREFIX)
+_BACKSLASH = 0x5C
+
+
+def _string_end(line: bytes, start: int) -> int:
+    """JSON 字符串结束引号的位置（跳过转义引号），未找到返回 -1"""
+    end = line.find(b'"', start)
+    while end != -1 and line[end - 1] == _BACKSLASH:
+        slashes = 1
+        while line[end - 1 - slashes] == _BACKSLASH:
+            slashes += 1
+        if slashes % 2 == 0:
+            break
+        end = line.find(b'"', end + 1)
+    return end
+
+
+def parse_token_line(
+    line: Any, need_response_id: bool = False
+) -> Optional[Tuple[str, bool]]:
+    """
+    识别单 token 行
+
+    token 之后再出现对象（modelResponse / cardAttachment / 图片进度 / llmInfo 等
+    结构性字段的值都是对象）时交给完整解析；字符串值中的 "{" 只会导致多走一次完整解析。
+
+    Args:
+        line: 上游原始行
+        need_response_id: 调用方尚未取得 responseId 时为 True，含 responseId 的行交给完整解析
+
+    Returns:
+        (token, is_thinking)；非单 token 行返回 None，由调用方完整解析
+    """
+    if type(line) is not bytes or not line.startswith(TOKEN_PREFIX):
+        return None
+    end = line.find(b'"', _PREFIX_LEN)
+    if end != -1 and line[end - 1] == _BACKSLASH:
+        end = _string_end(line, _PREFIX_LEN)
+    if end == -1:
+        return None
+    if line.find(b"{", end) != -1:
+        return None
+    if need_response_id and line.find(RESPONSE_ID_MARKER, end) != -1:
+        return None
+
+    raw = line[_PREFIX_LEN:end]
+    try:
+        if _BACKSLASH in raw:
+            token = orjson.loads(line[_PREFIX_LEN - 1 : end + 1])
+        else:
+            token = raw.decode("utf-8")
+    except (orjson.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return token, line.find(THINKING_MARKER, end) != -1
+
+
+__all__ = ["parse_token_line"]
@@ -0,0 +1,193 @@
+"""
+特殊标签的流式过滤
+
+按 app.filter_tags 删除 <tag ...>...</tag>、<tag .../> 以及孤立的 </tag>，可为指定标签提供
+替换函数（如 xai:tool_usage_card 替换为工具调用摘要）。输入可以按任意位置切分：
+跨 token 的开标签、块内容与闭标签都会被正确识别，状态在 feed 之间保留。
+
+扫描只在 "<" 处停下（str.find），再按首字符分派到候选标签比较，每个字符只检查一次；
+流式输出与非流式收集共用同一实现。
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+_BOUNDARY = frozenset(" \t\r\n/>")
+# 尚不能判定（输入在标签中途结束）
+_PARTIAL = object()
+
+
+class TagFilter:
+    """多标签流式过滤器（每个流一个实例）"""
+
+    __slots__ = (
+        "_dispatch",
+        "_replacements",
+        "_pending",
+        "_tag",
+        "_closer",
+        "_block",
+        "_line_start",
+    )
+
+    def __init__(
+        self,
+        tags: Iterable[str],
+        replacements: Optional[Dict[str, Callable[[str], str]]] = None,
+    ):
+        dispatch: Dict[str, List[str]] = {}
+        for tag in sorted({t for t in tags if t}, key=len, reverse=True):
+            dispatch.setdefault(tag[0], []).append(tag)
+        self._dispatch = {k: tuple(v) for k, v in dispatch.items()}
+        self._replacements = replacements or {}
+        self._pending = ""
+        self._tag: Optional[str] = None
+        self._closer = ""
+        self._block: Optional[List[str]] = None
+        self._line_start = True
+
+    @classmethod
+    def create(
+        cls,
+        tags: Optional[Iterable[str]],
+        replacements: Optional[Dict[str, Callable[[str], str]]] = None,
+    ) -> Optional["TagFilter"]:
+        """标签列表为空时返回 None（不过滤）"""
+        tags = [t for t in (tags or []) if isinstance(t, str) and t]
+        if not tags:
+            return None
+        replacements = {k: v for k, v in (replacements or {}).items() if k in tags}
+        return cls(tags, replacements)
+
+    def _match(self, data: str, i: int):
+        """
+        识别 data[i] 处的 "<" 是否为过滤标签
+
+        Returns:
+            (tag, end, kind)：kind 为 "open" / "self" / "close"，end 为标签结束位置；
+            非过滤标签返回 None；输入不足以判定返回 _PARTIAL
+        """
+        n = len(data)
+        j = i + 1
+        if j >= n:
+            return _PARTIAL
+        closing = data[j] == "/"
+        if closing:
+            j += 1
+            if j >= n:
+                return _PARTIAL
+        candidates = self._dispatch.get(data[j])
+        if not candidates:
+            return None
+        for tag in candidates:
+            end = j + len(tag)
+            if end > n:
+                if tag.startswith(data[j:]):
+                    return _PARTIAL
+                continue
+            if not data.startswith(tag, j):
+                continue
+            if end == n:
+                return _PARTIAL
+            if closing:
+                if data[end] == ">":
+                    return tag, end + 1, "close"
+                continue
+            if data[end] not in _BOUNDARY:
+                continue
+            gt = data.find(">", end)
+            if gt == -1:
+                return _PARTIAL
+            return tag, gt + 1, "self" if data[gt - 1] == "/" else "open"
+        return None
+
+    def _emit(self, out: List[str], text: str):
+        if text:
+            out.append(text)
+            self._line_start = text[-1] == "\n"
+
+    def _replace(self, out: List[str], tag: str, raw: str):
+        replace = self._replacements.get(tag)
+        if not replace:
+            return
+        text = replace(raw)
+        if not text:
+            return
+        # 替换内容独占一行
+        if not self._line_start:
+            text = "\n" + text
+        self._emit(out, text)
+
+    def feed(self, text: str) -> str:
+        """输入一段内容，返回可以输出的部分（不完整的标签留待下次判定）"""
+        if not text:
+            return ""
+        # 常见情况：不在标签内且不含 "<"，原样输出
+        if self._tag is None and not self._pending and "<" not in text:
+            self._line_start = text[-1] == "\n"
+            return text
+        data = self._pending + text if self._pending else text
+        self._pending = ""
+        out: List[str] = []
+        pos = 0
+        n = len(data)
+        while pos < n:
+            if self._tag is None:
+                i = data.find("<", pos)
+                if i == -1:
+                    self._emit(out, data[pos:])
+                    break
+                self._emit(out, data[pos:i])
+                match = self._match(data, i)
+                if match is _PARTIAL:
+                    self._pending = data[i:]
+                    break
+                if match is None:
+                    self._emit(out, "<")
+                    pos = i + 1
+                    continue
+                tag, end, kind = match
+                if kind == "self":
+                    self._replace(out, tag, data[i:end])
+                elif kind == "open":
+                    self._tag = tag
+                    self._closer = f"</{tag}>"
+                    self._block = [data[i:end]] if tag in self._replacements else None
+                pos = end
+                continue
+
+            end = data.find(self._closer, pos)
+            if end == -1:
+                # 末尾可能是被切开的闭标签
+                keep = 0
+                lt = data.rfind("<", max(pos, n - len(self._closer) + 1))
+                if lt != -1 and self._closer.startswith(data[lt:]):
+                    keep = n - lt
+                if self._block is not None:
+                    self._block.append(data[pos : n - keep])
+                self._pending = data[n - keep :] if keep else ""
+                break
+            end += len(self._closer)
+            tag = self._tag
+            self._tag = None
+            if self._block is not None:
+                self._block.append(data[pos:end])
+                block, self._block = "".join(self._block), None
+                self._replace(out, tag, block)
+            pos = end
+        return "".join(out)
+
+    def finish(self) -> str:
+        """流结束：未完成的标签按普通文本输出，未闭合的过滤块丢弃"""
+        pending, self._pending = self._pending, ""
+        if self._tag is not None:
+            self._tag = None
+            self._block = None
+            return ""
+        return pending
+
+    def filter(self, text: str) -> str:
+        """过滤完整文本"""
+        return self.feed(text) + self.finish()
+
+
+__all__ = ["TagFilter"]
@@ -16,10 +16,13 @@ import aiofiles
 from curl_cffi.requests import AsyncSession
 
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import AppException, UpstreamException, ValidationException
 from app.core.logger import logger
 from app.core.storage import DATA_DIR
 from app.services.reverse.assets_upload import AssetsUploadReverse
+from app.services.reverse.utils.proxy_pool import BASE, build_proxies, pick_proxy
+from app.services.reverse.utils.session import get_session_pool
 from app.services.grok.utils.locks import _get_upload_semaphore, _file_lock
 
 
@@ -28,19 +31,21 @@ class UploadService:
 
     def __init__(self):
         self._session: Optional[AsyncSession] = None
+        self._session_key = None
         self._chunk_size = 64 * 1024
 
     async def create(self) -> AsyncSession:
-        """Create or reuse a session."""
+        """Borrow or reuse a pooled session."""
         if self._session is None:
-            self._session = AsyncSession()
+            self._session_key, self._session = get_session_pool().acquire("upload")
         return self._session
 
     async def close(self):
-        """Close the session."""
+        """Release the pooled session."""
         if self._session:
-            await self._session.close()
+            get_session_pool().release(self._session_key)
             self._session = None
+            self._session_key = None
 
     @staticmethod
     def _is_url(value: str) -> bool:
@@ -97,7 +102,7 @@ class UploadService:
 
         local_path = local_dir / name
         lock_name = f"ul_local_{hashlib.sha1(str(local_path).encode()).hexdigest()[:16]}"
-        lock_timeout = max(1, int(get_config("asset.upload_timeout")))
+        lock_timeout = max(1, int(clamp_timeout(get_config("asset.upload_timeout"))))
         async with _file_lock(lock_name, timeout=lock_timeout):
             if not local_path.exists():
                 raise ValidationException(f"Local file not found: {local_path}")
@@ -135,11 +140,10 @@ class UploadService:
                         return await self._read_local_file(local_type, name)
 
             lock_name = f"ul_url_{hashlib.sha1(url.encode()).hexdigest()[:16]}"
-            timeout = float(get_config("asset.upload_timeout"))
-            proxy_url = get_config("proxy.base_proxy_url")
-            proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
+            timeout = clamp_timeout(float(get_config("asset.upload_timeout")))
+            proxies = build_proxies(pick_proxy(BASE))
 
-            lock_timeout = max(1, int(get_config("asset.upload_timeout")))
+            lock_timeout = max(1, int(clamp_timeout(get_config("asset.upload_timeout"))))
             async with _file_lock(lock_name, timeout=lock_timeout):
                 session = await self.create()
                 response = await session.get(url, timeout=timeout, proxies=proxies)
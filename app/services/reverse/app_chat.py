@@ -8,9 +8,11 @@ from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.proxy_pool import BASE, build_proxies, pick_proxy
 from app.services.reverse.utils.retry import retry_on_status
 
 CHAT_API = "https://grok.com/rest/app-chat/conversations/new"
@@ -106,8 +108,8 @@ class AppChatReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            proxies = {"http": base_proxy, "https": base_proxy} if base_proxy else None
+            base_proxy = pick_proxy(BASE, token)
+            proxies = build_proxies(base_proxy)
 
             # Build headers
             headers = build_headers(
@@ -138,10 +140,12 @@ class AppChatReverse:
             )
 
             # Curl Config
-            timeout = max(
-                float(get_config("chat.timeout") or 0),
-                float(get_config("video.timeout") or 0),
-                float(get_config("image.timeout") or 0),
+            timeout = clamp_timeout(
+                max(
+                    float(get_config("chat.timeout") or 0),
+                    float(get_config("video.timeout") or 0),
+                    float(get_config("image.timeout") or 0),
+                )
             )
             browser = get_config("proxy.browser")
 
@@ -171,7 +175,11 @@ class AppChatReverse:
                     )
                     raise UpstreamException(
                         message=f"AppChatReverse: Chat failed, {response.status_code}",
-                        details={"status": response.status_code, "body": content},
+                        details={
+                            "status": response.status_code,
+                            "retry_after": response.headers.get("Retry-After"),
+                            "body": content,
+                        },
                     )
 
                 return response
@@ -187,7 +195,13 @@ class AppChatReverse:
                     return status
                 return None
 
-            response = await retry_on_status(_do_request, extract_status=extract_status)
+            response = await retry_on_status(
+                _do_request,
+                extract_status=extract_status,
+                breaker="app-chat",
+                proxy=base_proxy,
+                token=token,
+            )
 
             # Stream response
             async def stream_response():
@@ -12,9 +12,11 @@ from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.proxy_pool import ASSET, build_proxies, pick_proxy
 from app.services.reverse.utils.retry import retry_on_status
 
 DOWNLOAD_API = "https://assets.grok.com"
@@ -83,10 +85,8 @@ class AssetsDownloadReverse:
             url = f"{DOWNLOAD_API}{file_path}"
 
             # Get proxies
-            base_proxy = (get_config("proxy.base_proxy_url") or "").strip()
-            asset_proxy = (get_config("proxy.asset_proxy_url") or "").strip()
-            proxy_url = asset_proxy or base_proxy
-            proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
+            proxy_url = pick_proxy(ASSET, token)
+            proxies = build_proxies(proxy_url)
 
             # Guess content type by extension for Accept/Sec-Fetch-Dest
             content_type = _CONTENT_TYPES.get(Path(urllib.parse.urlparse(file_path).path).suffix.lower())
@@ -107,7 +107,7 @@ class AssetsDownloadReverse:
             headers["Upgrade-Insecure-Requests"] = "1"
 
             # Curl Config
-            timeout = get_config("asset.download_timeout")
+            timeout = clamp_timeout(get_config("asset.download_timeout"))
             browser = get_config("proxy.browser")
 
             async def _single_get(*, use_impersonate: bool, use_proxy: bool):
@@ -129,7 +129,10 @@ class AssetsDownloadReverse:
                     )
                     raise UpstreamException(
                         message=f"AssetsDownloadReverse: Download failed, {response.status_code}",
-                        details={"status": response.status_code},
+                        details={
+                            "status": response.status_code,
+                            "retry_after": response.headers.get("Retry-After"),
+                        },
                     )
                 return response
 
@@ -166,7 +169,9 @@ class AssetsDownloadReverse:
                             )
                         return fallback_resp
 
-            return await retry_on_status(_do_request)
+            return await retry_on_status(
+                _do_request, breaker="assets", proxy=proxy_url, token=token
+            )
 
         except Exception as e:
             # Handle upstream exception
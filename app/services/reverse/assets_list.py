@@ -7,9 +7,11 @@ from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.proxy_pool import ASSET, build_proxies, pick_proxy
 from app.services.reverse.utils.retry import retry_on_status
 
 LIST_API = "https://grok.com/rest/assets"
@@ -32,12 +34,8 @@ class AssetsListReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            assert_proxy = get_config("proxy.asset_proxy_url")
-            if assert_proxy:
-                proxies = {"http": assert_proxy, "https": assert_proxy}
-            else:
-                proxies = {"http": base_proxy, "https": base_proxy}
+            asset_proxy = pick_proxy(ASSET, token)
+            proxies = build_proxies(asset_proxy)
 
             # Build headers
             headers = build_headers(
@@ -48,7 +46,7 @@ class AssetsListReverse:
             )
 
             # Curl Config
-            timeout = get_config("asset.list_timeout")
+            timeout = clamp_timeout(get_config("asset.list_timeout"))
             browser = get_config("proxy.browser")
 
             async def _do_request():
@@ -68,12 +66,17 @@ class AssetsListReverse:
                     )
                     raise UpstreamException(
                         message=f"AssetsListReverse: List failed, {response.status_code}",
-                        details={"status": response.status_code},
+                        details={
+                            "status": response.status_code,
+                            "retry_after": response.headers.get("Retry-After"),
+                        },
                     )
 
                 return response
 
-            return await retry_on_status(_do_request)
+            return await retry_on_status(
+                _do_request, breaker="assets", proxy=asset_proxy, token=token
+            )
 
         except Exception as e:
             # Handle upstream exception
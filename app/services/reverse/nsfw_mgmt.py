@@ -6,8 +6,10 @@ from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import UpstreamException
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.proxy_pool import BASE, build_proxies, pick_proxy
 from app.services.reverse.utils.retry import retry_on_status
 from app.services.reverse.utils.grpc import GrpcClient, GrpcStatus
 
@@ -30,8 +32,8 @@ class NsfwMgmtReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            proxies = {"http": base_proxy, "https": base_proxy} if base_proxy else None
+            base_proxy = pick_proxy(BASE, token)
+            proxies = build_proxies(base_proxy)
 
             # Build headers
             headers = build_headers(
@@ -54,7 +56,7 @@ class NsfwMgmtReverse:
             payload = GrpcClient.encode_payload(protobuf)
 
             # Curl Config
-            timeout = get_config("nsfw.timeout")
+            timeout = clamp_timeout(get_config("nsfw.timeout"))
             browser = get_config("proxy.browser")
 
             async def _do_request():
@@ -74,14 +76,19 @@ class NsfwMgmtReverse:
                     )
                     raise UpstreamException(
                         message=f"NsfwMgmtReverse: Request failed, {response.status_code}",
-                        details={"status": response.status_code},
+                        details={
+                            "status": response.status_code,
+                            "retry_after": response.headers.get("Retry-After"),
+                        },
                     )
 
                 logger.debug(f"NsfwMgmtReverse: Request successful, {response.status_code}")
 
                 return response
 
-            response = await retry_on_status(_do_request)
+            response = await retry_on_status(
+                _do_request, breaker="nsfw-mgmt", proxy=base_proxy, token=token
+            )
 
             _, trailers = GrpcClient.parse_response(
                 response.content,
@@ -9,8 +9,10 @@ from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import UpstreamException
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.proxy_pool import BASE, build_proxies, pick_proxy
 from app.services.reverse.utils.retry import retry_on_status
 
 SET_BIRTH_API = "https://grok.com/rest/auth/set-birth-date"
@@ -32,8 +34,8 @@ class SetBirthReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            proxies = {"http": base_proxy, "https": base_proxy} if base_proxy else None
+            base_proxy = pick_proxy(BASE, token)
+            proxies = build_proxies(base_proxy)
 
             # Build headers
             headers = build_headers(
@@ -58,7 +60,7 @@ class SetBirthReverse:
             }
 
             # Curl Config
-            timeout = get_config("nsfw.timeout")
+            timeout = clamp_timeout(get_config("nsfw.timeout"))
             browser = get_config("proxy.browser")
 
             async def _do_request():
@@ -78,14 +80,19 @@ class SetBirthReverse:
                     )
                     raise UpstreamException(
                         message=f"SetBirthReverse: Request failed, {response.status_code}",
-                        details={"status": response.status_code},
+                        details={
+                            "status": response.status_code,
+                            "retry_after": response.headers.get("Retry-After"),
+                        },
                     )
 
                 logger.debug(f"SetBirthReverse: Request successful, {response.status_code}")
 
                 return response
 
-            return await retry_on_status(_do_request)
+            return await retry_on_status(
+                _do_request, breaker="set-birth", proxy=base_proxy, token=token
+            )
 
         except Exception as e:
             # Handle upstream exception
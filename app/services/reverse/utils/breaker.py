@@ -0,0 +1,209 @@
+"""
+Circuit breakers for reverse interfaces.
+
+按上游端点（app-chat / rate-limits / assets / imagine-ws ...）与代理分别熔断：
+
+- closed：正常放行，连续失败达到阈值后进入 open
+- open：快速失败，冷却 retry.breaker_recovery_sec 后进入 half-open
+- half-open：只放行少量探测请求，成功则关闭，失败则重新打开
+
+只有传输错误与 5xx 计为失败；401/403/429 属于 Token 级问题，不影响熔断。
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import get_config
+from app.core.exceptions import UpstreamException
+from app.core.logger import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_SEC = 30.0
+# half-open 状态下同时放行的探测请求数
+HALF_OPEN_MAX_PROBES = 1
+
+
+def _setting(key: str, default: float) -> float:
+    try:
+        return float(get_config(f"retry.{key}", default))
+    except (TypeError, ValueError):
+        return default
+
+
+def is_breaker_failure(status: Optional[int]) -> bool:
+    """是否计为熔断失败（None 表示传输层错误）"""
+    return status is None or status >= 500
+
+
+class CircuitBreaker:
+    """单个熔断器"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+
+    def _recovery_sec(self) -> float:
+        return max(0.0, _setting("breaker_recovery_sec", DEFAULT_RECOVERY_SEC))
+
+    def retry_after(self) -> float:
+        """距离进入 half-open 的剩余秒数"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self._recovery_sec() - time.monotonic())
+
+    def allow(self) -> bool:
+        """是否放行请求（half-open 时占用一个探测名额）"""
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self.total_rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.probes = 0
+            logger.info(f"CircuitBreaker: {self.name} half-open")
+        if self.state == HALF_OPEN:
+            if self.probes >= HALF_OPEN_MAX_PROBES:
+                self.total_rejected += 1
+                return False
+            self.probes += 1
+        return True
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info(f"CircuitBreaker: {self.name} closed")
+        self.state = CLOSED
+        self.failures = 0
+        self.probes = 0
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.failures += 1
+        threshold = max(1, int(_setting("breaker_failure_threshold", DEFAULT_FAILURE_THRESHOLD)))
+        if self.state == HALF_OPEN or self.failures >= threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    f"CircuitBreaker: {self.name} open after {self.failures} failures"
+                )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.probes = 0
+
+    def release_probe(self):
+        """探测请求未得出结论（如 Token 级错误）时归还名额"""
+        if self.state == HALF_OPEN and self.probes > 0:
+            self.probes -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": round(self.retry_after(), 1),
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def _enabled() -> bool:
+    return bool(get_config("retry.breaker_enabled", True))
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """获取（或创建）熔断器"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def breaker_names(endpoint: Optional[str], proxy: Optional[str]) -> List[str]:
+    """端点与代理对应的熔断器名称"""
+    if not endpoint or not _enabled():
+        return []
+    return [f"endpoint:{endpoint}", f"proxy:{(proxy or '').strip() or 'direct'}"]
+
+
+def breaker_guard(names: List[str]) -> List[CircuitBreaker]:
+    """
+    检查熔断器，全部放行时返回占用的熔断器列表
+
+    Raises:
+        UpstreamException: 任一熔断器打开（status 503, error_code circuit_open）
+    """
+    admitted: List[CircuitBreaker] = []
+    for name in names:
+        breaker = get_breaker(name)
+        if not breaker.allow():
+            for item in admitted:
+                item.release_probe()
+            raise UpstreamException(
+                message=f"Circuit breaker open: {name}",
+                details={
+                    "status": 503,
+                    "error_code": "circuit_open",
+                    "breaker": name,
+                    "retry_after": round(breaker.retry_after(), 1),
+                },
+                status_code=503,
+            )
+        admitted.append(breaker)
+    return admitted
+
+
+def breaker_record(breakers: List[CircuitBreaker], status: Optional[int], ok: bool):
+    """记录一次请求结果"""
+    for breaker in breakers:
+        if ok:
+            breaker.record_success()
+        elif is_breaker_failure(status):
+            breaker.record_failure()
+        else:
+            # 上游已正常响应（Token 级错误），说明链路可用
+            breaker.record_success()
+
+
+def breaker_release(breakers: List[CircuitBreaker]):
+    """请求被取消，归还探测名额"""
+    for breaker in breakers:
+        breaker.release_probe()
+
+
+def breaker_snapshot() -> List[dict]:
+    """全部熔断器状态"""
+    return [breaker.snapshot() for breaker in _breakers.values()]
+
+
+def reset_breakers(name: Optional[str] = None) -> int:
+    """重置熔断器，返回重置数量"""
+    targets = [_breakers[name]] if name in _breakers else (
+        [] if name else list(_breakers.values())
+    )
+    for breaker in targets:
+        breaker.record_success()
+        breaker.total_failures = 0
+        breaker.total_rejected = 0
+    return len(targets)
+
+
+__all__ = [
+    "CircuitBreaker",
+    "get_breaker",
+    "breaker_names",
+    "breaker_guard",
+    "breaker_record",
+    "breaker_release",
+    "breaker_snapshot",
+    "reset_breakers",
+    "is_breaker_failure",
+]
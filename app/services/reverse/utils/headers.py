@@ -2,13 +2,78 @@
 
 import uuid
 import orjson
+from functools import lru_cache
+from types import MappingProxyType
 from urllib.parse import urlparse
-from typing import Dict, Optional
+from typing import Dict, Mapping, Optional
 
-from app.core.logger import logger
-from app.core.config import get_config
+from app.core.logger import logger, is_debug_enabled
+from app.core.config import config, get_config
 from app.services.reverse.utils.statsig import StatsigGenerator
 
+DEFAULT_ORIGIN = "https://grok.com"
+DEFAULT_REFERER = "https://grok.com/"
+
+_MEDIA_CONTENT_TYPES = frozenset({"image/jpeg", "image/png", "video/mp4", "video/webm"})
+_DOCUMENT_ACCEPT = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7"
+
+
+@lru_cache(maxsize=4)
+def _cf_clearance_suffix(config_version: int) -> str:
+    cf_clearance = get_config("proxy.cf_clearance")
+    return f";cf_clearance={cf_clearance}" if cf_clearance else ""
+
+
+@lru_cache(maxsize=64)
+def _header_template(
+    origin: str, referer: str, content_type: Optional[str], config_version: int
+) -> Mapping[str, str]:
+    """
+    Build the immutable header template for (origin, referer, content_type, config version).
+
+    Per-request values (Cookie, x-statsig-id, x-xai-request-id) are empty
+    placeholders so the final header order stays unchanged.
+    """
+    headers = {
+        "Accept-Encoding": "gzip, deflate, br, zstd",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        "Baggage": "sentry-environment=production,sentry-release=d6add6fb0460641fd482d767a335ef72b9b6abb8,sentry-public_key=b311e0f2690c81f25e2c4cf6d4f7ce1c",
+        "Origin": origin,
+        "Priority": "u=1, i",
+        "Referer": referer,
+        "Sec-Ch-Ua": '"Google Chrome";v="136", "Chromium";v="136", "Not(A:Brand";v="24"',
+        "Sec-Ch-Ua-Arch": "arm",
+        "Sec-Ch-Ua-Bitness": "64",
+        "Sec-Ch-Ua-Mobile": "?0",
+        "Sec-Ch-Ua-Model": "",
+        "Sec-Ch-Ua-Platform": '"macOS"',
+        "Sec-Fetch-Mode": "cors",
+        "User-Agent": get_config("proxy.user_agent"),
+        "Cookie": "",
+    }
+
+    # Content-Type and Accept/Sec-Fetch-Dest
+    if content_type in _MEDIA_CONTENT_TYPES:
+        headers["Content-Type"] = content_type
+        headers["Accept"] = _DOCUMENT_ACCEPT
+        headers["Sec-Fetch-Dest"] = "document"
+    else:
+        headers["Content-Type"] = "application/json"
+        headers["Accept"] = "*/*"
+        headers["Sec-Fetch-Dest"] = "empty"
+
+    # Sec-Fetch-Site
+    origin_domain = urlparse(origin).hostname
+    referer_domain = urlparse(referer).hostname
+    if origin_domain and referer_domain and origin_domain == referer_domain:
+        headers["Sec-Fetch-Site"] = "same-origin"
+    else:
+        headers["Sec-Fetch-Site"] = "same-site"
+
+    headers["x-statsig-id"] = ""
+    headers["x-xai-request-id"] = ""
+    return MappingProxyType(headers)
+
 
 def build_sso_cookie(sso_token: str) -> str:
     """
@@ -27,11 +92,7 @@ def build_sso_cookie(sso_token: str) -> str:
     cookie = f"sso={sso_token}; sso-rw={sso_token}"
 
     # CF Clearance
-    cf_clearance = get_config("proxy.cf_clearance")
-    if cf_clearance:
-        cookie += f";cf_clearance={cf_clearance}"
-
-    return cookie
+    return cookie + _cf_clearance_suffix(config.version)
 
 
 def build_ws_headers(token: Optional[str] = None, origin: Optional[str] = None, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
@@ -76,57 +137,26 @@ def build_headers(cookie_token: str, content_type: Optional[str] = None, origin:
     Returns:
         Dict[str, str]: The headers dictionary.
     """
-    headers = {
-        "Accept-Encoding": "gzip, deflate, br, zstd",
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        "Baggage": "sentry-environment=production,sentry-release=d6add6fb0460641fd482d767a335ef72b9b6abb8,sentry-public_key=b311e0f2690c81f25e2c4cf6d4f7ce1c",
-        "Origin": origin or "https://grok.com",
-        "Priority": "u=1, i",
-        "Referer": referer or "https://grok.com/",
-        "Sec-Ch-Ua": '"Google Chrome";v="136", "Chromium";v="136", "Not(A:Brand";v="24"',
-        "Sec-Ch-Ua-Arch": "arm",
-        "Sec-Ch-Ua-Bitness": "64",
-        "Sec-Ch-Ua-Mobile": "?0",
-        "Sec-Ch-Ua-Model": "",
-        "Sec-Ch-Ua-Platform": '"macOS"',
-        "Sec-Fetch-Mode": "cors",
-        "User-Agent": get_config("proxy.user_agent"),
-    }
-
-    # Cookie
+    # Template (Content-Type only selects between JSON and media variants)
+    if content_type not in _MEDIA_CONTENT_TYPES:
+        content_type = None
+    headers = _header_template(
+        origin or DEFAULT_ORIGIN,
+        referer or DEFAULT_REFERER,
+        content_type,
+        config.version,
+    ).copy()
+
+    # Per-request overlay: Cookie, X-Statsig-ID and X-XAI-Request-ID
     headers["Cookie"] = build_sso_cookie(cookie_token)
-
-    # Content-Type and Accept/Sec-Fetch-Dest
-    if content_type and content_type == "application/json":
-        headers["Content-Type"] = "application/json"
-        headers["Accept"] = "*/*"
-        headers["Sec-Fetch-Dest"] = "empty"
-    elif content_type in ["image/jpeg", "image/png", "video/mp4", "video/webm"]:
-        headers["Content-Type"] = content_type
-        headers["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7"
-        headers["Sec-Fetch-Dest"] = "document"
-    else:
-        headers["Content-Type"] = "application/json"
-        headers["Accept"] = "*/*"
-        headers["Sec-Fetch-Dest"] = "empty"
-
-    # Sec-Fetch-Site
-    origin_domain = urlparse(headers.get("Origin", "")).hostname
-    referer_domain = urlparse(headers.get("Referer", "")).hostname
-    if origin_domain and referer_domain and origin_domain == referer_domain:
-        headers["Sec-Fetch-Site"] = "same-origin"
-    else:
-        headers["Sec-Fetch-Site"] = "same-site"
-
-    # X-Statsig-ID and X-XAI-Request-ID
     headers["x-statsig-id"] = StatsigGenerator.gen_id()
     headers["x-xai-request-id"] = str(uuid.uuid4())
 
     # Print headers without Cookie
-    safe_headers = dict(headers)
-    if "Cookie" in safe_headers:
+    if is_debug_enabled():
+        safe_headers = dict(headers)
         safe_headers["Cookie"] = "<redacted>"
-    logger.debug(f"Built headers: {orjson.dumps(safe_headers).decode()}")
+        logger.debug(f"Built headers: {orjson.dumps(safe_headers).decode()}")
 
     return headers
 
@@ -0,0 +1,416 @@
+"""
+Proactive upstream rate limiter.
+
+按 SSO Token 与上游端点分别维护令牌桶，速率从观测到的 429 / Retry-After 中学习，
+在请求发出前延迟或改道，避免浪费一次必然被限流的往返：
+
+- 未触发过 429 的键不限速，只以两个固定窗口计数估算当前请求速率
+- 收到 429：以当时的观测速率为上限学习速率（乘性减），并按 Retry-After 暂停；
+  429 默认归因于 Token，短时间内多个 Token 在同一端点被限流时才学习端点限速
+- 持续无 429：每个恢复周期速率放大一次，超过学习上限后解除限速
+- Redis 存储时，学习到的速率与暂停时间写入共享哈希，各 worker 定期拉取合并
+  （令牌桶本身仍在各 worker 本地计量）
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional, Set
+
+import orjson
+
+from app.core.config import get_config
+from app.core.deadline import remaining_time
+from app.core.exceptions import UpstreamException
+from app.core.logger import logger
+from app.core.ratelimit import TokenBucket
+from app.core.storage import RedisStorage, get_storage
+
+TOKEN = "token"
+ENDPOINT = "endpoint"
+
+# 观测速率的统计窗口（秒）
+METER_WINDOW_SEC = 30.0
+# 学习速率所需的最少观测请求数（样本不足时只按 Retry-After 暂停）
+MIN_SAMPLES = 5
+# 学习速率下限（请求 / 秒）
+MIN_RATE = 0.02
+# 429 时的速率乘数
+DECREASE_FACTOR = 0.5
+# 恢复周期（秒）与每周期速率放大倍数
+RECOVERY_INTERVAL_SEC = 60.0
+INCREASE_FACTOR = 1.5
+# 令牌桶容量（秒数 × 速率），至少为 1
+BURST_SEC = 2.0
+# Retry-After 上限（秒），防止异常值长期封禁
+MAX_PAUSE_SEC = 3600.0
+# 端点限速触发条件：窗口（秒）内被 429 的不同 Token 数
+ENDPOINT_VOTE_WINDOW_SEC = 10.0
+ENDPOINT_VOTE_TOKENS = 3
+# Redis 共享状态
+REDIS_KEY = "grok2api:ratelimit"
+SYNC_INTERVAL_SEC = 2.0
+DEFAULT_MAX_WAIT_SEC = 5.0
+# 本地限速拒绝的 error_code（不是上游 429，调用方换 Token 但不冷却）
+THROTTLED_CODE = "upstream_throttled"
+
+
+def _normalize(kind: str, key: str) -> str:
+    if kind == TOKEN and key.startswith("sso="):
+        key = key[4:]
+    return key
+
+
+class _KeyState:
+    """单个键的观测与学习状态"""
+
+    __slots__ = (
+        "window_start",
+        "count",
+        "prev_count",
+        "rate",
+        "ceiling",
+        "pause_until",
+        "changed_at",
+        "updated",
+        "bucket",
+    )
+
+    def __init__(self):
+        self.window_start = time.monotonic()
+        self.count = 0
+        self.prev_count = 0
+        self.rate = 0.0  # 0 表示不限速
+        self.ceiling = 0.0
+        self.pause_until = 0.0  # wall clock，可跨 worker 共享
+        self.changed_at = 0.0  # 上次学习 / 恢复（monotonic）
+        self.updated = 0.0  # 上次写入共享状态（wall clock）
+        self.bucket: Optional[TokenBucket] = None
+
+    def _roll(self, now: float):
+        elapsed = now - self.window_start
+        if elapsed >= METER_WINDOW_SEC:
+            self.prev_count = self.count if elapsed < 2 * METER_WINDOW_SEC else 0
+            self.count = 0
+            self.window_start = now - (elapsed % METER_WINDOW_SEC)
+
+    def hit(self):
+        now = time.monotonic()
+        self._roll(now)
+        self.count += 1
+
+    def samples(self) -> int:
+        self._roll(time.monotonic())
+        return self.prev_count + self.count
+
+    def observed_rate(self) -> float:
+        now = time.monotonic()
+        self._roll(now)
+        span = METER_WINDOW_SEC + (now - self.window_start)
+        return (self.prev_count + self.count) / span
+
+    @property
+    def limited(self) -> bool:
+        return self.rate > 0 or self.pause_until > time.time()
+
+    def set_rate(self, rate: float):
+        self.rate = rate
+        if rate <= 0:
+            self.bucket = None
+        elif self.bucket is None:
+            self.bucket = TokenBucket(rate, max(1.0, rate * BURST_SEC))
+        else:
+            self.bucket.set_rate(rate)
+            self.bucket.burst = max(1.0, rate * BURST_SEC)
+
+    def wait_time(self) -> float:
+        wait = max(0.0, self.pause_until - time.time())
+        if self.bucket is not None:
+            wait = max(wait, self.bucket.wait_time())
+        return wait
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(
+            {
+                "rate": self.rate,
+                "ceiling": self.ceiling,
+                "pause_until": self.pause_until,
+                "updated": self.updated,
+            }
+        )
+
+    def snapshot(self, key: str) -> dict:
+        return {
+            "key": key,
+            "rate": round(self.rate, 4),
+            "ceiling": round(self.ceiling, 4),
+            "observed": round(self.observed_rate(), 4),
+            "pause": round(max(0.0, self.pause_until - time.time()), 1),
+            "wait": round(self.wait_time(), 2),
+        }
+
+
+class UpstreamLimiter:
+    """上游限速器"""
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, _KeyState]] = {TOKEN: {}, ENDPOINT: {}}
+        self._votes: Dict[str, Dict[str, float]] = {}
+        self._last_sync = 0.0
+        self._sync_lock = asyncio.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(get_config("retry.rate_limiter_enabled", True))
+
+    @staticmethod
+    def max_wait() -> float:
+        try:
+            return max(0.0, float(get_config("retry.rate_limit_max_wait_sec", DEFAULT_MAX_WAIT_SEC)))
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_WAIT_SEC
+
+    def _state(self, kind: str, key: str) -> _KeyState:
+        states = self._states[kind]
+        state = states.get(key)
+        if state is None:
+            state = states[key] = _KeyState()
+        return state
+
+    # ========== 共享状态 ==========
+
+    @staticmethod
+    def _redis() -> Optional[RedisStorage]:
+        storage = get_storage()
+        return storage if isinstance(storage, RedisStorage) else None
+
+    async def _publish(self, kind: str, key: str, state: _KeyState):
+        storage = self._redis()
+        if storage is None:
+            return
+        field = f"{kind}:{key}"
+        try:
+            if state.limited:
+                await storage.redis.hset(REDIS_KEY, field, state.to_json())
+            else:
+                await storage.redis.hdel(REDIS_KEY, field)
+        except Exception as e:
+            logger.debug(f"UpstreamLimiter: publish {kind} failed: {e}")
+
+    async def sync(self, force: bool = False):
+        """拉取其他 worker 学习到的状态（节流）"""
+        now = time.monotonic()
+        if not force and now - self._last_sync < SYNC_INTERVAL_SEC:
+            return
+        storage = self._redis()
+        if storage is None or self._sync_lock.locked():
+            return
+        async with self._sync_lock:
+            self._last_sync = now
+            try:
+                remote = await storage.redis.hgetall(REDIS_KEY)
+            except Exception as e:
+                logger.debug(f"UpstreamLimiter: sync failed: {e}")
+                return
+
+            stale = []
+            wall = time.time()
+            for field, raw in remote.items():
+                field = field.decode() if isinstance(field, bytes) else field
+                kind, _, key = field.partition(":")
+                if kind not in self._states or not key:
+                    continue
+                try:
+                    data = orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    stale.append(field)
+                    continue
+                rate = float(data.get("rate") or 0)
+                pause_until = float(data.get("pause_until") or 0)
+                if rate <= 0 and pause_until <= wall:
+                    stale.append(field)
+                    continue
+                state = self._state(kind, key)
+                updated = float(data.get("updated") or 0)
+                if updated <= state.updated:
+                    continue
+                state.set_rate(rate)
+                state.ceiling = float(data.get("ceiling") or 0)
+                state.pause_until = pause_until
+                state.updated = updated
+                state.changed_at = now
+
+            if stale:
+                try:
+                    await storage.redis.hdel(REDIS_KEY, *stale)
+                except Exception:
+                    pass
+
+    # ========== 学习 ==========
+
+    async def on_rate_limited(self, kind: str, key: Optional[str], retry_after: Optional[float] = None):
+        """观测到 429：学习速率并按 Retry-After 暂停"""
+        if not key or not self.enabled():
+            return
+        key = _normalize(kind, key)
+        state = self._state(kind, key)
+        if state.rate > 0:
+            state.set_rate(max(MIN_RATE, state.rate * DECREASE_FACTOR))
+        elif state.samples() >= MIN_SAMPLES:
+            state.ceiling = state.observed_rate()
+            state.set_rate(max(MIN_RATE, state.ceiling * DECREASE_FACTOR))
+        if retry_after is not None and retry_after > 0:
+            pause = min(retry_after, MAX_PAUSE_SEC)
+            state.pause_until = max(state.pause_until, time.time() + pause)
+        elif state.bucket is not None:
+            # 未给出 Retry-After：清空桶内余量，按学习速率间隔下一次请求
+            state.bucket.try_acquire(state.bucket.burst)
+        state.changed_at = time.monotonic()
+        state.updated = time.time()
+        if not state.limited:
+            return
+        logger.info(
+            f"UpstreamLimiter: {kind} {key[:10]}... limited to {state.rate:.3f} req/s"
+            + (f", paused {retry_after:.1f}s" if retry_after else "")
+        )
+        await self._publish(kind, key, state)
+
+    async def on_success(self, kind: str, key: Optional[str]):
+        """请求成功：达到恢复周期时放大速率，超过学习上限后解除限速"""
+        if not key:
+            return
+        key = _normalize(kind, key)
+        state = self._states[kind].get(key)
+        if state is None or state.rate <= 0:
+            return
+        now = time.monotonic()
+        if now - state.changed_at < RECOVERY_INTERVAL_SEC:
+            return
+        rate = state.rate * INCREASE_FACTOR
+        state.set_rate(0.0 if rate >= max(state.ceiling, MIN_RATE) * 2 else rate)
+        state.changed_at = now
+        state.updated = time.time()
+        if state.rate <= 0:
+            logger.info(f"UpstreamLimiter: {kind} {key[:10]}... limit lifted")
+        await self._publish(kind, key, state)
+
+    def _endpoint_voted(self, endpoint: str, token: Optional[str]) -> bool:
+        """无 Token 的请求直接计入；否则窗口内不同 Token 达到阈值才视为端点限流"""
+        if not token:
+            return True
+        now = time.monotonic()
+        votes = self._votes.setdefault(endpoint, {})
+        votes[_normalize(TOKEN, token)] = now
+        for key in [k for k, ts in votes.items() if now - ts > ENDPOINT_VOTE_WINDOW_SEC]:
+            del votes[key]
+        if len(votes) < ENDPOINT_VOTE_TOKENS:
+            return False
+        votes.clear()
+        return True
+
+    async def record(
+        self,
+        endpoint: Optional[str],
+        token: Optional[str],
+        ok: bool,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        """记录一次上游请求结果"""
+        if ok:
+            await self.on_success(ENDPOINT, endpoint)
+            await self.on_success(TOKEN, token)
+            return
+        if status != 429:
+            return
+        await self.on_rate_limited(TOKEN, token, retry_after)
+        if endpoint and self._endpoint_voted(endpoint, token):
+            await self.on_rate_limited(ENDPOINT, endpoint, retry_after)
+
+    # ========== 调度 ==========
+
+    def throttled_tokens(self) -> Set[str]:
+        """当前需要等待的 Token（选 Token 时优先绕开）"""
+        if not self.enabled():
+            return set()
+        return {
+            key
+            for key, state in self._states[TOKEN].items()
+            if state.limited and state.wait_time() > 0
+        }
+
+    async def acquire(self, endpoint: Optional[str] = None, token: Optional[str] = None):
+        """
+        请求发出前占用端点与 Token 的令牌，必要时等待
+
+        Raises:
+            UpstreamException: 等待时间超过 retry.rate_limit_max_wait_sec
+                （error_code upstream_throttled；Token 受限为 status 429，
+                调用方换 Token 但不冷却，端点受限为 status 503）
+        """
+        targets = [(ENDPOINT, endpoint), (TOKEN, _normalize(TOKEN, token) if token else None)]
+        states = []
+        for kind, key in targets:
+            if not key:
+                continue
+            state = self._state(kind, key)
+            state.hit()
+            states.append((kind, key, state))
+        if not self.enabled():
+            return
+        await self.sync()
+
+        limit = self.max_wait()
+        remaining = remaining_time()
+        if remaining is not None:
+            limit = min(limit, remaining)
+        for kind, key, state in states:
+            if not state.limited:
+                continue
+            wait = state.wait_time()
+            if wait > limit:
+                status = 429 if kind == TOKEN else 503
+                raise UpstreamException(
+                    message=f"Upstream throttled: {kind} {key[:10]}...",
+                    details={
+                        "status": status,
+                        "error_code": THROTTLED_CODE,
+                        "retry_after": round(wait, 1),
+                    },
+                    status_code=status,
+                )
+            pause = max(0.0, state.pause_until - time.time())
+            if pause > 0:
+                await asyncio.sleep(pause)
+            if state.bucket is not None:
+                await state.bucket.acquire()
+
+    def snapshot(self) -> Dict[str, list]:
+        """限速状态（仅列出已学习限速的键，Token 脱敏）"""
+        return {
+            kind: [
+                state.snapshot(f"{key[:10]}..." if kind == TOKEN else key)
+                for key, state in states.items()
+                if state.limited
+            ]
+            for kind, states in self._states.items()
+        }
+
+
+_limiter: Optional[UpstreamLimiter] = None
+
+
+def get_upstream_limiter() -> UpstreamLimiter:
+    """获取上游限速器单例"""
+    global _limiter
+    if _limiter is None:
+        _limiter = UpstreamLimiter()
+    return _limiter
+
+
+__all__ = [
+    "UpstreamLimiter",
+    "get_upstream_limiter",
+    "TOKEN",
+    "ENDPOINT",
+    "THROTTLED_CODE",
+]
@@ -0,0 +1,199 @@
+"""
+Proxy pool for reverse interfaces.
+
+proxy.base_proxy_pool / proxy.asset_proxy_pool 配置多个代理时按健康度分流；
+未配置代理池时退回单个 base_proxy_url / asset_proxy_url，行为与之前一致。
+
+- 每个代理维护 EWMA 延迟与错误率（由请求结果与保活探测更新）
+- 无 Token 时按 1 / (延迟 + 错误惩罚) 加权随机选择
+- 开启 proxy.sticky_proxy 时同一 Token 通过 rendezvous hash 固定到同一代理，
+  代理熔断或不健康时才迁移，账号出口 IP 保持稳定
+"""
+
+import hashlib
+import random
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import get_config
+from app.services.reverse.utils.breaker import OPEN, get_breaker
+
+BASE = "base"
+ASSET = "asset"
+
+# EWMA 平滑系数
+EWMA_ALPHA = 0.3
+# 错误率折算为延迟的惩罚（秒）
+ERROR_PENALTY_SEC = 5.0
+# 错误率超过该值视为不健康（粘性分配会迁移）
+UNHEALTHY_ERROR_RATE = 0.5
+# 无样本时的默认延迟（秒）
+DEFAULT_LATENCY_SEC = 1.0
+# 加权选择的最小延迟（秒），避免极小延迟占据全部流量
+MIN_LATENCY_SEC = 0.05
+
+
+class ProxyStats:
+    """单个代理的健康统计"""
+
+    __slots__ = ("url", "latency", "errors", "samples", "updated_at")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None
+        self.errors = 0.0
+        self.samples = 0
+        self.updated_at = 0.0
+
+    def observe(self, latency: Optional[float] = None, error: bool = False):
+        if latency is not None and not error:
+            sample = max(0.0, latency)
+            self.latency = (
+                sample
+                if self.latency is None
+                else self.latency + EWMA_ALPHA * (sample - self.latency)
+            )
+        self.errors += EWMA_ALPHA * ((1.0 if error else 0.0) - self.errors)
+        self.samples += 1
+        self.updated_at = time.monotonic()
+
+    @property
+    def healthy(self) -> bool:
+        return self.errors < UNHEALTHY_ERROR_RATE
+
+    def cost(self) -> float:
+        latency = self.latency if self.latency is not None else DEFAULT_LATENCY_SEC
+        return max(MIN_LATENCY_SEC, latency) + ERROR_PENALTY_SEC * self.errors
+
+    def snapshot(self) -> dict:
+        return {
+            "url": self.url,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "errors": round(self.errors, 3),
+            "samples": self.samples,
+            "healthy": self.healthy,
+        }
+
+
+def _parse_pool(value) -> List[str]:
+    if isinstance(value, str):
+        value = value.replace("\n", ",").split(",")
+    if not isinstance(value, (list, tuple)):
+        return []
+    urls: List[str] = []
+    for item in value:
+        url = str(item or "").strip()
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _rendezvous(token: str, url: str) -> int:
+    digest = hashlib.blake2b(f"{token}|{url}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def _breaker_open(url: str) -> bool:
+    breaker = get_breaker(f"proxy:{url}")
+    return breaker.state == OPEN and breaker.retry_after() > 0
+
+
+class ProxyPool:
+    """代理池"""
+
+    def __init__(self):
+        self._stats: Dict[str, ProxyStats] = {}
+
+    def candidates(self, kind: str = BASE) -> List[str]:
+        """配置中的代理列表（asset 未配置时退回 base）"""
+        if kind == ASSET:
+            urls = _parse_pool(get_config("proxy.asset_proxy_pool"))
+            if urls:
+                return urls
+            single = (get_config("proxy.asset_proxy_url") or "").strip()
+            if single:
+                return [single]
+        urls = _parse_pool(get_config("proxy.base_proxy_pool"))
+        if urls:
+            return urls
+        single = (get_config("proxy.base_proxy_url") or "").strip()
+        return [single] if single else []
+
+    def stats(self, url: str) -> ProxyStats:
+        stats = self._stats.get(url)
+        if stats is None:
+            stats = self._stats[url] = ProxyStats(url)
+        return stats
+
+    def select(self, kind: str = BASE, token: Optional[str] = None) -> str:
+        """
+        选择代理
+
+        Args:
+            kind: base / asset
+            token: 请求所用 Token（开启粘性时用于固定代理）
+
+        Returns:
+            代理 URL，空字符串表示直连
+        """
+        urls = self.candidates(kind)
+        if len(urls) <= 1:
+            return urls[0] if urls else ""
+
+        usable = [
+            url for url in urls if self.stats(url).healthy and not _breaker_open(url)
+        ]
+        if not usable:
+            usable = [url for url in urls if not _breaker_open(url)] or urls
+
+        if token and get_config("proxy.sticky_proxy", True):
+            key = token[4:] if token.startswith("sso=") else token
+            return max(usable, key=lambda url: _rendezvous(key, url))
+
+        weights = [1.0 / self.stats(url).cost() for url in usable]
+        return random.choices(usable, weights=weights, k=1)[0]
+
+    def observe(self, url: Optional[str], latency: Optional[float] = None, error: bool = False):
+        """记录代理请求结果（直连不统计）"""
+        url = (url or "").strip()
+        if not url:
+            return
+        self.stats(url).observe(latency=latency, error=error)
+
+    def snapshot(self) -> Dict[str, List[dict]]:
+        """代理池状态"""
+        return {
+            kind: [self.stats(url).snapshot() for url in self.candidates(kind)]
+            for kind in (BASE, ASSET)
+        }
+
+
+_proxy_pool: Optional[ProxyPool] = None
+
+
+def get_proxy_pool() -> ProxyPool:
+    """获取代理池单例"""
+    global _proxy_pool
+    if _proxy_pool is None:
+        _proxy_pool = ProxyPool()
+    return _proxy_pool
+
+
+def pick_proxy(kind: str = BASE, token: Optional[str] = None) -> str:
+    """选择代理 URL（空字符串表示直连）"""
+    return get_proxy_pool().select(kind, token)
+
+
+def build_proxies(proxy_url: Optional[str]) -> Optional[Dict[str, str]]:
+    """curl_cffi proxies 参数"""
+    return {"http": proxy_url, "https": proxy_url} if proxy_url else None
+
+
+__all__ = [
+    "ProxyPool",
+    "get_proxy_pool",
+    "pick_proxy",
+    "build_proxies",
+    "BASE",
+    "ASSET",
+]
@@ -4,11 +4,85 @@ Reverse retry utilities.
 
 import asyncio
 import random
-from typing import Callable, Any, Optional
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Any, Iterator, Optional
 
 from app.core.logger import logger
 from app.core.config import get_config
-from app.core.exceptions import UpstreamException
+from app.core.deadline import check_deadline, current_deadline, remaining_time
+from app.core.exceptions import DeadlineExceededError, UpstreamException
+from app.services.reverse.utils.breaker import (
+    breaker_guard,
+    breaker_names,
+    breaker_record,
+    breaker_release,
+    is_breaker_failure,
+)
+from app.services.reverse.utils.limiter import get_upstream_limiter
+from app.services.reverse.utils.proxy_pool import get_proxy_pool
+
+
+DEFAULT_TOKEN_FATAL_CODES = [401, 403]
+
+
+def token_fatal_codes() -> list:
+    """Status codes that will never succeed with the same token."""
+    codes = get_config("retry.token_fatal_status_codes", DEFAULT_TOKEN_FATAL_CODES)
+    return codes if isinstance(codes, list) else DEFAULT_TOKEN_FATAL_CODES
+
+
+class RetryBudget:
+    """
+    Backoff budget of one client request.
+
+    Shared across token switches, so re-picking a token continues with
+    the remaining budget instead of starting over.
+    """
+
+    def __init__(self, budget: Optional[float] = None):
+        self.budget = (
+            float(get_config("retry.retry_budget")) if budget is None else budget
+        )
+        self.spent = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.spent)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.spent >= self.budget
+
+
+_budget_var: ContextVar[Optional[RetryBudget]] = ContextVar(
+    "retry_budget", default=None
+)
+
+
+def current_retry_budget() -> Optional[RetryBudget]:
+    """Budget of the current request scope (None outside a scope)."""
+    return _budget_var.get()
+
+
+@contextmanager
+def retry_budget_scope() -> Iterator[RetryBudget]:
+    """
+    Share one retry budget across every retry_on_status call in the scope.
+
+    Nested scopes reuse the outer budget.
+    """
+    budget = _budget_var.get()
+    if budget is not None:
+        yield budget
+        return
+    budget = RetryBudget()
+    reset_token = _budget_var.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget_var.reset(reset_token)
 
 
 class RetryContext:
@@ -18,10 +92,11 @@ class RetryContext:
         self.attempt = 0
         self.max_retry = int(get_config("retry.max_retry"))
         self.retry_codes = get_config("retry.retry_status_codes")
+        self.fatal_codes = token_fatal_codes()
         self.last_error = None
         self.last_status = None
-        self.total_delay = 0.0
-        self.retry_budget = float(get_config("retry.retry_budget"))
+        self.budget = current_retry_budget() or RetryBudget()
+        self.retry_budget = self.budget.budget
 
         # Backoff parameters
         self.backoff_base = float(get_config("retry.retry_backoff_base"))
@@ -31,12 +106,22 @@ class RetryContext:
         # Decorrelated jitter state
         self._last_delay = self.backoff_base
 
+    @property
+    def total_delay(self) -> float:
+        return self.budget.spent
+
+    def is_token_fatal(self, status_code: int) -> bool:
+        """Token-fatal failures are handed back to the caller to switch tokens."""
+        return status_code in self.fatal_codes
+
     def should_retry(self, status_code: int) -> bool:
         """Check if should retry."""
         if self.attempt >= self.max_retry:
             return False
         if status_code not in self.retry_codes:
             return False
+        if self.is_token_fatal(status_code):
+            return False
         if self.total_delay >= self.retry_budget:
             return False
         return True
@@ -79,7 +164,7 @@ class RetryContext:
 
     def record_delay(self, delay: float):
         """Record delay time."""
-        self.total_delay += delay
+        self.budget.spent += delay
 
 
 def extract_retry_after(error: Exception) -> Optional[float]:
@@ -118,11 +203,23 @@ def extract_retry_after(error: Exception) -> Optional[float]:
     return None
 
 
+def _raw_status(error: Exception) -> Optional[int]:
+    """HTTP status of the failure (None for transport errors)."""
+    if isinstance(error, UpstreamException):
+        if error.details and "status" in error.details:
+            return error.details["status"]
+        return getattr(error, "status_code", None)
+    return None
+
+
 async def retry_on_status(
     func: Callable,
     *args,
     extract_status: Callable[[Exception], Optional[int]] = None,
     on_retry: Callable[[int, int, Exception, float], None] = None,
+    breaker: Optional[str] = None,
+    proxy: Optional[str] = None,
+    token: Optional[str] = None,
     **kwargs,
 ) -> Any:
     """
@@ -133,6 +230,9 @@ async def retry_on_status(
         *args: Function arguments
         extract_status: Function to extract status code from exception
         on_retry: Callback function for retry (attempt, status_code, error, delay)
+        breaker: Endpoint name for circuit breaking (None disables)
+        proxy: Proxy URL used by the request, for the per-proxy breaker and proxy pool stats
+        token: SSO token used by the request, for the per-token rate limiter
         **kwargs: Function keyword arguments
 
     Returns:
@@ -154,9 +254,23 @@ async def retry_on_status(
                 return getattr(e, "status_code", None)
             return None
 
+    names = breaker_names(breaker, proxy)
+    proxy_pool = get_proxy_pool()
+    limiter = get_upstream_limiter()
+
     while ctx.attempt <= ctx.max_retry:
+        # Abandon once the client's deadline has passed
+        check_deadline("upstream request")
+        # Delay (or fail fast) while the endpoint / token is throttled
+        await limiter.acquire(breaker, token)
+        # Fast-fail while a breaker is open
+        admitted = breaker_guard(names)
+        started = time.monotonic()
         try:
             result = await func(*args, **kwargs)
+            breaker_record(admitted, 200, True)
+            proxy_pool.observe(proxy, latency=time.monotonic() - started)
+            await limiter.record(breaker, token, True)
 
             # Record log
             if ctx.attempt > 0:
@@ -167,9 +281,25 @@ async def retry_on_status(
 
             return result
 
+        except asyncio.CancelledError:
+            breaker_release(admitted)
+            raise
         except Exception as e:
+            # Failures caused by the shrunken timeout say nothing about upstream health
+            deadline = current_deadline()
+            if deadline is not None and deadline.expired:
+                breaker_release(admitted)
+                raise DeadlineExceededError(deadline.timeout, "upstream request") from e
+
             # Extract status code
             status_code = extract_status(e)
+            raw_status = _raw_status(e)
+            breaker_record(admitted, raw_status, False)
+            if is_breaker_failure(raw_status):
+                proxy_pool.observe(proxy, error=True)
+            await limiter.record(
+                breaker, token, False, raw_status, extract_retry_after(e)
+            )
 
             if status_code is None:
                 # Error cannot be identified as retryable
@@ -194,6 +324,14 @@ async def retry_on_status(
                     )
                     raise
 
+                # Check if the backoff would outlive the request deadline
+                remaining = remaining_time()
+                if remaining is not None and delay >= remaining:
+                    logger.warning(
+                        f"Request deadline too close for retry: {delay:.2f}s >= {remaining:.2f}s left"
+                    )
+                    raise
+
                 ctx.record_delay(delay)
 
                 logger.warning(
@@ -210,7 +348,11 @@ async def retry_on_status(
                 continue
             else:
                 # Not retryable or retry budget exhausted
-                if status_code in ctx.retry_codes:
+                if ctx.is_token_fatal(status_code):
+                    logger.warning(
+                        f"Token-fatal status {status_code}, not retrying with the same token"
+                    )
+                elif status_code in ctx.retry_codes:
                     logger.error(
                         f"Retry exhausted after {ctx.attempt} attempts, "
                         f"last status: {status_code}, total delay: {ctx.total_delay:.2f}s"
@@ -223,7 +365,11 @@ async def retry_on_status(
 
 
 __all__ = [
+    "RetryBudget",
     "RetryContext",
+    "current_retry_budget",
+    "retry_budget_scope",
+    "token_fatal_codes",
     "retry_on_status",
     "extract_retry_after",
 ]
@@ -0,0 +1,152 @@
+"""
+Shared curl_cffi session pool.
+
+进程内按 (用途, 浏览器指纹) 复用 AsyncSession，保持与上游的 keep-alive 连接，
+避免每次请求都重新进行 TCP + TLS 握手。
+
+- 会话不保存 Cookie（discard_cookies），各请求仍通过请求头携带自己的 Token
+- 代理由各 reverse 接口按请求传入，不参与分池
+- 不同用途（对话、视频、上传、下载等）各自一个池，proxy.pool_max_clients 只限制单个池，
+  嵌套调用（如对话流中下载图片）不会互相占满连接而卡死
+- impersonate 为 None 时不使用浏览器指纹，与直接创建 AsyncSession() 一致
+- 空闲超过 proxy.pool_idle_sec 且无人借用的会话会被关闭
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from curl_cffi.requests import AsyncSession
+
+from app.core.config import get_config
+from app.core.logger import logger
+
+DEFAULT_POOL_MAX_CLIENTS = 100
+DEFAULT_POOL_IDLE_SEC = 300
+# 空闲检查的最小间隔（秒）
+EVICT_CHECK_INTERVAL_SEC = 30
+
+SessionKey = Tuple[int, str, str]
+
+
+class _PooledSession:
+    __slots__ = ("session", "borrowed", "last_used")
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.borrowed = 0
+        self.last_used = time.monotonic()
+
+
+class SessionPool:
+    """curl_cffi AsyncSession 池"""
+
+    def __init__(self):
+        self._sessions: Dict[SessionKey, _PooledSession] = {}
+        self._last_evict = time.monotonic()
+
+    @staticmethod
+    def _int_config(key: str, default: int) -> int:
+        try:
+            return max(1, int(get_config(key, default)))
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def _key(purpose: str, impersonate: Optional[str]) -> SessionKey:
+        # 会话绑定事件循环，不同循环分别建池
+        loop_id = id(asyncio.get_running_loop())
+        return loop_id, purpose, impersonate or ""
+
+    def acquire(
+        self, purpose: str = "default", impersonate: Optional[str] = None
+    ) -> Tuple[SessionKey, AsyncSession]:
+        """
+        借出会话，使用完毕后必须调用 release(key)
+
+        Args:
+            purpose: 用途，不同用途使用独立的连接池
+            impersonate: 浏览器指纹，None 为不模拟浏览器
+        """
+        self._evict_idle()
+        key = self._key(purpose, impersonate)
+        entry = self._sessions.get(key)
+        if entry is None:
+            session = AsyncSession(
+                impersonate=key[2] or None,
+                max_clients=self._int_config(
+                    "proxy.pool_max_clients", DEFAULT_POOL_MAX_CLIENTS
+                ),
+                discard_cookies=True,
+            )
+            entry = self._sessions[key] = _PooledSession(session)
+            logger.debug(
+                f"SessionPool: created session (purpose={key[1]}, "
+                f"impersonate={key[2] or 'none'})"
+            )
+        entry.borrowed += 1
+        entry.last_used = time.monotonic()
+        return key, entry.session
+
+    def release(self, key: SessionKey):
+        """归还会话"""
+        entry = self._sessions.get(key)
+        if entry is None:
+            return
+        entry.borrowed = max(0, entry.borrowed - 1)
+        entry.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def borrow(
+        self, purpose: str = "default", impersonate: Optional[str] = None
+    ) -> AsyncIterator[AsyncSession]:
+        """借用会话（上下文管理器）"""
+        key, session = self.acquire(purpose, impersonate)
+        try:
+            yield session
+        finally:
+            self.release(key)
+
+    def _evict_idle(self):
+        now = time.monotonic()
+        if now - self._last_evict < EVICT_CHECK_INTERVAL_SEC:
+            return
+        self._last_evict = now
+        idle_sec = self._int_config("proxy.pool_idle_sec", DEFAULT_POOL_IDLE_SEC)
+        for key, entry in list(self._sessions.items()):
+            if entry.borrowed == 0 and now - entry.last_used >= idle_sec:
+                del self._sessions[key]
+                asyncio.create_task(self._close_session(entry.session))
+
+    @staticmethod
+    async def _close_session(session: AsyncSession):
+        try:
+            await session.close()
+        except Exception as e:
+            logger.debug(f"SessionPool: close session failed: {e}")
+
+    async def close(self):
+        """关闭全部会话（应用关闭时调用）"""
+        sessions, self._sessions = self._sessions, {}
+        for entry in sessions.values():
+            await self._close_session(entry.session)
+
+
+_session_pool: Optional[SessionPool] = None
+
+
+def get_session_pool() -> SessionPool:
+    """获取会话池单例"""
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = SessionPool()
+    return _session_pool
+
+
+def borrow_session(purpose: str = "default", impersonate: Optional[str] = None):
+    """借用共享会话：async with borrow_session("video") as session: ..."""
+    return get_session_pool().borrow(purpose, impersonate)
+
+
+__all__ = ["SessionPool", "get_session_pool", "borrow_session"]
@@ -0,0 +1,151 @@
+"""
+Connection pre-warming.
+
+启动时以及空闲期间，通过共享会话池向 grok.com / assets.grok.com 维持若干条
+已完成 DNS、代理 CONNECT 与 TLS 握手的连接，避免静默期后的首个请求出现 TTFB 尖峰。
+配置了多个代理时，每个代理都会被探测，结果计入代理池的健康统计。
+"""
+
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+from app.core.config import get_config
+from app.core.logger import logger
+from app.services.reverse.utils.proxy_pool import (
+    ASSET,
+    BASE,
+    build_proxies,
+    get_proxy_pool,
+)
+from app.services.reverse.utils.session import get_session_pool
+
+GROK_URL = "https://grok.com/"
+ASSETS_URL = "https://assets.grok.com/"
+
+DEFAULT_WARM_CONNECTIONS = 2
+DEFAULT_KEEPALIVE_INTERVAL_SEC = 60
+# 单次预热请求超时（秒）
+WARM_REQUEST_TIMEOUT_SEC = 15
+
+
+class ConnectionWarmer:
+    """连接预热与保活"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    @staticmethod
+    def _int_config(key: str, default: int) -> int:
+        try:
+            return max(0, int(get_config(key, default)))
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def _targets() -> List[Tuple[str, str, Optional[str], str]]:
+        """(预热地址, 会话用途, 浏览器指纹, 代理池类型)，与各 reverse 接口使用的会话保持一致"""
+        browser = get_config("proxy.browser") or None
+        return [(GROK_URL, "chat", browser, BASE), (ASSETS_URL, "download", None, ASSET)]
+
+    async def _ping(
+        self, session, url: str, proxy_url: str, browser: Optional[str]
+    ) -> bool:
+        started = time.monotonic()
+        try:
+            # 只关心连接本身，状态码（含 Cloudflare 403）无关紧要
+            await session.head(
+                url,
+                headers={"User-Agent": get_config("proxy.user_agent")},
+                proxies=build_proxies(proxy_url),
+                impersonate=browser,
+                timeout=WARM_REQUEST_TIMEOUT_SEC,
+                allow_redirects=False,
+            )
+            get_proxy_pool().observe(proxy_url, latency=time.monotonic() - started)
+            return True
+        except Exception as e:
+            get_proxy_pool().observe(proxy_url, error=True)
+            logger.debug(f"ConnectionWarmer: ping {url} failed: {e}")
+            return False
+
+    async def warm(self) -> int:
+        """对每个目标、每个代理并发发起请求，返回成功数"""
+        count = self._int_config("proxy.warm_connections", DEFAULT_WARM_CONNECTIONS)
+        pool = get_session_pool()
+        proxy_pool = get_proxy_pool()
+        started = time.monotonic()
+        ok = 0
+        for url, purpose, browser, kind in self._targets():
+            proxy_urls = proxy_pool.candidates(kind) or [""]
+            # 多代理时即使关闭预热也保留一次健康探测
+            per_proxy = max(count, 1 if len(proxy_urls) > 1 else 0)
+            if per_proxy <= 0:
+                continue
+            async with pool.borrow(purpose, browser) as session:
+                results = await asyncio.gather(
+                    *[
+                        self._ping(session, url, proxy_url, browser)
+                        for proxy_url in proxy_urls
+                        for _ in range(per_proxy)
+                    ]
+                )
+            ok += sum(1 for r in results if r)
+        logger.debug(
+            f"ConnectionWarmer: {ok} warm connections "
+            f"({(time.monotonic() - started) * 1000:.0f}ms)"
+        )
+        return ok
+
+    async def _loop(self):
+        logger.info("ConnectionWarmer: started")
+        try:
+            while self._running:
+                try:
+                    await self.warm()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"ConnectionWarmer: warm error - {e}")
+                interval = self._int_config(
+                    "proxy.keepalive_interval_sec", DEFAULT_KEEPALIVE_INTERVAL_SEC
+                )
+                await asyncio.sleep(max(interval, 5))
+        except asyncio.CancelledError:
+            pass
+
+    def start(self):
+        """启动预热任务"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """停止预热任务"""
+        if not self._running:
+            return
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("ConnectionWarmer: stopped")
+
+
+_warmer: Optional[ConnectionWarmer] = None
+
+
+def get_connection_warmer() -> ConnectionWarmer:
+    """获取连接预热器单例"""
+    global _warmer
+    if _warmer is None:
+        _warmer = ConnectionWarmer()
+    return _warmer
+
+
+__all__ = ["ConnectionWarmer", "get_connection_warmer"]
@@ -2,17 +2,32 @@
 WebSocket helpers for reverse interfaces.
 """
 
+import asyncio
 import ssl
+import time
 import certifi
 import aiohttp
 from aiohttp_socks import ProxyConnector
-from typing import Mapping, Optional
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple
 from urllib.parse import urlparse
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.services.reverse.utils.breaker import (
+    breaker_guard,
+    breaker_names,
+    breaker_record,
+    breaker_release,
+    is_breaker_failure,
+)
+from app.services.reverse.utils.proxy_pool import BASE, get_proxy_pool
 
+# 共享会话的 DNS 缓存时长（秒）
+DNS_CACHE_TTL_SEC = 300
 
+
+@lru_cache(maxsize=1)
 def _default_ssl_context() -> ssl.SSLContext:
     context = ssl.create_default_context()
     context.load_verify_locations(certifi.where())
@@ -37,18 +52,23 @@ def _normalize_socks_proxy(proxy_url: str) -> tuple[str, Optional[bool]]:
     return proxy_url, rdns
 
 
-def resolve_proxy(proxy_url: Optional[str] = None, ssl_context: ssl.SSLContext = _default_ssl_context()) -> tuple[aiohttp.BaseConnector, Optional[str]]:
+def resolve_proxy(
+    proxy_url: Optional[str] = None,
+    ssl_context: ssl.SSLContext = _default_ssl_context(),
+    **connector_kwargs: Any,
+) -> tuple[aiohttp.BaseConnector, Optional[str]]:
     """Resolve proxy connector.
     
     Args:
         proxy_url: Optional[str], the proxy URL. Defaults to None.
         ssl_context: ssl.SSLContext, the SSL context. Defaults to _default_ssl_context().
+        **connector_kwargs: extra connector kwargs (limit, ttl_dns_cache, ...).
 
     Returns:
         tuple[aiohttp.BaseConnector, Optional[str]]: The proxy connector and the proxy URL.
     """
     if not proxy_url:
-        return aiohttp.TCPConnector(ssl=ssl_context), None
+        return aiohttp.TCPConnector(ssl=ssl_context, **connector_kwargs), None
 
     scheme = urlparse(proxy_url).scheme.lower()
     if scheme.startswith("socks"):
@@ -57,28 +77,98 @@ def resolve_proxy(proxy_url: Optional[str] = None, ssl_context: ssl.SSLContext =
         try:
             if rdns is not None:
                 return (
-                    ProxyConnector.from_url(normalized, rdns=rdns, ssl=ssl_context),
+                    ProxyConnector.from_url(
+                        normalized, rdns=rdns, ssl=ssl_context, **connector_kwargs
+                    ),
                     None,
                 )
         except TypeError:
-            return ProxyConnector.from_url(normalized, ssl=ssl_context), None
-        return ProxyConnector.from_url(normalized, ssl=ssl_context), None
+            return (
+                ProxyConnector.from_url(normalized, ssl=ssl_context, **connector_kwargs),
+                None,
+            )
+        return (
+            ProxyConnector.from_url(normalized, ssl=ssl_context, **connector_kwargs),
+            None,
+        )
 
     logger.info(f"Using HTTP proxy: {proxy_url}")
-    return aiohttp.TCPConnector(ssl=ssl_context), proxy_url
+    return aiohttp.TCPConnector(ssl=ssl_context, **connector_kwargs), proxy_url
+
+
+class _ClientSessionPool:
+    """
+    按 (事件循环, 代理) 复用的 aiohttp ClientSession
+
+    连接器开启 DNS 缓存；只有 WebSocket 本身按请求建立。
+    连接器不限制连接数（limit=0）：WebSocket 长时间占用连接，设上限会让新的握手在连接池中排队，
+    排队超时又会被误计为熔断器与代理的失败；并发由各业务的信号量控制。
+    """
+
+    def __init__(self) -> None:
+        self._sessions: Dict[
+            Tuple[int, str], Tuple[aiohttp.ClientSession, Optional[str]]
+        ] = {}
+
+    def get(
+        self, proxy_url: Optional[str], ssl_context: ssl.SSLContext
+    ) -> Tuple[aiohttp.ClientSession, Optional[str]]:
+        """获取（或创建）共享会话，返回会话及 ws_connect 需要的 HTTP 代理"""
+        key = (id(asyncio.get_running_loop()), (proxy_url or "").strip())
+        entry = self._sessions.get(key)
+        if entry is not None and not entry[0].closed:
+            return entry
+
+        connector, proxy = resolve_proxy(
+            key[1] or None,
+            ssl_context,
+            limit=0,
+            ttl_dns_cache=DNS_CACHE_TTL_SEC,
+        )
+        # 握手超时由 connect 按请求控制，会话本身不设总超时
+        session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=None)
+        )
+        entry = self._sessions[key] = (session, proxy)
+        return entry
+
+    async def close(self) -> None:
+        """关闭全部共享会话（应用关闭时调用）"""
+        sessions, self._sessions = self._sessions, {}
+        for session, _ in sessions.values():
+            try:
+                await session.close()
+            except Exception as e:
+                logger.debug(f"WebSocket session close failed: {e}")
+
+
+_session_pool = _ClientSessionPool()
+
+
+async def close_websocket_sessions() -> None:
+    """关闭 WebSocket 共享会话"""
+    await _session_pool.close()
 
 
 class WebSocketConnection:
     """WebSocket connection wrapper."""
 
-    def __init__(self, session: aiohttp.ClientSession, ws: aiohttp.ClientWebSocketResponse) -> None:
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        ws: aiohttp.ClientWebSocketResponse,
+        owns_session: bool = True,
+    ) -> None:
         self.session = session
         self.ws = ws
+        self.owns_session = owns_session
 
     async def close(self) -> None:
         if not self.ws.closed:
             await self.ws.close()
-        await self.session.close()
+        # 共享会话由连接池管理，只关闭 WebSocket 本身
+        if self.owns_session:
+            await self.session.close()
 
     async def __aenter__(self) -> aiohttp.ClientWebSocketResponse:
         return self.ws
@@ -91,7 +181,8 @@ class WebSocketClient:
     """WebSocket client with proxy support."""
 
     def __init__(self, proxy: Optional[str] = None) -> None:
-        self.proxy = proxy or get_config("proxy.base_proxy_url")
+        # None: pick from the proxy pool on each connect
+        self.proxy = proxy
         self._ssl_context = _default_ssl_context()
 
     async def connect(
@@ -100,6 +191,8 @@ class WebSocketClient:
         headers: Optional[Mapping[str, str]] = None,
         timeout: Optional[float] = None,
         ws_kwargs: Optional[Mapping[str, object]] = None,
+        breaker: Optional[str] = None,
+        token: Optional[str] = None,
     ) -> WebSocketConnection:
         """Connect to the WebSocket.
         
@@ -107,36 +200,61 @@ class WebSocketClient:
             url: str, the URL to connect to.
             headers: Optional[Mapping[str, str]], the headers to send. Defaults to None.
             ws_kwargs: Optional[Mapping[str, object]], extra ws_connect kwargs. Defaults to None.
+            breaker: Optional[str], endpoint name for circuit breaking. Defaults to None.
+            token: Optional[str], the SSO token, for proxy stickiness. Defaults to None.
 
         Returns:
             WebSocketConnection: The WebSocket connection.
         """
-        # Resolve proxy
-        connector, proxy = resolve_proxy(self.proxy, self._ssl_context)
+        # Shared session per proxy
+        proxy_pool = get_proxy_pool()
+        proxy_url = self.proxy or proxy_pool.select(BASE, token)
+        session, proxy = _session_pool.get(proxy_url, self._ssl_context)
 
-        # Build client timeout
+        # Handshake timeout
         total_timeout = (
             float(timeout)
             if timeout is not None
             else float(get_config("voice.timeout") or 120)
         )
-        client_timeout = aiohttp.ClientTimeout(total=total_timeout)
 
-        # Create session
-        session = aiohttp.ClientSession(connector=connector, timeout=client_timeout)
+        extra_kwargs = dict(ws_kwargs or {})
+        admitted = breaker_guard(breaker_names(breaker, proxy_url))
+        started = time.monotonic()
         try:
-            extra_kwargs = dict(ws_kwargs or {})
-            ws = await session.ws_connect(
-                url,
-                headers=headers,
-                proxy=proxy,
-                ssl=self._ssl_context,
-                **extra_kwargs,
+            ws = await asyncio.wait_for(
+                session.ws_connect(
+                    url,
+                    headers=headers,
+                    proxy=proxy,
+                    ssl=self._ssl_context,
+                    **extra_kwargs,
+                ),
+                timeout=total_timeout,
             )
-            return WebSocketConnection(session, ws)
-        except Exception:
-            await session.close()
+        except asyncio.TimeoutError as e:
+            breaker_record(admitted, None, False)
+            proxy_pool.observe(proxy_url, error=True)
+            raise aiohttp.ServerTimeoutError(
+                f"WebSocket handshake timed out after {total_timeout}s"
+            ) from e
+        except asyncio.CancelledError:
+            breaker_release(admitted)
+            raise
+        except Exception as e:
+            status = getattr(e, "status", None)
+            breaker_record(admitted, status, False)
+            if is_breaker_failure(status):
+                proxy_pool.observe(proxy_url, error=True)
             raise
+        breaker_record(admitted, 101, True)
+        proxy_pool.observe(proxy_url, latency=time.monotonic() - started)
+        return WebSocketConnection(session, ws, owns_session=False)
 
 
-__all__ = ["WebSocketClient", "WebSocketConnection", "resolve_proxy"]
+__all__ = [
+    "WebSocketClient",
+    "WebSocketConnection",
+    "resolve_proxy",
+    "close_websocket_sessions",
+]
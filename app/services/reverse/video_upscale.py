@@ -7,9 +7,11 @@ from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.proxy_pool import BASE, build_proxies, pick_proxy
 from app.services.reverse.utils.retry import retry_on_status
 
 VIDEO_UPSCALE_API = "https://grok.com/rest/media/video/upscale"
@@ -30,8 +32,8 @@ class VideoUpscaleReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            proxies = {"http": base_proxy, "https": base_proxy} if base_proxy else None
+            base_proxy = pick_proxy(BASE, token)
+            proxies = build_proxies(base_proxy)
 
             # Build headers
             headers = build_headers(
@@ -46,7 +48,7 @@ class VideoUpscaleReverse:
             logger.info(f"VideoUpscale request prepared: video_id={video_id}")
 
             # Curl Config
-            timeout = get_config("video.timeout")
+            timeout = clamp_timeout(get_config("video.timeout"))
             browser = get_config("proxy.browser")
 
             async def _do_request():
@@ -71,12 +73,18 @@ class VideoUpscaleReverse:
                     )
                     raise UpstreamException(
                         message=f"VideoUpscaleReverse: Upscale failed, {response.status_code}",
-                        details={"status": response.status_code, "body": content},
+                        details={
+                            "status": response.status_code,
+                            "retry_after": response.headers.get("Retry-After"),
+                            "body": content,
+                        },
                     )
 
                 return response
 
-            return await retry_on_status(_do_request)
+            return await retry_on_status(
+                _do_request, breaker="video-upscale", proxy=base_proxy, token=token
+            )
 
         except Exception as e:
             # Handle upstream exception
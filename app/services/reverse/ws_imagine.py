@@ -161,6 +161,8 @@ class ImagineWebSocketReverse:
                     "heartbeat": 20,
                     "receive_timeout": stream_timeout,
                 },
+                breaker="imagine-ws",
+                token=token,
             )
         except Exception as e:
             status = getattr(e, "status", None)
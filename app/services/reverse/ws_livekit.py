@@ -9,9 +9,11 @@ from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
 from app.core.config import get_config
+from app.core.deadline import clamp_timeout
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers, build_ws_headers
+from app.services.reverse.utils.proxy_pool import BASE, build_proxies, pick_proxy
 from app.services.reverse.utils.retry import retry_on_status
 from app.services.reverse.utils.websocket import WebSocketClient, WebSocketConnection
 
@@ -44,8 +46,8 @@ class LivekitTokenReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            proxies = {"http": base_proxy, "https": base_proxy} if base_proxy else None
+            base_proxy = pick_proxy(BASE, token)
+            proxies = build_proxies(base_proxy)
 
             # Build headers
             headers = build_headers(
@@ -72,7 +74,7 @@ class LivekitTokenReverse:
             }
 
             # Curl Config
-            timeout = get_config("voice.timeout")
+            timeout = clamp_timeout(get_config("voice.timeout"))
             browser = get_config("proxy.browser")
 
             async def _do_request():
@@ -92,12 +94,18 @@ class LivekitTokenReverse:
                     )
                     raise UpstreamException(
                         message=f"LivekitTokenReverse: Request failed, {response.status_code}",
-                        details={"status": response.status_code, "body": response.text},
+                        details={
+                            "status": response.status_code,
+                            "retry_after": response.headers.get("Retry-After"),
+                            "body": response.text,
+                        },
                     )
 
                 return response
 
-            response = await retry_on_status(_do_request)
+            response = await retry_on_status(
+                _do_request, breaker="livekit", proxy=base_proxy, token=token
+            )
             return response
 
         except Exception as e:
@@ -165,7 +173,10 @@ class LivekitWebSocketReverse:
 
         try:
             return await self._client.connect(
-                url, headers=ws_headers, timeout=get_config("voice.timeout")
+                url,
+                headers=ws_headers,
+                timeout=get_config("voice.timeout"),
+                breaker="livekit-ws",
             )
         except Exception as e:
             logger.error(f"LivekitWebSocketReverse: Connect failed, {e}")
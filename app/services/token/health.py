@@ -0,0 +1,92 @@
+"""Token 健康评分（EWMA 延迟与错误率）"""
+
+import math
+import time
+from typing import Optional
+
+# EWMA 平滑系数（越大越偏向最近的样本）
+EWMA_ALPHA = 0.3
+# 评分随时间衰减的半衰期（秒），避免被跳过的 Token 永远拿不到新样本
+HEALTH_HALF_LIFE_SEC = 300
+# 错误率 / 429 率折算为秒的惩罚权重
+ERROR_PENALTY_SEC = 10.0
+RATE_LIMIT_PENALTY_SEC = 5.0
+# 总耗时计入评分的权重：首字节快但流式输出慢 / 卡住的 Token 同样降权
+LATENCY_WEIGHT = 0.1
+
+
+def _ewma(current: Optional[float], sample: float) -> float:
+    if current is None:
+        return sample
+    return current + EWMA_ALPHA * (sample - current)
+
+
+class TokenHealth:
+    """单个 Token 的健康统计"""
+
+    __slots__ = ("ttfb", "latency", "rate_limited", "errors", "samples", "updated_at")
+
+    def __init__(self):
+        self.ttfb: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.rate_limited: float = 0.0
+        self.errors: float = 0.0
+        self.samples: int = 0
+        self.updated_at: float = 0.0
+
+    def observe(
+        self,
+        *,
+        ttfb: Optional[float] = None,
+        latency: Optional[float] = None,
+        rate_limited: bool = False,
+        error: bool = False,
+    ):
+        """
+        记录一次观测
+
+        Args:
+            ttfb: 首字节耗时（秒）
+            latency: 总耗时（秒）
+            rate_limited: 是否被 429
+            error: 是否为传输 / 上游错误
+        """
+        if ttfb is not None:
+            self.ttfb = _ewma(self.ttfb, max(0.0, ttfb))
+        if latency is not None:
+            self.latency = _ewma(self.latency, max(0.0, latency))
+        # 只有完整结果（成功 / 429 / 错误）计入比率，纯延迟样本不影响
+        if ttfb is None or latency is not None or rate_limited or error:
+            self.rate_limited = _ewma(self.rate_limited, 1.0 if rate_limited else 0.0)
+            self.errors = _ewma(self.errors, 1.0 if error else 0.0)
+        self.samples += 1
+        self.updated_at = time.monotonic()
+
+    def score(self, now: Optional[float] = None) -> float:
+        """评分（秒当量，越小越好；随时间衰减回 0）"""
+        if not self.samples:
+            return 0.0
+        base = (self.ttfb or 0.0) + LATENCY_WEIGHT * (self.latency or 0.0)
+        value = (
+            base
+            + ERROR_PENALTY_SEC * self.errors
+            + RATE_LIMIT_PENALTY_SEC * self.rate_limited
+        )
+        age = (now if now is not None else time.monotonic()) - self.updated_at
+        if age > 0:
+            value *= math.pow(0.5, age / HEALTH_HALF_LIFE_SEC)
+        return value
+
+    def snapshot(self) -> dict:
+        """统计快照"""
+        return {
+            "ttfb": round(self.ttfb, 3) if self.ttfb is not None else None,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "rate_limited": round(self.rate_limited, 3),
+            "errors": round(self.errors, 3),
+            "samples": self.samples,
+            "score": round(self.score(), 3),
+        }
+
+
+__all__ = ["TokenHealth"]
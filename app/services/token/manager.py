@@ -2,31 +2,55 @@
 
 import asyncio
 import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
 
 from app.core.logger import logger
 from app.services.token.models import (
     TokenInfo,
     EffortType,
+    EFFORT_COST,
     FAIL_THRESHOLD,
     TokenStatus,
     BASIC__DEFAULT_QUOTA,
     SUPER_DEFAULT_QUOTA,
 )
-from app.core.storage import get_storage, LocalStorage
+from app.core.batch import run_adaptive
+from app.core.ratelimit import AIMDConcurrency, TokenBucket
+from app.core.storage import get_storage, LocalStorage, RedisStorage, TokenChanges
 from app.core.config import get_config
 from app.core.exceptions import UpstreamException
+from app.services.token.health import TokenHealth
 from app.services.token.pool import TokenPool
 from app.services.grok.batch_services.usage import UsageService
 
 
-DEFAULT_REFRESH_BATCH_SIZE = 10
-DEFAULT_REFRESH_CONCURRENCY = 5
+# 冷却刷新：最大并发（AIMD 上限）、起始并发、探测速率（次/秒）
+DEFAULT_REFRESH_CONCURRENCY = 20
+REFRESH_INITIAL_CONCURRENCY = 5
+DEFAULT_REFRESH_RATE = 10
+REFRESH_AUTH_RETRIES = 2
+REFRESH_PROGRESS_INTERVAL_SEC = 5
 DEFAULT_SUPER_REFRESH_INTERVAL_HOURS = 2
 DEFAULT_REFRESH_INTERVAL_HOURS = 8
 DEFAULT_RELOAD_INTERVAL_SEC = 30
 DEFAULT_SAVE_DELAY_MS = 500
+DEFAULT_MAX_INFLIGHT = 0
+DEFAULT_LEASE_TTL_SEC = 600
+LEASE_SWEEP_INTERVAL_SEC = 30
+
+# 原子额度模式下由 Redis 回写的字段
+ATOMIC_TOKEN_FIELDS = (
+    "quota",
+    "status",
+    "use_count",
+    "last_used_at",
+    "fail_count",
+    "last_fail_at",
+    "last_fail_reason",
+)
 
 SUPER_POOL_NAME = "ssoSuper"
 BASIC_POOL_NAME = "ssoBasic"
@@ -38,8 +62,22 @@ def _default_quota_for_pool(pool_name: str) -> int:
     return BASIC__DEFAULT_QUOTA
 
 
+def _normalize_token(token: str) -> str:
+    """统一为裸 token（去除 sso= 前缀）"""
+    return token[4:] if token.startswith("sso=") else token
+
+
+def _upstream_status(error: Optional[Exception]) -> Optional[int]:
+    """从上游异常中提取 HTTP 状态码"""
+    if not isinstance(error, UpstreamException):
+        return None
+    if error.details and "status" in error.details:
+        return error.details["status"]
+    return getattr(error, "status_code", None)
+
+
 def _token_tag(token: str) -> str:
-    raw = token[4:] if token.startswith("sso=") else token
+    raw = _normalize_token(token)
     if not raw:
         return "empty"
     if len(raw) <= 14:
@@ -47,6 +85,21 @@ def _token_tag(token: str) -> str:
     return f"{raw[:6]}...{raw[-6:]}"
 
 
+@dataclass(eq=False)
+class TokenLease:
+    """
+    Token 额度预留（选中时创建，请求结束时凭该租约 commit 或 rollback）
+
+    按对象身份结算：同一 Token 的多个并发请求各自持有租约，互不影响。
+    """
+
+    token: str
+    effort: EffortType
+    cost: int
+    expires_at: float
+    started_at: float = 0.0
+
+
 class TokenManager:
     """管理 Token 的增删改查和配额同步"""
 
@@ -55,12 +108,25 @@ class TokenManager:
 
     def __init__(self):
         self.pools: Dict[str, TokenPool] = {}
+        # 全局索引：裸 token -> (所在池, TokenInfo)
+        self._index: Dict[str, Tuple[TokenPool, TokenInfo]] = {}
         self.initialized = False
         self._save_lock = asyncio.Lock()
         self._dirty = False
+        # 增量保存：pool_name -> 待写入 / 待删除的裸 token
+        self._dirty_tokens: Dict[str, Set[str]] = {}
+        self._deleted_tokens: Dict[str, Set[str]] = {}
         self._save_task: Optional[asyncio.Task] = None
         self._save_delay = DEFAULT_SAVE_DELAY_MS / 1000.0
         self._last_reload_at = 0.0
+        # 跨 worker 变更同步游标（由存储后端定义）
+        self._change_cursor = None
+        self._leases: Dict[str, Deque[TokenLease]] = {}
+        self._sweep_task: Optional[asyncio.Task] = None
+        # 健康统计：裸 token -> EWMA 延迟与错误率
+        self._health: Dict[str, TokenHealth] = {}
+        # 进入 COOLING 的通知回调（刷新调度器注册）
+        self._cooling_listeners: List[Callable[[str, str], None]] = []
 
     @classmethod
     async def get_instance(cls) -> "TokenManager":
@@ -77,6 +143,12 @@ class TokenManager:
         if not self.initialized:
             try:
                 storage = get_storage()
+                # 先取游标再加载，确保加载期间的变更会在下次同步时重放
+                try:
+                    cursor = await storage.token_change_cursor()
+                except Exception as e:
+                    logger.warning(f"Failed to get token change cursor: {e}")
+                    cursor = None
                 data = await storage.load_tokens()
 
                 # 如果后端返回 None 或空数据，尝试从本地 data/token.json 初始化后端
@@ -93,8 +165,9 @@ class TokenManager:
                         data = {}
 
                 self.pools = {}
+                self._index = {}
                 for pool_name, tokens in data.items():
-                    pool = TokenPool(pool_name)
+                    pool = self._new_pool(pool_name)
                     for token_data in tokens:
                         quota_missing = not (
                             isinstance(token_data, dict) and "quota" in token_data
@@ -103,14 +176,13 @@ class TokenManager:
                             # 统一存储裸 token
                             if isinstance(token_data, dict):
                                 raw_token = token_data.get("token")
-                                if isinstance(raw_token, str) and raw_token.startswith(
-                                    "sso="
-                                ):
-                                    token_data["token"] = raw_token[4:]
+                                if isinstance(raw_token, str):
+                                    token_data["token"] = _normalize_token(raw_token)
                             token_info = TokenInfo(**token_data)
                             if quota_missing and pool_name == SUPER_POOL_NAME:
                                 token_info.quota = SUPER_DEFAULT_QUOTA
                             pool.add(token_info)
+                            self._index.setdefault(token_info.token, (pool, token_info))
                         except Exception as e:
                             logger.warning(
                                 f"Failed to load token in pool '{pool_name}': {e}"
@@ -119,8 +191,14 @@ class TokenManager:
                     pool._rebuild_index()
                     self.pools[pool_name] = pool
 
+                # 重新挂载未结算的租约
+                for leases in self._leases.values():
+                    for lease in leases:
+                        self._pool_acquire(lease.token, lease.cost)
+
                 self.initialized = True
                 self._last_reload_at = time.monotonic()
+                self._change_cursor = cursor
                 total = sum(p.count() for p in self.pools.values())
                 logger.info(
                     f"TokenManager initialized: {len(self.pools)} pools with {total} tokens"
@@ -128,6 +206,7 @@ class TokenManager:
             except Exception as e:
                 logger.error(f"Failed to initialize TokenManager: {e}")
                 self.pools = {}
+                self._index = {}
                 self.initialized = True
 
     async def reload(self):
@@ -135,9 +214,16 @@ class TokenManager:
         async with self.__class__._lock:
             self.initialized = False
             await self._load()
+            # 以存储为准，丢弃已失效的增量
+            self._dirty_tokens = {}
+            self._deleted_tokens = {}
 
     async def reload_if_stale(self):
-        """在多 worker 场景下保持短周期一致性"""
+        """
+        在多 worker 场景下保持短周期一致性
+
+        优先通过存储变更流增量同步，无法增量同步时才全量重载
+        """
         interval = get_config("token.reload_interval_sec", DEFAULT_RELOAD_INTERVAL_SEC)
         try:
             interval = float(interval)
@@ -147,11 +233,118 @@ class TokenManager:
             return
         if time.monotonic() - self._last_reload_at < interval:
             return
-        await self.reload()
+        # 先占位，避免并发请求重复同步
+        self._last_reload_at = time.monotonic()
+        # 先落盘本地未保存的增量，避免被远端状态覆盖
+        await self._save_deltas()
+        if not await self._sync_changes():
+            await self.reload()
+
+    async def _sync_changes(self) -> bool:
+        """应用其他 worker 的增量变更，返回 False 表示需要全量重载"""
+        if self._change_cursor is None:
+            return False
+        try:
+            changes = await get_storage().load_token_changes(self._change_cursor)
+        except Exception as e:
+            logger.warning(f"Token change sync failed, fallback to reload: {e}")
+            return False
+        if changes.full_reload:
+            return False
+
+        self._change_cursor = changes.cursor
+        applied = self._apply_changes(changes)
+        if applied:
+            logger.debug(f"Token change sync: applied {applied} changes")
+
+        # 变更流无法表达删除的后端，通过总数校验兜底
+        if changes.total is not None and changes.total != len(self._index):
+            logger.info(
+                f"Token change sync: count mismatch ({changes.total} != {len(self._index)}), reloading"
+            )
+            return False
+        return True
+
+    def _apply_changes(self, changes: TokenChanges) -> int:
+        """将远端变更合并到内存池，本地尚未保存的 Token 以本地为准"""
+        applied = 0
+
+        for pool_name, tokens in changes.deleted.items():
+            pool = self.pools.get(pool_name)
+            if not pool:
+                continue
+            pending = self._dirty_tokens.get(pool_name, ())
+            for token_str in tokens:
+                raw_token = _normalize_token(token_str)
+                if raw_token in pending or not pool.remove(raw_token):
+                    continue
+                self._unindex(pool, raw_token)
+                applied += 1
+
+        names: Dict[str, set] = {}
+        for pool_name, tokens in changes.updated.items():
+            pool = self.pools.get(pool_name)
+            if pool is None:
+                pool = self.pools[pool_name] = self._new_pool(pool_name)
+            pending = self._dirty_tokens.get(pool_name, ())
+            for token_data in tokens:
+                raw_token = token_data.get("token")
+                if not isinstance(raw_token, str):
+                    continue
+                raw_token = _normalize_token(raw_token)
+                if raw_token in pending:
+                    continue
+                try:
+                    token_info = TokenInfo(**{**token_data, "token": raw_token})
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to apply token change in pool '{pool_name}': {e}"
+                    )
+                    continue
+                entry = self._index.get(raw_token)
+                old_pool = entry[0] if entry is not None else None
+                if old_pool is not None and old_pool is not pool:
+                    # 远端将 Token 移到了其他池：本地旧池有未保存的修改时以本地为准，
+                    # 否则从旧池移除，避免同一 Token 同时留在两个池中
+                    if raw_token in self._dirty_tokens.get(old_pool.name, ()):
+                        continue
+                    if raw_token not in self._updated_names(changes, old_pool.name, names):
+                        old_pool.remove(raw_token)
+                pool.add(token_info)
+                if old_pool is None or old_pool is pool or old_pool.get(raw_token) is None:
+                    self._index[raw_token] = (pool, token_info)
+                self._notify_cooling(pool_name, token_info)
+                applied += 1
+
+        return applied
+
+    @staticmethod
+    def _updated_names(changes: TokenChanges, pool_name: str, cache: Dict[str, set]) -> set:
+        """变更集中某个池更新的 Token 集合（按池缓存）"""
+        if pool_name not in cache:
+            cache[pool_name] = {
+                _normalize_token(item["token"])
+                for item in changes.updated.get(pool_name, ())
+                if isinstance(item.get("token"), str)
+            }
+        return cache[pool_name]
+
+    def _unindex(self, pool: TokenPool, raw_token: str):
+        """Token 从池中移除后修正全局索引（多池共存时回落到下一个池）"""
+        entry = self._index.get(raw_token)
+        if entry is None or entry[0] is not pool:
+            return
+        del self._index[raw_token]
+        for other in self.pools.values():
+            if info := other.get(raw_token):
+                self._index[raw_token] = (other, info)
+                break
 
     async def _save(self):
-        """保存变更"""
+        """全量保存（管理操作使用，常规变更走增量保存）"""
         async with self._save_lock:
+            self._dirty_tokens = {}
+            self._deleted_tokens = {}
             try:
                 data = {}
                 for pool_name, pool in self.pools.items():
@@ -163,6 +356,73 @@ class TokenManager:
             except Exception as e:
                 logger.error(f"Failed to save tokens: {e}")
 
+    def _mark_dirty(self, pool_name: str, raw_token: str):
+        """登记需要保存的 Token"""
+        self._dirty_tokens.setdefault(pool_name, set()).add(raw_token)
+        deleted = self._deleted_tokens.get(pool_name)
+        if deleted:
+            deleted.discard(raw_token)
+
+    def _mark_deleted(self, pool_name: str, raw_token: str):
+        """登记需要删除的 Token"""
+        self._deleted_tokens.setdefault(pool_name, set()).add(raw_token)
+        dirty = self._dirty_tokens.get(pool_name)
+        if dirty:
+            dirty.discard(raw_token)
+
+    async def _save_deltas(self):
+        """增量保存已变更的 Token"""
+        async with self._save_lock:
+            if not self._dirty_tokens and not self._deleted_tokens:
+                return
+            dirty, self._dirty_tokens = self._dirty_tokens, {}
+            deleted, self._deleted_tokens = self._deleted_tokens, {}
+
+            updated: Dict[str, List[dict]] = {}
+            for pool_name, tokens in dirty.items():
+                pool = self.pools.get(pool_name)
+                if not pool:
+                    continue
+                items = [
+                    info.model_dump()
+                    for token in tokens
+                    if (info := pool.get(token)) is not None
+                ]
+                if items:
+                    updated[pool_name] = items
+            removed = {
+                pool_name: list(tokens)
+                for pool_name, tokens in deleted.items()
+                if tokens
+            }
+            if not updated and not removed:
+                return
+
+            try:
+                storage = get_storage()
+                async with storage.acquire_lock("tokens_save", timeout=10):
+                    if self._atomic_storage() is not None:
+                        # 额度类字段由原子脚本维护，不用本地副本覆盖
+                        await storage.save_token_deltas(
+                            updated, removed, atomic_fields=ATOMIC_TOKEN_FIELDS
+                        )
+                    else:
+                        await storage.save_token_deltas(updated, removed)
+            except Exception as e:
+                logger.error(f"Failed to save token deltas: {e}")
+                # 失败的增量放回队列，等待下次重试（期间的新变更优先）
+                for pool_name, tokens in dirty.items():
+                    for token in tokens:
+                        if token not in self._deleted_tokens.get(pool_name, ()):
+                            self._dirty_tokens.setdefault(pool_name, set()).add(token)
+                for pool_name, tokens in deleted.items():
+                    for token in tokens:
+                        if token not in self._dirty_tokens.get(pool_name, ()):
+                            self._deleted_tokens.setdefault(pool_name, set()).add(
+                                token
+                            )
+                self._dirty = True
+
     def _schedule_save(self):
         """合并高频保存请求，减少写入开销"""
         delay_ms = get_config("token.save_delay_ms", DEFAULT_SAVE_DELAY_MS)
@@ -175,7 +435,7 @@ class TokenManager:
         if self._save_delay == 0:
             if self._save_task and not self._save_task.done():
                 return
-            self._save_task = asyncio.create_task(self._save())
+            self._save_task = asyncio.create_task(self._save_deltas())
             return
         if self._save_task and not self._save_task.done():
             return
@@ -188,12 +448,186 @@ class TokenManager:
                 if not self._dirty:
                     break
                 self._dirty = False
-                await self._save()
+                await self._save_deltas()
         finally:
             self._save_task = None
             if self._dirty:
                 self._schedule_save()
 
+    def _atomic_storage(self) -> Optional[RedisStorage]:
+        """原子额度模式（仅 Redis 存储生效）"""
+        if not get_config("token.atomic_quota", False):
+            return None
+        storage = get_storage()
+        return storage if isinstance(storage, RedisStorage) else None
+
+    async def _atomic_update(
+        self, pool: TokenPool, token: TokenInfo, op: str, *args
+    ) -> bool:
+        """
+        在 Redis 中原子更新 Token 状态并回写到本地
+
+        返回 False 表示未启用或执行失败，调用方应回退到本地更新
+        """
+        storage = self._atomic_storage()
+        if storage is None:
+            return False
+        try:
+            data = await getattr(storage, f"atomic_{op}")(pool.name, token.token, *args)
+            if data is None:
+                return False
+            fresh = TokenInfo(**data)
+        except Exception as e:
+            logger.warning(
+                f"Token {token.token[:10]}...: atomic {op} failed, fallback to local ({e})"
+            )
+            return False
+        for field in ATOMIC_TOKEN_FIELDS:
+            setattr(token, field, getattr(fresh, field))
+        pool.reindex(token.token)
+        return True
+
+    async def _atomic_write(self, pool: TokenPool, token: TokenInfo, *fields: str):
+        """
+        原子额度模式下写入本地直接修改的额度类字段（重置、刷新结果、标记过期）
+
+        增量保存不会覆盖这些字段，需单独写入；未启用原子模式时无操作
+        """
+        if self._atomic_storage() is None:
+            return
+        await self._atomic_update(
+            pool,
+            token,
+            "set_fields",
+            {field: getattr(token, field) for field in fields},
+        )
+
+    # ========== 冷却通知 ==========
+
+    def add_cooling_listener(self, callback: Callable[[str, str], None]):
+        """注册 Token 进入 COOLING 时的回调 (pool_name, token)"""
+        if callback not in self._cooling_listeners:
+            self._cooling_listeners.append(callback)
+
+    def remove_cooling_listener(self, callback: Callable[[str, str], None]):
+        """移除冷却回调"""
+        if callback in self._cooling_listeners:
+            self._cooling_listeners.remove(callback)
+
+    def _notify_cooling(self, pool_name: str, token: TokenInfo):
+        if token.status != TokenStatus.COOLING:
+            return
+        for callback in self._cooling_listeners:
+            try:
+                callback(pool_name, token.token)
+            except Exception as e:
+                logger.warning(f"Cooling listener failed: {e}")
+
+    def refresh_interval_hours(self, pool_name: str) -> float:
+        """池的冷却刷新间隔（小时）"""
+        if pool_name == SUPER_POOL_NAME:
+            value = get_config(
+                "token.super_refresh_interval_hours",
+                DEFAULT_SUPER_REFRESH_INTERVAL_HOURS,
+            )
+            default = DEFAULT_SUPER_REFRESH_INTERVAL_HOURS
+        else:
+            value = get_config(
+                "token.refresh_interval_hours", DEFAULT_REFRESH_INTERVAL_HOURS
+            )
+            default = DEFAULT_REFRESH_INTERVAL_HOURS
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return float(default)
+
+    def next_refresh_at(self, pool_name: str, token: TokenInfo) -> Optional[int]:
+        """Token 下次可刷新的时间（毫秒时间戳），非 COOLING 返回 None"""
+        if token.status != TokenStatus.COOLING:
+            return None
+        if token.last_sync_at is None:
+            return 0
+        interval_ms = int(self.refresh_interval_hours(pool_name) * 3600 * 1000)
+        return token.last_sync_at + interval_ms
+
+    def iter_cooling(self) -> Iterator[Tuple[str, TokenInfo]]:
+        """遍历所有 COOLING 状态的 Token"""
+        for pool in self.pools.values():
+            for token in pool:
+                if token.status == TokenStatus.COOLING:
+                    yield pool.name, token
+
+    def _new_pool(self, pool_name: str) -> TokenPool:
+        return TokenPool(
+            pool_name, max_inflight=self._max_inflight(), health=self.health_score
+        )
+
+    # ========== 健康评分 ==========
+
+    def _health_enabled(self) -> bool:
+        return bool(get_config("token.health_scoring", True))
+
+    def health_score(self, token_str: str) -> float:
+        """Token 健康评分（越小越好，无样本为 0）"""
+        health = self._health.get(token_str)
+        if health is None or not self._health_enabled():
+            return 0.0
+        return health.score()
+
+    def observe(
+        self,
+        token_str: str,
+        *,
+        ttfb: Optional[float] = None,
+        latency: Optional[float] = None,
+        rate_limited: bool = False,
+        error: bool = False,
+    ):
+        """
+        记录 Token 请求观测（首字节耗时、总耗时、429、传输错误）
+
+        Args:
+            token_str: Token 字符串
+            ttfb: 首字节耗时（秒）
+            latency: 总耗时（秒）
+            rate_limited: 是否被 429
+            error: 是否为传输 / 上游错误
+        """
+        if not self._health_enabled():
+            return
+        raw_token = _normalize_token(token_str)
+        if raw_token not in self._index:
+            return
+        health = self._health.get(raw_token)
+        if health is None:
+            health = self._health[raw_token] = TokenHealth()
+        health.observe(
+            ttfb=ttfb, latency=latency, rate_limited=rate_limited, error=error
+        )
+
+    def get_health(self, token_str: str) -> Optional[dict]:
+        """Token 健康统计快照"""
+        health = self._health.get(_normalize_token(token_str))
+        return health.snapshot() if health else None
+
+    def _max_inflight(self) -> int:
+        """单 Token 并发上限（0 表示不限制）"""
+        value = get_config("token.max_inflight", DEFAULT_MAX_INFLIGHT)
+        try:
+            return max(0, int(value))
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_INFLIGHT
+
+    def _lookup(self, token_str: str) -> Optional[Tuple[TokenPool, TokenInfo]]:
+        """按 token 查找所在池与 TokenInfo"""
+        return self._index.get(_normalize_token(token_str))
+
+    def _get_pool(self, pool_name: str) -> Optional[TokenPool]:
+        pool = self.pools.get(pool_name)
+        if pool:
+            pool.set_max_inflight(self._max_inflight())
+        return pool
+
     def get_token(self, pool_name: str = "ssoBasic", exclude: set = None) -> Optional[str]:
         """
         获取可用 Token
@@ -205,7 +639,7 @@ class TokenManager:
         Returns:
             Token 字符串或 None
         """
-        pool = self.pools.get(pool_name)
+        pool = self._get_pool(pool_name)
         if not pool:
             logger.warning(f"Pool '{pool_name}' not found")
             return None
@@ -215,10 +649,7 @@ class TokenManager:
             logger.warning(f"No available token in pool '{pool_name}'")
             return None
 
-        token = token_info.token
-        if token.startswith("sso="):
-            return token[4:]
-        return token
+        return _normalize_token(token_info.token)
 
     def get_token_info(
         self, pool_name: str = "ssoBasic", exclude: set | None = None
@@ -232,7 +663,7 @@ class TokenManager:
         Returns:
             TokenInfo 对象或 None
         """
-        pool = self.pools.get(pool_name)
+        pool = self._get_pool(pool_name)
         if not pool:
             logger.warning(f"Pool '{pool_name}' not found")
             return None
@@ -313,11 +744,131 @@ class TokenManager:
 
     def get_pool_name_for_token(self, token_str: str) -> Optional[str]:
         """Return pool name for the given token string."""
-        raw_token = token_str.replace("sso=", "")
-        for pool_name, pool in self.pools.items():
-            if pool.get(raw_token):
-                return pool_name
-        return None
+        entry = self._lookup(token_str)
+        return entry[0].name if entry else None
+
+    def _pool_acquire(self, raw_token: str, cost: int) -> bool:
+        entry = self._index.get(raw_token)
+        return entry[0].acquire(raw_token, cost) if entry else False
+
+    def _pool_release(self, raw_token: str, cost: int) -> bool:
+        entry = self._index.get(raw_token)
+        return entry[0].release(raw_token, cost) if entry else False
+
+    def _lease_ttl(self) -> float:
+        value = get_config("token.lease_ttl_sec", DEFAULT_LEASE_TTL_SEC)
+        try:
+            return max(1.0, float(value))
+        except (TypeError, ValueError):
+            return float(DEFAULT_LEASE_TTL_SEC)
+
+    def _pop_lease(self, lease: TokenLease) -> bool:
+        """移除并释放指定租约（已被回收或已结算时返回 False，不会释放他人的预留）"""
+        leases = self._leases.get(lease.token)
+        if not leases:
+            return False
+        try:
+            leases.remove(lease)
+        except ValueError:
+            return False
+        if not leases:
+            del self._leases[lease.token]
+        self._pool_release(lease.token, lease.cost)
+        return True
+
+    def reserve(
+        self, token_str: str, effort: EffortType = EffortType.LOW
+    ) -> Optional[TokenLease]:
+        """
+        预留 Token 额度并登记进行中请求
+
+        选中 Token 后调用，请求结束时必须凭返回的租约 commit（成功）或 rollback（失败/取消），
+        超时未结算的租约由后台清理任务回收。
+
+        Args:
+            token_str: Token 字符串
+            effort: 预计消耗力度
+
+        Returns:
+            租约，Token 不存在时返回 None
+        """
+        raw_token = _normalize_token(token_str)
+        cost = EFFORT_COST[effort]
+        if not self._pool_acquire(raw_token, cost):
+            logger.warning(f"Token {raw_token[:10]}...: not found for reservation")
+            return None
+
+        now = time.monotonic()
+        lease = TokenLease(
+            token=raw_token,
+            effort=effort,
+            cost=cost,
+            expires_at=now + self._lease_ttl(),
+            started_at=now,
+        )
+        self._leases.setdefault(raw_token, deque()).append(lease)
+        self._ensure_sweeper()
+        return lease
+
+    async def commit(
+        self, lease: TokenLease, effort: Optional[EffortType] = None
+    ) -> bool:
+        """
+        结算租约：释放预留并按实际力度扣减配额
+
+        租约已被过期回收时仍扣减配额（请求确实成功），但不再释放预留。
+
+        Args:
+            lease: reserve 返回的租约
+            effort: 实际消耗力度（默认使用预留时的力度）
+
+        Returns:
+            是否成功
+        """
+        self._pop_lease(lease)
+        self.observe(lease.token, latency=time.monotonic() - lease.started_at)
+        return await self.consume(lease.token, effort or lease.effort)
+
+    def rollback(self, lease: TokenLease) -> bool:
+        """
+        回滚租约：释放预留额度，不扣减配额
+
+        Args:
+            lease: reserve 返回的租约
+
+        Returns:
+            租约是否仍待结算（已回收或已结算时为 False）
+        """
+        return self._pop_lease(lease)
+
+    def _ensure_sweeper(self):
+        if self._sweep_task and not self._sweep_task.done():
+            return
+        self._sweep_task = asyncio.create_task(self._sweep_loop())
+
+    def _sweep_expired(self) -> int:
+        """回收已过期的租约"""
+        now = time.monotonic()
+        expired = 0
+        for raw_token in list(self._leases.keys()):
+            leases = self._leases[raw_token]
+            for lease in [lease for lease in leases if lease.expires_at <= now]:
+                leases.remove(lease)
+                self._pool_release(raw_token, lease.cost)
+                expired += 1
+            if not leases:
+                del self._leases[raw_token]
+        return expired
+
+    async def _sweep_loop(self):
+        try:
+            while self._leases:
+                await asyncio.sleep(LEASE_SWEEP_INTERVAL_SEC)
+                expired = self._sweep_expired()
+                if expired:
+                    logger.warning(f"Token leases: reclaimed {expired} expired leases")
+        finally:
+            self._sweep_task = None
 
     async def consume(
         self, token_str: str, effort: EffortType = EffortType.LOW
@@ -332,20 +883,29 @@ class TokenManager:
         Returns:
             是否成功
         """
-        raw_token = token_str.replace("sso=", "")
+        raw_token = _normalize_token(token_str)
 
-        for pool in self.pools.values():
-            token = pool.get(raw_token)
-            if token:
-                consumed = token.consume(effort)
-                logger.debug(
-                    f"Token {raw_token[:10]}...: consumed {consumed} quota, use_count={token.use_count}"
-                )
-                self._schedule_save()
-                return True
+        entry = self._index.get(raw_token)
+        if not entry:
+            logger.warning(f"Token {raw_token[:10]}...: not found for consumption")
+            return False
+
+        pool, token = entry
+        if await self._atomic_update(pool, token, "consume", EFFORT_COST[effort]):
+            logger.debug(
+                f"Token {raw_token[:10]}...: consumed quota atomically, quota={token.quota}"
+            )
+            self._notify_cooling(pool.name, token)
+            return True
 
-        logger.warning(f"Token {raw_token[:10]}...: not found for consumption")
-        return False
+        consumed = pool.consume(raw_token, effort)
+        logger.debug(
+            f"Token {raw_token[:10]}...: consumed {consumed} quota, use_count={token.use_count}"
+        )
+        self._mark_dirty(pool.name, raw_token)
+        self._schedule_save()
+        self._notify_cooling(pool.name, token)
+        return True
 
     async def sync_usage(
         self,
@@ -368,18 +928,14 @@ class TokenManager:
         Returns:
             是否成功
         """
-        raw_token = token_str.replace("sso=", "")
+        raw_token = _normalize_token(token_str)
 
         # 查找 Token 对象
-        target_token: Optional[TokenInfo] = None
-        for pool in self.pools.values():
-            target_token = pool.get(raw_token)
-            if target_token:
-                break
-
-        if not target_token:
+        entry = self._index.get(raw_token)
+        if not entry:
             logger.warning(f"Token {raw_token[:10]}...: not found for sync")
             return False
+        target_pool, target_token = entry
 
         # 尝试 API 同步
         try:
@@ -394,8 +950,13 @@ class TokenManager:
                     return False
                 old_quota = target_token.quota
 
-                target_token.update_quota(new_quota)
-                target_token.record_success(is_usage=is_usage)
+                atomic = await self._atomic_update(
+                    target_pool, target_token, "sync_quota", new_quota, is_usage
+                )
+                if not atomic:
+                    target_token.update_quota(new_quota)
+                    target_token.record_success(is_usage=is_usage)
+                    target_pool.reindex(raw_token)
 
                 consumed = max(0, old_quota - new_quota)
                 logger.info(
@@ -403,18 +964,15 @@ class TokenManager:
                     f"{old_quota} -> {new_quota} (consumed: {consumed}, use_count: {target_token.use_count})"
                 )
 
-                self._schedule_save()
+                if not atomic:
+                    self._mark_dirty(target_pool.name, raw_token)
+                    self._schedule_save()
                 return True
 
         except Exception as e:
-            if isinstance(e, UpstreamException):
-                status = None
-                if e.details and "status" in e.details:
-                    status = e.details["status"]
-                else:
-                    status = getattr(e, "status_code", None)
-                if status == 401:
-                    await self.record_fail(token_str, status, "rate_limits_auth_failed")
+            status = _upstream_status(e)
+            if status == 401:
+                await self.record_fail(token_str, status, "rate_limits_auth_failed")
             logger.warning(
                 f"Token {raw_token[:10]}...: API sync failed, fallback to local ({e})"
             )
@@ -443,34 +1001,43 @@ class TokenManager:
         Returns:
             是否成功
         """
-        raw_token = token_str.replace("sso=", "")
+        raw_token = _normalize_token(token_str)
 
-        for pool in self.pools.values():
-            token = pool.get(raw_token)
-            if token:
-                if status_code == 401:
-                    threshold = get_config("token.fail_threshold", FAIL_THRESHOLD)
-                    try:
-                        threshold = int(threshold)
-                    except (TypeError, ValueError):
-                        threshold = FAIL_THRESHOLD
-                    if threshold < 1:
-                        threshold = 1
-
-                    token.record_fail(status_code, reason, threshold=threshold)
-                    logger.warning(
-                        f"Token {raw_token[:10]}...: recorded {status_code} failure "
-                        f"({token.fail_count}/{threshold}) - {reason}"
-                    )
-                else:
-                    logger.info(
-                        f"Token {raw_token[:10]}...: non-auth error ({status_code}) - {reason} (not counted)"
-                    )
-                self._schedule_save()
-                return True
+        entry = self._index.get(raw_token)
+        if not entry:
+            logger.warning(f"Token {raw_token[:10]}...: not found for failure record")
+            return False
 
-        logger.warning(f"Token {raw_token[:10]}...: not found for failure record")
-        return False
+        pool, token = entry
+        if status_code == 401:
+            threshold = get_config("token.fail_threshold", FAIL_THRESHOLD)
+            try:
+                threshold = int(threshold)
+            except (TypeError, ValueError):
+                threshold = FAIL_THRESHOLD
+            if threshold < 1:
+                threshold = 1
+
+            atomic = await self._atomic_update(
+                pool, token, "record_fail", reason, threshold
+            )
+            if not atomic:
+                pool.record_fail(raw_token, status_code, reason, threshold=threshold)
+            logger.warning(
+                f"Token {raw_token[:10]}...: recorded {status_code} failure "
+                f"({token.fail_count}/{threshold}) - {reason}"
+            )
+            if atomic:
+                return True
+        else:
+            # 非认证错误不计入失败，本地无变更
+            logger.info(
+                f"Token {raw_token[:10]}...: non-auth error ({status_code}) - {reason} (not counted)"
+            )
+            return True
+        self._mark_dirty(pool.name, raw_token)
+        self._schedule_save()
+        return True
 
     async def mark_rate_limited(self, token_str: str) -> bool:
         """
@@ -485,23 +1052,28 @@ class TokenManager:
         Returns:
             是否成功
         """
-        raw_token = token_str.removeprefix("sso=")
+        raw_token = _normalize_token(token_str)
 
-        for pool in self.pools.values():
-            token = pool.get(raw_token)
-            if token:
-                old_quota = token.quota
-                token.quota = 0
-                token.status = TokenStatus.COOLING
-                logger.warning(
-                    f"Token {raw_token[:10]}...: marked as rate limited "
-                    f"(quota {old_quota} -> 0, status -> cooling)"
-                )
-                self._schedule_save()
-                return True
+        entry = self._index.get(raw_token)
+        if not entry:
+            logger.warning(f"Token {raw_token[:10]}...: not found for rate limit marking")
+            return False
 
-        logger.warning(f"Token {raw_token[:10]}...: not found for rate limit marking")
-        return False
+        pool, token = entry
+        self.observe(raw_token, rate_limited=True)
+        old_quota = token.quota
+        atomic = await self._atomic_update(pool, token, "mark_rate_limited")
+        if not atomic:
+            pool.mark_rate_limited(raw_token)
+        logger.warning(
+            f"Token {raw_token[:10]}...: marked as rate limited "
+            f"(quota {old_quota} -> 0, status -> cooling)"
+        )
+        if not atomic:
+            self._mark_dirty(pool.name, raw_token)
+            self._schedule_save()
+        self._notify_cooling(pool.name, token)
+        return True
 
     # ========== 管理功能 ==========
 
@@ -517,31 +1089,33 @@ class TokenManager:
             是否成功
         """
         if pool_name not in self.pools:
-            self.pools[pool_name] = TokenPool(pool_name)
+            self.pools[pool_name] = self._new_pool(pool_name)
             logger.info(f"Pool '{pool_name}': created")
 
         pool = self.pools[pool_name]
 
-        token = token[4:] if token.startswith("sso=") else token
+        token = _normalize_token(token)
         if pool.get(token):
             logger.warning(f"Pool '{pool_name}': token already exists")
             return False
 
-        pool.add(TokenInfo(token=token, quota=_default_quota_for_pool(pool_name)))
-        await self._save()
+        token_info = TokenInfo(token=token, quota=_default_quota_for_pool(pool_name))
+        pool.add(token_info)
+        self._index.setdefault(token, (pool, token_info))
+        self._mark_dirty(pool_name, token)
+        await self._save_deltas()
         logger.info(f"Pool '{pool_name}': token added")
         return True
 
     async def mark_asset_clear(self, token: str) -> bool:
         """记录在线资产清理时间"""
-        raw_token = token[4:] if token.startswith("sso=") else token
-        for pool in self.pools.values():
-            info = pool.get(raw_token)
-            if info:
-                info.last_asset_clear_at = int(datetime.now().timestamp() * 1000)
-                self._schedule_save()
-                return True
-        return False
+        entry = self._lookup(token)
+        if not entry:
+            return False
+        entry[1].last_asset_clear_at = int(datetime.now().timestamp() * 1000)
+        self._mark_dirty(entry[0].name, entry[1].token)
+        self._schedule_save()
+        return True
 
     async def add_tag(self, token: str, tag: str) -> bool:
         """
@@ -554,16 +1128,17 @@ class TokenManager:
         Returns:
             是否成功
         """
-        raw_token = token[4:] if token.startswith("sso=") else token
-        for pool in self.pools.values():
-            info = pool.get(raw_token)
-            if info:
-                if tag not in info.tags:
-                    info.tags.append(tag)
-                    self._schedule_save()
-                    logger.debug(f"Token {raw_token[:10]}...: added tag '{tag}'")
-                return True
-        return False
+        raw_token = _normalize_token(token)
+        entry = self._index.get(raw_token)
+        if not entry:
+            return False
+        info = entry[1]
+        if tag not in info.tags:
+            info.tags.append(tag)
+            self._mark_dirty(entry[0].name, raw_token)
+            self._schedule_save()
+            logger.debug(f"Token {raw_token[:10]}...: added tag '{tag}'")
+        return True
 
     async def remove_tag(self, token: str, tag: str) -> bool:
         """
@@ -576,16 +1151,17 @@ class TokenManager:
         Returns:
             是否成功
         """
-        raw_token = token[4:] if token.startswith("sso=") else token
-        for pool in self.pools.values():
-            info = pool.get(raw_token)
-            if info:
-                if tag in info.tags:
-                    info.tags.remove(tag)
-                    self._schedule_save()
-                    logger.debug(f"Token {raw_token[:10]}...: removed tag '{tag}'")
-                return True
-        return False
+        raw_token = _normalize_token(token)
+        entry = self._index.get(raw_token)
+        if not entry:
+            return False
+        info = entry[1]
+        if tag in info.tags:
+            info.tags.remove(tag)
+            self._mark_dirty(entry[0].name, raw_token)
+            self._schedule_save()
+            logger.debug(f"Token {raw_token[:10]}...: removed tag '{tag}'")
+        return True
 
     async def remove(self, token: str) -> bool:
         """
@@ -597,14 +1173,21 @@ class TokenManager:
         Returns:
             是否成功
         """
-        for pool_name, pool in self.pools.items():
-            if pool.remove(token):
-                await self._save()
-                logger.info(f"Pool '{pool_name}': token removed")
-                return True
+        raw_token = _normalize_token(token)
+        entry = self._index.get(raw_token)
+        if not entry:
+            logger.warning("Token not found for removal")
+            return False
 
-        logger.warning("Token not found for removal")
-        return False
+        pool = entry[0]
+        pool.remove(raw_token)
+        self._unindex(pool, raw_token)
+        if raw_token not in self._index:
+            self._health.pop(raw_token, None)
+        self._mark_deleted(pool.name, raw_token)
+        await self._save_deltas()
+        logger.info(f"Pool '{pool.name}': token removed")
+        return True
 
     async def reset_all(self):
         """重置所有 Token 配额"""
@@ -614,6 +1197,7 @@ class TokenManager:
             for token in pool:
                 token.reset(default_quota)
                 count += 1
+            pool._rebuild_index()
 
         await self._save()
         logger.info(f"Reset all: {count} tokens updated")
@@ -628,19 +1212,23 @@ class TokenManager:
         Returns:
             是否成功
         """
-        raw_token = token_str.replace("sso=", "")
+        raw_token = _normalize_token(token_str)
 
-        for pool in self.pools.values():
-            token = pool.get(raw_token)
-            if token:
-                default_quota = _default_quota_for_pool(pool.name)
-                token.reset(default_quota)
-                await self._save()
-                logger.info(f"Token {raw_token[:10]}...: reset completed")
-                return True
+        entry = self._index.get(raw_token)
+        if not entry:
+            logger.warning(f"Token {raw_token[:10]}...: not found for reset")
+            return False
 
-        logger.warning(f"Token {raw_token[:10]}...: not found for reset")
-        return False
+        pool, token = entry
+        token.reset(_default_quota_for_pool(pool.name))
+        pool.reindex(raw_token)
+        await self._atomic_write(
+            pool, token, "quota", "status", "fail_count", "last_fail_reason"
+        )
+        self._mark_dirty(pool.name, raw_token)
+        await self._save_deltas()
+        logger.info(f"Token {raw_token[:10]}...: reset completed")
+        return True
 
     def get_stats(self) -> Dict[str, dict]:
         """获取统计信息"""
@@ -665,29 +1253,44 @@ class TokenManager:
             return []
         return pool.list()
 
-    async def refresh_cooling_tokens(self) -> Dict[str, int]:
+    def _refresh_setting(self, key: str, default: float) -> float:
+        value = get_config(key, default)
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return float(default)
+
+    async def refresh_cooling_tokens(
+        self,
+        targets: Optional[List[Tuple[str, str]]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, int]:
         """
         批量刷新 cooling 状态的 Token 配额
 
+        Args:
+            targets: 仅刷新指定的 (pool_name, token)，为空时扫描全部池
+            on_progress: (done, total) 进度回调
+
         Returns:
             {"checked": int, "refreshed": int, "recovered": int, "expired": int}
         """
         # 收集需要刷新的 token
-        to_refresh: List[TokenInfo] = []
-        for pool in self.pools.values():
-            if pool.name == SUPER_POOL_NAME:
-                interval_hours = get_config(
-                    "token.super_refresh_interval_hours",
-                    DEFAULT_SUPER_REFRESH_INTERVAL_HOURS,
-                )
-            else:
-                interval_hours = get_config(
-                    "token.refresh_interval_hours",
-                    DEFAULT_REFRESH_INTERVAL_HOURS,
-                )
-            for token in pool:
-                if token.need_refresh(interval_hours):
-                    to_refresh.append(token)
+        to_refresh: List[tuple[TokenPool, TokenInfo]] = []
+        if targets is None:
+            candidates = (
+                (pool, token) for pool in self.pools.values() for token in pool
+            )
+        else:
+            candidates = (
+                (pool, token)
+                for pool_name, token_str in targets
+                if (pool := self.pools.get(pool_name))
+                and (token := pool.get(_normalize_token(token_str)))
+            )
+        for pool, token in candidates:
+            if token.need_refresh(self.refresh_interval_hours(pool.name)):
+                to_refresh.append((pool, token))
 
         if not to_refresh:
             logger.debug("Refresh check: no tokens need refresh")
@@ -695,90 +1298,117 @@ class TokenManager:
 
         logger.info(f"Refresh check: found {len(to_refresh)} cooling tokens to refresh")
 
-        # 批量并发刷新
-        semaphore = asyncio.Semaphore(DEFAULT_REFRESH_CONCURRENCY)
+        # 滑动窗口刷新：令牌桶限速 + AIMD 自适应并发（429 / 5xx 时收缩）
+        max_concurrency = self._refresh_setting(
+            "token.refresh_concurrency", DEFAULT_REFRESH_CONCURRENCY
+        )
+        rate = self._refresh_setting("token.refresh_rate", DEFAULT_REFRESH_RATE)
+        concurrency = AIMDConcurrency(
+            initial=min(REFRESH_INITIAL_CONCURRENCY, max(1, int(max_concurrency))),
+            maximum=max(1, int(max_concurrency)),
+        )
+        bucket = TokenBucket(rate, burst=max(1.0, rate)) if rate > 0 else None
         usage_service = UsageService()
-        refreshed = 0
-        recovered = 0
-        expired = 0
+        total = len(to_refresh)
+        progress_step = max(1, total // 10)
+        last_progress_at = time.monotonic()
 
-        async def _refresh_one(token_info: TokenInfo) -> dict:
+        async def _refresh_one(item: tuple[TokenPool, TokenInfo]) -> dict:
             """刷新单个 token"""
-            async with semaphore:
-                token_str = token_info.token
-                if token_str.startswith("sso="):
-                    token_str = token_str[4:]
-
-                # 重试逻辑：最多 2 次重试
-                for retry in range(3):  # 0, 1, 2
-                    try:
-                        result = await usage_service.get(token_str)
-
-                        if result and "remainingTokens" in result:
-                            new_quota = result.get("remainingTokens")
-                            if new_quota is None:
-                                new_quota = result.get("remainingQueries")
-                            if new_quota is None:
-                                return {"recovered": False, "expired": False}
-                            old_quota = token_info.quota
-                            old_status = token_info.status
-
-                            token_info.update_quota(new_quota)
-                            token_info.mark_synced()
-
-                            logger.info(
-                                f"Token {token_info.token[:10]}...: refreshed "
-                                f"{old_quota} -> {new_quota}, status: {old_status} -> {token_info.status}"
-                            )
-
-                            return {
-                                "recovered": new_quota > 0 and old_quota == 0,
-                                "expired": False,
-                            }
-
-                        return {"recovered": False, "expired": False}
-
-                    except Exception as e:
-                        error_str = str(e)
-
-                        # 检查是否为 401 错误
-                        if "401" in error_str or "Unauthorized" in error_str:
-                            if retry < 2:
-                                logger.warning(
-                                    f"Token {token_info.token[:10]}...: 401 error, "
-                                    f"retry {retry + 1}/2..."
-                                )
-                                await asyncio.sleep(0.5)
-                                continue
-                            else:
-                                # 重试 2 次后仍然 401，标记为 expired
-                                logger.error(
-                                    f"Token {token_info.token[:10]}...: 401 after 2 retries, "
-                                    f"marking as expired"
-                                )
-                                token_info.status = TokenStatus.EXPIRED
-                                return {"recovered": False, "expired": True}
-                        else:
-                            logger.warning(
-                                f"Token {token_info.token[:10]}...: refresh failed ({e})"
-                            )
-                            return {"recovered": False, "expired": False}
+            pool, token_info = item
+            token_str = _normalize_token(token_info.token)
+
+            for attempt in range(REFRESH_AUTH_RETRIES + 1):
+                try:
+                    result = await usage_service.get(token_str)
+                except Exception as e:
+                    status = _upstream_status(e)
+                    if status != 401:
+                        # 抛出：run_adaptive 记为失败，429 / 5xx 触发并发收缩
+                        logger.warning(
+                            f"Token {token_info.token[:10]}...: refresh failed ({e})"
+                        )
+                        raise
+                    if attempt < REFRESH_AUTH_RETRIES:
+                        logger.warning(
+                            f"Token {token_info.token[:10]}...: 401 error, "
+                            f"retry {attempt + 1}/{REFRESH_AUTH_RETRIES}..."
+                        )
+                        await asyncio.sleep(0.5)
+                        continue
+                    # 多次重试后仍然 401，标记为 expired
+                    logger.error(
+                        f"Token {token_info.token[:10]}...: 401 after "
+                        f"{REFRESH_AUTH_RETRIES} retries, marking as expired"
+                    )
+                    token_info.status = TokenStatus.EXPIRED
+                    pool.reindex(token_info.token)
+                    await self._atomic_write(pool, token_info, "status")
+                    self._mark_dirty(pool.name, token_info.token)
+                    return {"recovered": False, "expired": True, "status": status}
+
+                if not result or "remainingTokens" not in result:
+                    return {"recovered": False, "expired": False, "status": 200}
+                new_quota = result.get("remainingTokens")
+                if new_quota is None:
+                    new_quota = result.get("remainingQueries")
+                if new_quota is None:
+                    return {"recovered": False, "expired": False, "status": 200}
+                old_quota = token_info.quota
+                old_status = token_info.status
 
-                return {"recovered": False, "expired": False}
+                pool.update_quota(token_info.token, new_quota)
+                token_info.mark_synced()
+                await self._atomic_write(pool, token_info, "quota", "status")
+                self._mark_dirty(pool.name, token_info.token)
 
-        # 批量处理
-        for i in range(0, len(to_refresh), DEFAULT_REFRESH_BATCH_SIZE):
-            batch = to_refresh[i : i + DEFAULT_REFRESH_BATCH_SIZE]
-            results = await asyncio.gather(*[_refresh_one(t) for t in batch])
-            refreshed += len(batch)
-            recovered += sum(r["recovered"] for r in results)
-            expired += sum(r["expired"] for r in results)
+                logger.info(
+                    f"Token {token_info.token[:10]}...: refreshed "
+                    f"{old_quota} -> {new_quota}, status: {old_status} -> {token_info.status}"
+                )
 
-            # 批次间延迟
-            if i + DEFAULT_REFRESH_BATCH_SIZE < len(to_refresh):
-                await asyncio.sleep(1)
+                return {
+                    "recovered": new_quota > 0 and old_quota == 0,
+                    "expired": False,
+                    "status": 200,
+                }
+
+            return {"recovered": False, "expired": False, "status": None}
+
+        def _is_congested(data: Optional[dict], error: Optional[Exception]) -> bool:
+            status = data.get("status") if data else _upstream_status(error)
+            return status == 429 or (isinstance(status, int) and status >= 500)
+
+        def _on_progress(done: int, total_count: int):
+            nonlocal last_progress_at
+            now = time.monotonic()
+            if (
+                done == total_count
+                or done % progress_step == 0
+                or now - last_progress_at >= REFRESH_PROGRESS_INTERVAL_SEC
+            ):
+                last_progress_at = now
+                logger.info(
+                    f"Refresh progress: {done}/{total_count} "
+                    f"(concurrency={concurrency.limit})"
+                )
+            if on_progress:
+                on_progress(done, total_count)
+
+        results = await run_adaptive(
+            to_refresh,
+            _refresh_one,
+            concurrency=concurrency,
+            bucket=bucket,
+            is_congested=_is_congested,
+            on_progress=_on_progress,
+        )
+        outcomes = [r["data"] for r in results if r.get("ok")]
+        refreshed = sum(1 for r in outcomes if r["status"] == 200)
+        recovered = sum(1 for r in outcomes if r["recovered"])
+        expired = sum(1 for r in outcomes if r["expired"])
 
-        await self._save()
+        await self._save_deltas()
 
         logger.info(
             f"Refresh completed: "
@@ -800,4 +1430,4 @@ async def get_token_manager() -> TokenManager:
     return await TokenManager.get_instance()
 
 
-__all__ = ["TokenManager", "get_token_manager"]
+__all__ = ["TokenManager", "TokenLease", "get_token_manager"]
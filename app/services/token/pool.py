@@ -1,26 +1,175 @@
 """Token 池管理"""
 
+import bisect
 import random
-from typing import Dict, List, Optional, Iterator
+from typing import Callable, Dict, List, Optional, Iterator, Tuple
 
-from app.services.token.models import TokenInfo, TokenStatus, TokenPoolStats
+from app.services.token.models import (
+    TokenInfo,
+    TokenStatus,
+    TokenPoolStats,
+    EffortType,
+)
+
+
+class _TokenBucket:
+    """同负载、同额度的可用 Token 集合（支持 O(1) 增删与随机选择）"""
+
+    __slots__ = ("items", "positions")
+
+    def __init__(self):
+        self.items: List[TokenInfo] = []
+        self.positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, token: TokenInfo):
+        self.positions[token.token] = len(self.items)
+        self.items.append(token)
+
+    def discard(self, token_str: str):
+        idx = self.positions.pop(token_str, None)
+        if idx is None:
+            return
+        last = self.items.pop()
+        if idx < len(self.items):
+            self.items[idx] = last
+            self.positions[last.token] = idx
+
+    def other(self, token: TokenInfo, exclude: set) -> Optional[TokenInfo]:
+        """随机选择另一个不在 exclude 中的 Token（少量尝试，找不到返回 None）"""
+        if len(self.items) < 2:
+            return None
+        for _ in range(4):
+            candidate = random.choice(self.items)
+            if candidate is not token and (
+                not exclude or candidate.token not in exclude
+            ):
+                return candidate
+        return None
+
+    def choice(self, exclude: set, excluded: int) -> Optional[TokenInfo]:
+        """随机选择一个不在 exclude 中的 Token"""
+        size = len(self.items)
+        if size <= excluded:
+            return None
+        if not excluded:
+            return random.choice(self.items)
+        # 排除项占比较小时拒绝采样，否则线性过滤
+        if size > excluded * 2:
+            while True:
+                token = random.choice(self.items)
+                if token.token not in exclude:
+                    return token
+        candidates = [t for t in self.items if t.token not in exclude]
+        return random.choice(candidates) if candidates else None
 
 
 class TokenPool:
     """Token 池（管理一组 Token）"""
 
-    def __init__(self, name: str):
+    def __init__(
+        self,
+        name: str,
+        max_inflight: int = 0,
+        health: Optional[Callable[[str], float]] = None,
+    ):
         self.name = name
         self._tokens: Dict[str, TokenInfo] = {}
+        # 健康评分函数（token -> 分数，越小越好），用于二选一择优
+        self.health = health
+        # 单 Token 并发上限（0 表示不限制）、进行中的请求数与预留额度
+        self.max_inflight = max(0, int(max_inflight))
+        self._inflight: Dict[str, int] = {}
+        self._reserved: Dict[str, int] = {}
+        # 可用 Token 索引：(进行中请求数, -可用额度) -> 桶，键升序列表，token -> 所在键
+        self._buckets: Dict[Tuple[int, int], _TokenBucket] = {}
+        self._keys: List[Tuple[int, int]] = []
+        self._indexed: Dict[str, Tuple[int, int]] = {}
+
+    # ========== 索引维护 ==========
+
+    def _index_key(self, token: TokenInfo) -> Optional[Tuple[int, int]]:
+        """计算 Token 的索引键，不可选时返回 None"""
+        if not token.is_available():
+            return None
+        inflight = self._inflight.get(token.token, 0)
+        if self.max_inflight and inflight >= self.max_inflight:
+            return None
+        quota = token.quota - self._reserved.get(token.token, 0)
+        if quota <= 0:
+            return None
+        return (inflight, -quota)
+
+    def _index_add(self, token: TokenInfo, key: Tuple[int, int]):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _TokenBucket()
+            bisect.insort(self._keys, key)
+        bucket.add(token)
+        self._indexed[token.token] = key
+
+    def _index_remove(self, token_str: str):
+        key = self._indexed.pop(token_str, None)
+        if key is None:
+            return
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return
+        bucket.discard(token_str)
+        if not bucket:
+            del self._buckets[key]
+            idx = bisect.bisect_left(self._keys, key)
+            if idx < len(self._keys) and self._keys[idx] == key:
+                self._keys.pop(idx)
+
+    def reindex(self, token_str: str):
+        """Token 状态、额度或负载变化后同步索引"""
+        token = self._tokens.get(token_str)
+        if token is None:
+            self._index_remove(token_str)
+            return
+        key = self._index_key(token)
+        if key == self._indexed.get(token_str):
+            return
+        self._index_remove(token_str)
+        if key is not None:
+            self._index_add(token, key)
+
+    def _rebuild_index(self):
+        """重建索引（加载时调用）"""
+        self._buckets = {}
+        self._keys = []
+        self._indexed = {}
+        for token in self._tokens.values():
+            key = self._index_key(token)
+            if key is not None:
+                self._index_add(token, key)
+
+    def set_max_inflight(self, max_inflight: int):
+        """更新单 Token 并发上限"""
+        max_inflight = max(0, int(max_inflight))
+        if max_inflight == self.max_inflight:
+            return
+        self.max_inflight = max_inflight
+        self._rebuild_index()
+
+    # ========== 增删查 ==========
 
     def add(self, token: TokenInfo):
         """添加 Token"""
+        self._index_remove(token.token)
         self._tokens[token.token] = token
+        self.reindex(token.token)
 
     def remove(self, token_str: str) -> bool:
         """删除 Token"""
         if token_str in self._tokens:
             del self._tokens[token_str]
+            self._inflight.pop(token_str, None)
+            self._reserved.pop(token_str, None)
+            self._index_remove(token_str)
             return True
         return False
 
@@ -32,34 +181,157 @@ class TokenPool:
         """
         选择一个可用 Token
         策略:
-        1. 选择 active 状态且有配额的 token
-        2. 优先选择剩余额度最多的
-        3. 如果额度相同，随机选择（避免并发冲突）
+        1. 选择 active 状态、扣除预留后仍有配额且未达到并发上限的 token
+        2. 优先选择进行中请求最少的
+        3. 负载相同时，优先选择剩余可用额度最多的
+        4. 如果负载与额度都相同，随机选择（避免并发冲突）
+        5. 启用健康评分时，在同负载候选中再随机取一个，二选一保留评分更优者
         """
-        # 选择 token
-        available = [
-            t
-            for t in self._tokens.values()
-            if t.status == TokenStatus.ACTIVE and t.quota > 0
-            and (not exclude or t.token not in exclude)
-        ]
-
-        if not available:
+        if not self._keys:
+            return None
+
+        # 统计各桶中被排除的数量（exclude 通常很小）
+        excluded_by_key: Dict[Tuple[int, int], int] = {}
+        if exclude:
+            for token_str in exclude:
+                key = self._indexed.get(token_str)
+                if key is not None:
+                    excluded_by_key[key] = excluded_by_key.get(key, 0) + 1
+
+        # 从负载最低、额度最高的桶开始查找
+        for idx, key in enumerate(self._keys):
+            bucket = self._buckets[key]
+            token = bucket.choice(exclude, excluded_by_key.get(key, 0))
+            if token:
+                if self.health is None:
+                    return token
+                return self._power_of_two(idx, token, exclude)
+
+        return None
+
+    def _power_of_two(
+        self, idx: int, token: TokenInfo, exclude: Optional[set]
+    ) -> TokenInfo:
+        """在同负载的候选中再取一个，保留健康评分更优的"""
+        key = self._keys[idx]
+        alt = self._buckets[key].other(token, exclude)
+        if alt is None:
+            # 同桶无其他候选时，从下一个同负载（额度稍低）的桶中选取
+            for next_key in self._keys[idx + 1 : idx + 3]:
+                if next_key[0] != key[0]:
+                    break
+                excluded = (
+                    sum(1 for t in exclude if self._indexed.get(t) == next_key)
+                    if exclude
+                    else 0
+                )
+                alt = self._buckets[next_key].choice(exclude, excluded)
+                if alt:
+                    break
+        if alt is None:
+            return token
+        try:
+            if self.health(alt.token) < self.health(token.token):
+                return alt
+        except Exception:
+            pass
+        return token
+
+    # ========== 并发追踪 ==========
+
+    def acquire(self, token_str: str, cost: int = 0) -> bool:
+        """登记一个进行中的请求，并预留 cost 额度"""
+        if token_str not in self._tokens:
+            return False
+        self._inflight[token_str] = self._inflight.get(token_str, 0) + 1
+        if cost > 0:
+            self._reserved[token_str] = self._reserved.get(token_str, 0) + cost
+        self.reindex(token_str)
+        return True
+
+    def release(self, token_str: str, cost: int = 0) -> bool:
+        """释放一个进行中的请求及其预留额度"""
+        count = self._inflight.get(token_str, 0)
+        if count <= 0:
+            return False
+        if count == 1:
+            del self._inflight[token_str]
+        else:
+            self._inflight[token_str] = count - 1
+        if cost > 0:
+            reserved = self._reserved.get(token_str, 0) - cost
+            if reserved > 0:
+                self._reserved[token_str] = reserved
+            else:
+                self._reserved.pop(token_str, None)
+        self.reindex(token_str)
+        return True
+
+    def inflight(self, token_str: str) -> int:
+        """Token 进行中的请求数"""
+        return self._inflight.get(token_str, 0)
+
+    def reserved(self, token_str: str) -> int:
+        """Token 已预留的额度"""
+        return self._reserved.get(token_str, 0)
+
+    # ========== 状态变更（同步索引） ==========
+
+    def consume(
+        self, token_str: str, effort: EffortType = EffortType.LOW
+    ) -> Optional[int]:
+        """消耗配额，返回实际扣除的配额（Token 不存在时返回 None）"""
+        token = self._tokens.get(token_str)
+        if not token:
             return None
+        consumed = token.consume(effort)
+        self.reindex(token_str)
+        return consumed
 
-        # 找到最大额度
-        max_quota = max(t.quota for t in available)
+    def update_quota(self, token_str: str, new_quota: int) -> Optional[TokenInfo]:
+        """更新配额（用于 API 同步）"""
+        token = self._tokens.get(token_str)
+        if not token:
+            return None
+        token.update_quota(new_quota)
+        self.reindex(token_str)
+        return token
 
-        # 筛选最大额度
-        candidates = [t for t in available if t.quota == max_quota]
+    def record_fail(
+        self,
+        token_str: str,
+        status_code: int = 401,
+        reason: str = "",
+        threshold: Optional[int] = None,
+    ) -> Optional[TokenInfo]:
+        """记录失败"""
+        token = self._tokens.get(token_str)
+        if not token:
+            return None
+        token.record_fail(status_code, reason, threshold=threshold)
+        self.reindex(token_str)
+        return token
 
-        # 随机选择
-        return random.choice(candidates)
+    def mark_rate_limited(self, token_str: str) -> Optional[TokenInfo]:
+        """标记为配额耗尽（COOLING）"""
+        token = self._tokens.get(token_str)
+        if not token:
+            return None
+        token.quota = 0
+        token.status = TokenStatus.COOLING
+        self.reindex(token_str)
+        return token
+
+    # ========== 统计 ==========
 
     def count(self) -> int:
         """Token 数量"""
         return len(self._tokens)
 
+    def available_count(self) -> int:
+        """可用 Token 数量"""
+        return len(self._indexed)
+
     def list(self) -> List[TokenInfo]:
         """获取所有 Token"""
         return list(self._tokens.values())
@@ -85,10 +357,6 @@ class TokenPool:
 
         return stats
 
-    def _rebuild_index(self):
-        """重建索引（预留接口，用于加载时调用）"""
-        pass
-
     def __iter__(self) -> Iterator[TokenInfo]:
         return iter(self._tokens.values())
 
@@ -1,77 +1,202 @@
 """Token 刷新调度器"""
 
 import asyncio
-from typing import Optional
+import heapq
+import time
+from typing import Dict, List, Optional, Tuple
 
 from app.core.logger import logger
 from app.core.storage import get_storage, StorageError, RedisStorage
 from app.services.token.manager import get_token_manager
 
+# 全量扫描兜底间隔（秒），覆盖其他 worker 或重载带来的冷却 Token
+RESCAN_INTERVAL_SEC = 600
+# 同一时刻附近到期的 Token 合并为一批的等待窗口（秒）
+DUE_COALESCE_SEC = 1.0
+# 单批最多刷新的 Token 数
+MAX_BATCH_SIZE = 500
+# 未刷新成功（或未拿到锁）的 Token 重新入队的延迟（秒）
+RETRY_DELAY_SEC = 60
+# 刷新锁超时（秒）
+REFRESH_LOCK_TIMEOUT_SEC = 600
+
 
 class TokenRefreshScheduler:
-    """Token 自动刷新调度器"""
+    """
+    Token 自动刷新调度器
+
+    按每个 COOLING Token 的下次可刷新时间（last_sync_at + 池刷新间隔）维护最小堆，
+    在最早到期时刻唤醒；Token 进入 COOLING 时由 TokenManager 通知入队。
+    """
 
     def __init__(self, interval_hours: int = 8):
         self.interval_hours = interval_hours
         self.interval_seconds = interval_hours * 3600
         self._task: Optional[asyncio.Task] = None
         self._running = False
-
-    async def _refresh_loop(self):
-        """刷新循环"""
-        logger.info(f"Scheduler: started (interval: {self.interval_hours}h)")
-
-        while self._running:
+        # (到期毫秒时间戳, pool_name, token) 最小堆，及每个 Token 当前有效的到期时间
+        self._heap: List[Tuple[int, str, str]] = []
+        self._due: Dict[Tuple[str, str], int] = {}
+        self._wakeup = asyncio.Event()
+        self._manager = None
+
+    # ========== 队列维护 ==========
+
+    def _push(self, pool_name: str, token: str, due_ms: int):
+        key = (pool_name, token)
+        current = self._due.get(key)
+        if current is not None and current <= due_ms:
+            return
+        self._due[key] = due_ms
+        heapq.heappush(self._heap, (due_ms, pool_name, token))
+        # 新的最早到期时间，唤醒调度循环重新计算等待时长
+        if self._heap[0][0] == due_ms:
+            self._wakeup.set()
+
+    def notify(self, pool_name: str, token: str):
+        """Token 进入 COOLING 时调用"""
+        manager = self._manager
+        if manager is None:
+            return
+        pool = manager.pools.get(pool_name)
+        info = pool.get(token) if pool else None
+        if info is None:
+            return
+        due_ms = manager.next_refresh_at(pool_name, info)
+        if due_ms is not None:
+            self._push(pool_name, info.token, due_ms)
+
+    def _rescan(self):
+        """全量扫描 COOLING Token 入队"""
+        manager = self._manager
+        count = 0
+        for pool_name, info in manager.iter_cooling():
+            due_ms = manager.next_refresh_at(pool_name, info)
+            if due_ms is not None:
+                self._push(pool_name, info.token, due_ms)
+                count += 1
+        logger.debug(f"Scheduler: rescan queued {count} cooling tokens")
+
+    def _pop_due(self, now_ms: int) -> List[Tuple[str, str]]:
+        """取出已到期的 Token（跳过已被更新的旧条目）"""
+        due: List[Tuple[str, str]] = []
+        while self._heap and self._heap[0][0] <= now_ms and len(due) < MAX_BATCH_SIZE:
+            due_ms, pool_name, token = heapq.heappop(self._heap)
+            key = (pool_name, token)
+            if self._due.get(key) != due_ms:
+                continue
+            del self._due[key]
+            due.append(key)
+        return due
+
+    def _requeue(self, targets: List[Tuple[str, str]], delay_sec: float):
+        """刷新后仍为 COOLING 的 Token 按新的到期时间重新入队"""
+        manager = self._manager
+        retry_at = int((time.time() + delay_sec) * 1000)
+        for pool_name, token in targets:
+            pool = manager.pools.get(pool_name)
+            info = pool.get(token) if pool else None
+            if info is None:
+                continue
+            due_ms = manager.next_refresh_at(pool_name, info)
+            if due_ms is None:
+                continue
+            # 未成功同步（last_sync_at 未更新）时避免立即重试
+            self._push(pool_name, token, max(due_ms, retry_at))
+
+    # ========== 刷新执行 ==========
+
+    async def _refresh(self, targets: List[Tuple[str, str]]) -> bool:
+        """刷新到期 Token，返回是否获得刷新锁"""
+        storage = get_storage()
+        lock_acquired = False
+        lock = None
+
+        if isinstance(storage, RedisStorage):
+            # Redis: non-blocking lock to avoid multi-worker duplication
+            lock_key = "grok2api:lock:token_refresh"
+            lock = storage.redis.lock(
+                lock_key, timeout=REFRESH_LOCK_TIMEOUT_SEC, blocking_timeout=0
+            )
+            lock_acquired = await lock.acquire(blocking=False)
+        else:
             try:
-                storage = get_storage()
+                async with storage.acquire_lock("token_refresh", timeout=1):
+                    lock_acquired = True
+            except StorageError:
                 lock_acquired = False
-                lock = None
-
-                if isinstance(storage, RedisStorage):
-                    # Redis: non-blocking lock to avoid multi-worker duplication
-                    lock_key = "grok2api:lock:token_refresh"
-                    lock = storage.redis.lock(
-                        lock_key, timeout=self.interval_seconds + 60, blocking_timeout=0
-                    )
-                    lock_acquired = await lock.acquire(blocking=False)
-                else:
-                    try:
-                        async with storage.acquire_lock("token_refresh", timeout=1):
-                            lock_acquired = True
-                    except StorageError:
-                        lock_acquired = False
 
-                if not lock_acquired:
-                    logger.info("Scheduler: skipped (lock not acquired)")
-                    await asyncio.sleep(self.interval_seconds)
-                    continue
+        if not lock_acquired:
+            logger.info("Scheduler: skipped (lock not acquired)")
+            return False
+
+        try:
+            logger.info(f"Scheduler: refreshing {len(targets)} due tokens...")
+            result = await self._manager.refresh_cooling_tokens(targets)
+            logger.info(
+                f"Scheduler: refresh completed - "
+                f"checked={result['checked']}, "
+                f"refreshed={result['refreshed']}, "
+                f"recovered={result['recovered']}, "
+                f"expired={result['expired']}"
+            )
+        finally:
+            if lock is not None and lock_acquired:
+                try:
+                    await lock.release()
+                except Exception:
+                    pass
+        return True
 
+    async def _refresh_loop(self):
+        """刷新循环"""
+        logger.info(
+            f"Scheduler: started (deadline-driven, fallback rescan: "
+            f"{min(self.interval_seconds, RESCAN_INTERVAL_SEC)}s)"
+        )
+        self._manager = await get_token_manager()
+        self._manager.add_cooling_listener(self.notify)
+        rescan_interval = max(1, min(self.interval_seconds, RESCAN_INTERVAL_SEC))
+        next_rescan = 0.0
+
+        try:
+            while self._running:
                 try:
-                    logger.info("Scheduler: starting token refresh...")
-                    manager = await get_token_manager()
-                    result = await manager.refresh_cooling_tokens()
-
-                    logger.info(
-                        f"Scheduler: refresh completed - "
-                        f"checked={result['checked']}, "
-                        f"refreshed={result['refreshed']}, "
-                        f"recovered={result['recovered']}, "
-                        f"expired={result['expired']}"
-                    )
-                finally:
-                    if lock is not None and lock_acquired:
-                        try:
-                            await lock.release()
-                        except Exception:
-                            pass
-
-                await asyncio.sleep(self.interval_seconds)
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Scheduler: refresh error - {e}")
-                await asyncio.sleep(self.interval_seconds)
+                    now = time.monotonic()
+                    if now >= next_rescan:
+                        self._rescan()
+                        next_rescan = now + rescan_interval
+
+                    targets = self._pop_due(int(time.time() * 1000))
+                    if targets:
+                        refreshed = await self._refresh(targets)
+                        # 未获得锁时由持锁 worker 刷新，稍后复查
+                        self._requeue(targets, RETRY_DELAY_SEC)
+                        if refreshed and self._heap:
+                            continue
+
+                    # 等待到最早到期时刻、兜底扫描或新的冷却通知
+                    timeout = next_rescan - time.monotonic()
+                    if self._heap:
+                        due_in = self._heap[0][0] / 1000 - time.time()
+                        timeout = min(timeout, max(due_in, 0) + DUE_COALESCE_SEC)
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), timeout=max(timeout, 0)
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Scheduler: refresh error - {e}")
+                    await asyncio.sleep(RETRY_DELAY_SEC)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._manager.remove_cooling_listener(self.notify)
 
     def start(self):
         """启动调度器"""
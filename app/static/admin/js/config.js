@@ -3,11 +3,15 @@ let currentConfig = {};
 const byId = (id) => document.getElementById(id);
 const NUMERIC_FIELDS = new Set([
   'timeout',
+  'request_timeout',
   'max_retry',
   'retry_backoff_base',
   'retry_backoff_factor',
   'retry_backoff_max',
   'retry_budget',
+  'breaker_failure_threshold',
+  'breaker_recovery_sec',
+  'rate_limit_max_wait_sec',
   'refresh_interval_hours',
   'super_refresh_interval_hours',
   'fail_threshold',
@@ -24,6 +28,19 @@ const NUMERIC_FIELDS = new Set([
   'delete_timeout',
   'delete_batch_size',
   'reload_interval_sec',
+  'max_inflight',
+  'lease_ttl_sec',
+  'refresh_concurrency',
+  'refresh_rate',
+  'pool_max_clients',
+  'pool_idle_sec',
+  'warm_connections',
+  'keepalive_interval_sec',
+  'hedge_percentile',
+  'hedge_min_delay_sec',
+  'stream_coalesce_ms',
+  'stream_coalesce_bytes',
+  'image_render_concurrent',
   'stream_timeout',
   'final_timeout',
   'final_min_bytes',
@@ -47,7 +64,8 @@ const LOCALE_MAP = {
     "stream": { title: "流式响应", desc: "是否默认启用流式输出。" },
     "thinking": { title: "思维链", desc: "是否默认启用思维链输出。" },
     "dynamic_statsig": { title: "动态指纹", desc: "是否默认启用动态生成 Statsig 指纹。" },
-    "filter_tags": { title: "过滤标签", desc: "设置自动过滤 Grok 响应中的特殊标签。" }
+    "filter_tags": { title: "过滤标签", desc: "设置自动过滤 Grok 响应中的特殊标签。" },
+    "request_timeout": { title: "请求截止时间", desc: "单次 API 请求的总耗时上限（秒，0 为不限），重试、换 Token、上传下载与流式输出共享；客户端可用 X-Request-Timeout 请求头进一步缩短。" }
   },
 
 
@@ -55,9 +73,16 @@ const LOCALE_MAP = {
     "label": "代理配置",
     "base_proxy_url": { title: "基础代理 URL", desc: "代理请求到 Grok 官网的基础服务地址。" },
     "asset_proxy_url": { title: "资源代理 URL", desc: "代理请求到 Grok 官网的静态资源（图片/视频）地址。" },
+    "base_proxy_pool": { title: "基础代理池", desc: "多个基础代理（JSON 数组），按延迟与错误率加权分流，非空时替代基础代理 URL。" },
+    "asset_proxy_pool": { title: "资源代理池", desc: "多个资源代理（JSON 数组），非空时替代资源代理 URL。" },
+    "sticky_proxy": { title: "代理粘性", desc: "同一 Token 固定使用同一代理，保持账号出口 IP 稳定。" },
     "cf_clearance": { title: "CF Clearance", desc: "Cloudflare Clearance Cookie，用于绕过反爬虫验证。" },
     "browser": { title: "浏览器指纹", desc: "curl_cffi 浏览器指纹标识（如 chrome136）。" },
-    "user_agent": { title: "User-Agent", desc: "HTTP 请求的 User-Agent 字符串，需与浏览器指纹匹配。" }
+    "user_agent": { title: "User-Agent", desc: "HTTP 请求的 User-Agent 字符串，需与浏览器指纹匹配。" },
+    "pool_max_clients": { title: "连接池上限", desc: "共享会话单个连接池的最大连接数（每种用途各自一个池）。" },
+    "pool_idle_sec": { title: "会话空闲回收", desc: "共享会话空闲超过该时长（秒）后关闭。" },
+    "warm_connections": { title: "预热连接数", desc: "预热并保持到 grok.com / assets.grok.com 的连接数，0 为关闭。" },
+    "keepalive_interval_sec": { title: "保活间隔", desc: "预热连接的保活间隔（秒）。" }
   },
 
 
@@ -65,10 +90,16 @@ const LOCALE_MAP = {
     "label": "重试策略",
     "max_retry": { title: "最大重试次数", desc: "请求 Grok 服务失败时的最大重试次数。" },
     "retry_status_codes": { title: "重试状态码", desc: "触发重试的 HTTP 状态码列表。" },
+    "token_fatal_status_codes": { title: "换 Token 状态码", desc: "Token 级致命状态码，不在同一 Token 上重试，直接换 Token（共享重试预算）。" },
     "retry_backoff_base": { title: "退避基数", desc: "重试退避的基础延迟（秒）。" },
     "retry_backoff_factor": { title: "退避倍率", desc: "重试退避的指数放大系数。" },
     "retry_backoff_max": { title: "退避上限", desc: "单次重试等待的最大延迟（秒）。" },
-    "retry_budget": { title: "退避预算", desc: "单次请求的最大重试总耗时（秒）。" }
+    "retry_budget": { title: "退避预算", desc: "单次请求的最大重试总耗时（秒）。" },
+    "breaker_enabled": { title: "启用熔断", desc: "按上游端点与代理熔断，连续传输错误或 5xx 时快速失败。" },
+    "breaker_failure_threshold": { title: "熔断阈值", desc: "连续失败多少次后熔断。" },
+    "breaker_recovery_sec": { title: "熔断恢复", desc: "熔断后多久进入半开探测（秒）。" },
+    "rate_limiter_enabled": { title: "上游限速", desc: "按 Token 与端点从 429 / Retry-After 学习速率，请求前延迟或换 Token。" },
+    "rate_limit_max_wait_sec": { title: "限速等待上限", desc: "请求前最多等待限速多久（秒），超过则快速失败。" }
   },
 
 
@@ -76,7 +107,13 @@ const LOCALE_MAP = {
     "label": "对话配置",
     "concurrent": { title: "并发上限", desc: "Reverse 接口并发上限。" },
     "timeout": { title: "请求超时", desc: "Reverse 接口超时时间（秒）。" },
-    "stream_timeout": { title: "流空闲超时", desc: "流式空闲超时时间（秒）。" }
+    "stream_timeout": { title: "流空闲超时", desc: "流式空闲超时时间（秒）。" },
+    "hedge_enabled": { title: "对冲请求", desc: "首行超时后换 Token 发起重复请求，取先返回者（仅非 heavy 且无附件的请求）。" },
+    "hedge_percentile": { title: "对冲分位数", desc: "对冲延迟取上游首行耗时的分位数（%）。" },
+    "hedge_min_delay_sec": { title: "对冲最小延迟", desc: "对冲延迟下限（秒）。" },
+    "stream_coalesce_ms": { title: "流式合并窗口", desc: "将连续内容增量合并为一个 SSE 帧的时间窗口（毫秒），0 为逐 token 输出。" },
+    "stream_coalesce_bytes": { title: "流式合并上限", desc: "合并缓冲达到该字节数（UTF-8）时立即输出。" },
+    "image_render_concurrent": { title: "图片渲染并发", desc: "单个回复内图片并发渲染（下载/转 base64）上限，结果按原顺序输出。" }
   },
 
 
@@ -130,8 +167,14 @@ const LOCALE_MAP = {
     "refresh_interval_hours": { title: "刷新间隔", desc: "普通 Token 刷新的时间间隔（小时）。" },
     "super_refresh_interval_hours": { title: "Super 刷新间隔", desc: "Super Token 刷新的时间间隔（小时）。" },
     "fail_threshold": { title: "失败阈值", desc: "单个 Token 连续失败多少次后被标记为不可用。" },
+    "refresh_concurrency": { title: "刷新并发", desc: "冷却 Token 刷新的最大并发，遇到 429/5xx 时自动收缩。" },
+    "refresh_rate": { title: "刷新速率", desc: "冷却 Token 刷新的探测速率（次/秒），0 表示不限速。" },
     "save_delay_ms": { title: "保存延迟", desc: "Token 变更合并写入的延迟（毫秒）。" },
-    "reload_interval_sec": { title: "同步间隔", desc: "多 worker 场景下 Token 状态刷新间隔（秒）。" }
+    "reload_interval_sec": { title: "同步间隔", desc: "多 worker 场景下 Token 状态同步间隔（秒），优先增量同步，必要时全量重载。" },
+    "max_inflight": { title: "单 Token 并发", desc: "单个 Token 同时进行的请求上限，0 表示不限制。" },
+    "lease_ttl_sec": { title: "预留超时", desc: "请求预留额度的最长保留时间（秒），超时未结算将被回收。" },
+    "health_scoring": { title: "健康评分", desc: "按首字节耗时、429 与错误率为 Token 评分，选择时二选一避开慢或不稳定的 Token。" },
+    "atomic_quota": { title: "原子额度", desc: "在 Redis 中原子扣减额度与记录失败，多 worker 共享一致额度（仅 Redis 存储生效）。" }
   },
 
 
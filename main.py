@@ -36,6 +36,7 @@ from app.core.config import get_config  # noqa: E402
 from app.core.logger import logger, setup_logging  # noqa: E402
 from app.core.exceptions import register_exception_handlers  # noqa: E402
 from app.core.response_middleware import ResponseLoggerMiddleware  # noqa: E402
+from app.core.deadline import DeadlineMiddleware  # noqa: E402
 from app.api.v1.chat import router as chat_router  # noqa: E402
 from app.api.v1.image import router as image_router  # noqa: E402
 from app.api.v1.nsfw import router as nsfw_router  # noqa: E402
@@ -156,6 +157,11 @@ async def lifespan(app: FastAPI):
         scheduler = get_scheduler(interval)
         scheduler.start()
 
+    # 5. 预热上游连接
+    from app.services.reverse.utils.warmup import get_connection_warmer
+
+    get_connection_warmer().start()
+
     logger.info("Application startup complete.")
     yield
 
@@ -167,6 +173,13 @@ async def lifespan(app: FastAPI):
     if StorageFactory._instance:
         await StorageFactory._instance.close()
 
+    from app.services.reverse.utils.session import get_session_pool
+    from app.services.reverse.utils.websocket import close_websocket_sessions
+
+    await get_connection_warmer().stop()
+    await get_session_pool().close()
+    await close_websocket_sessions()
+
     if refresh_enabled:
         scheduler = get_scheduler()
         scheduler.stop()
@@ -188,6 +201,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # 请求截止时间中间件
+    app.add_middleware(DeadlineMiddleware)
+
     # 请求日志和 ID 中间件
     app.add_middleware(ResponseLoggerMiddleware)
 
@@ -0,0 +1,119 @@
+"""
+Micro-benchmark for build_headers.
+
+Compares the template-based build_headers against the previous
+per-call implementation (kept inline below as the baseline).
+
+Usage:
+  python scripts/bench_headers.py
+  (optional) BENCH_ITERATIONS=200000
+"""
+
+import os
+import sys
+import timeit
+import uuid
+from pathlib import Path
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import orjson  # noqa: E402
+
+from app.core.config import config, get_config  # noqa: E402
+from app.core.logger import logger, setup_logging  # noqa: E402
+from app.services.reverse.utils.headers import build_headers  # noqa: E402
+from app.services.reverse.utils.statsig import StatsigGenerator  # noqa: E402
+
+TOKEN = "sso=" + "x" * 160
+RANDOM_KEYS = ("x-statsig-id", "x-xai-request-id")
+
+
+def legacy_build_headers(cookie_token, content_type=None, origin=None, referer=None):
+    headers = {
+        "Accept-Encoding": "gzip, deflate, br, zstd",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        "Baggage": "sentry-environment=production,sentry-release=d6add6fb0460641fd482d767a335ef72b9b6abb8,sentry-public_key=b311e0f2690c81f25e2c4cf6d4f7ce1c",
+        "Origin": origin or "https://grok.com",
+        "Priority": "u=1, i",
+        "Referer": referer or "https://grok.com/",
+        "Sec-Ch-Ua": '"Google Chrome";v="136", "Chromium";v="136", "Not(A:Brand";v="24"',
+        "Sec-Ch-Ua-Arch": "arm",
+        "Sec-Ch-Ua-Bitness": "64",
+        "Sec-Ch-Ua-Mobile": "?0",
+        "Sec-Ch-Ua-Model": "",
+        "Sec-Ch-Ua-Platform": '"macOS"',
+        "Sec-Fetch-Mode": "cors",
+        "User-Agent": get_config("proxy.user_agent"),
+    }
+    token = cookie_token.removeprefix("sso=")
+    cookie = f"sso={token}; sso-rw={token}"
+    cf_clearance = get_config("proxy.cf_clearance")
+    if cf_clearance:
+        cookie += f";cf_clearance={cf_clearance}"
+    headers["Cookie"] = cookie
+    if content_type in ["image/jpeg", "image/png", "video/mp4", "video/webm"]:
+        headers["Content-Type"] = content_type
+        headers["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7"
+        headers["Sec-Fetch-Dest"] = "document"
+    else:
+        headers["Content-Type"] = "application/json"
+        headers["Accept"] = "*/*"
+        headers["Sec-Fetch-Dest"] = "empty"
+    origin_domain = urlparse(headers.get("Origin", "")).hostname
+    referer_domain = urlparse(headers.get("Referer", "")).hostname
+    if origin_domain and referer_domain and origin_domain == referer_domain:
+        headers["Sec-Fetch-Site"] = "same-origin"
+    else:
+        headers["Sec-Fetch-Site"] = "same-site"
+    headers["x-statsig-id"] = StatsigGenerator.gen_id()
+    headers["x-xai-request-id"] = str(uuid.uuid4())
+    safe_headers = dict(headers)
+    safe_headers["Cookie"] = "<redacted>"
+    logger.debug(f"Built headers: {orjson.dumps(safe_headers).decode()}")
+    return headers
+
+
+def _check_equivalent():
+    cases = [
+        {},
+        {"content_type": "application/json"},
+        {"content_type": "image/png", "origin": "https://grok.com", "referer": "https://assets.grok.com/"},
+    ]
+    for kwargs in cases:
+        old = legacy_build_headers(TOKEN, **kwargs)
+        new = build_headers(TOKEN, **kwargs)
+        for key in RANDOM_KEYS:
+            old.pop(key)
+            new.pop(key)
+        assert list(old.items()) == list(new.items()), kwargs
+
+
+def main() -> int:
+    # 与生产默认一致：INFO 级别，调试日志关闭
+    setup_logging(level="INFO", json_console=False, file_logging=False)
+    config._ensure_defaults()
+    config._config = dict(config._defaults)
+    _check_equivalent()
+
+    iterations = int(os.getenv("BENCH_ITERATIONS", "100000"))
+    results = {}
+    for name, fn in (("legacy", legacy_build_headers), ("template", build_headers)):
+        seconds = min(
+            timeit.repeat(
+                lambda fn=fn: fn(TOKEN, content_type="application/json"),
+                number=iterations,
+                repeat=3,
+            )
+        )
+        results[name] = seconds
+        print(f"{name:>8}: {seconds / iterations * 1e6:.2f} us/call")
+
+    print(f" speedup: {results['legacy'] / results['template']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
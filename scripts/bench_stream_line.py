@@ -0,0 +1,185 @@
+"""
+Micro-benchmark for the StreamProcessor line fast path.
+
+Replays a synthetic upstream stream built in this script (thinking tokens,
+answer tokens, a few structural lines, shaped after the live grok.com
+format; not a recorded capture) and reports:
+
+- classify: per-line cost of turning a raw line into (token, isThinking),
+  previous _normalize_line + orjson.loads + .get chain vs parse_token_line
+- process: StreamProcessor.process end to end with the fast path enabled
+  and disabled (also checks both produce the same SSE output)
+
+Usage:
+  python scripts/bench_stream_line.py
+  (optional) BENCH_TOKENS=4000 BENCH_REPEAT=5
+"""
+
+import asyncio
+import os
+import sys
+import time
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import orjson  # noqa: E402
+
+from app.core.config import config  # noqa: E402
+from app.core.logger import setup_logging  # noqa: E402
+from app.services.grok.services import chat as chat_module  # noqa: E402
+from app.services.grok.services.chat import StreamProcessor  # noqa: E402
+from app.services.grok.utils.process import _normalize_line  # noqa: E402
+from app.services.grok.utils.stream_line import parse_token_line  # noqa: E402
+
+RESPONSE_ID = "4f1c9a52-6f0e-4d1b-9a7e-2f1d3c4b5a6e"
+WORDS = ["The", " quick", " brown", " fox", " jumps", " over", " the", " lazy", " dog", ".",
+         " 你好", "，", "世界", " \"quoted\"", " back\\slash", "\n", " `code`", " naïve"]
+
+
+def _line(response: dict) -> bytes:
+    return orjson.dumps({"result": {"response": response}})
+
+
+def build_stream(tokens: int) -> list:
+    lines = [
+        _line({"userResponse": {"responseId": "u-1", "message": "hi", "sender": "human"}}),
+        _line({"llmInfo": {"modelHash": "abc123"}, "responseId": RESPONSE_ID}),
+    ]
+    thinking = tokens // 10
+    for i in range(tokens):
+        lines.append(
+            _line(
+                {
+                    "token": WORDS[i % len(WORDS)],
+                    "isThinking": i < thinking,
+                    "isSoftStop": False,
+                    "responseId": RESPONSE_ID,
+                }
+            )
+        )
+        if i == thinking:
+            lines.append(_line({"token": "", "isThinking": False, "responseId": RESPONSE_ID}))
+    lines.append(
+        _line(
+            {
+                "modelResponse": {
+                    "responseId": RESPONSE_ID,
+                    "message": "".join(WORDS),
+                    "metadata": {"llm_info": {"modelHash": "abc123"}},
+                },
+            }
+        )
+    )
+    return lines
+
+
+def legacy_classify(line):
+    text = _normalize_line(line)
+    if not text:
+        return None
+    try:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return None
+    resp = data.get("result", {}).get("response", {})
+    is_thinking = bool(resp.get("isThinking"))
+    resp.get("llmInfo")
+    resp.get("responseId")
+    if (
+        resp.get("streamingImageGenerationResponse")
+        or resp.get("modelResponse")
+        or resp.get("cardAttachment")
+    ):
+        return None
+    token = resp.get("token")
+    return None if token is None else (token, is_thinking)
+
+
+def fast_classify(line):
+    result = parse_token_line(line)
+    return result if result is not None else legacy_classify(line)
+
+
+def classify(lines: list, repeat: int) -> dict:
+    for line in lines:
+        assert legacy_classify(line) == fast_classify(line), line
+    results = {}
+    for name, fn in (("legacy", legacy_classify), ("fast", fast_classify)):
+        seconds = min(
+            timeit.repeat(
+                lambda fn=fn: [fn(line) for line in lines], number=10, repeat=repeat
+            )
+        )
+        results[name] = seconds / 10 / len(lines)
+    return results
+
+
+async def _replay(lines: list) -> list:
+    async def upstream():
+        for line in lines:
+            yield line
+
+    processor = StreamProcessor("grok-4", "", show_think=True)
+    return [chunk async for chunk in processor.process(upstream())]
+
+
+def _contents(chunks: list) -> list:
+    out = []
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode("utf-8")
+        if chunk.startswith("data: {"):
+            data = orjson.loads(chunk[6:])
+            out.append(data["choices"][0])
+        else:
+            out.append(chunk)
+    return out
+
+
+async def run(lines: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await _replay(lines)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main() -> int:
+    setup_logging(level="INFO", json_console=False, file_logging=False)
+    config._ensure_defaults()
+    config._config = dict(config._defaults)
+
+    tokens = int(os.getenv("BENCH_TOKENS", "4000"))
+    repeat = int(os.getenv("BENCH_REPEAT", "5"))
+    lines = build_stream(tokens)
+
+    print(f"   lines: {len(lines)}")
+    parsed = classify(lines, repeat)
+    print(f"classify: legacy {parsed['legacy'] * 1e6:.2f} us/line, "
+          f"fast {parsed['fast'] * 1e6:.2f} us/line, "
+          f"{parsed['legacy'] / parsed['fast']:.2f}x")
+
+    fast_parser = chat_module.parse_token_line
+    fast_out = await _replay(lines)
+    chat_module.parse_token_line = lambda line, need_response_id=False: None
+    try:
+        legacy_out = await _replay(lines)
+        assert _contents(fast_out) == _contents(legacy_out), "output mismatch"
+        legacy = await run(lines, repeat)
+    finally:
+        chat_module.parse_token_line = fast_parser
+    fast = await run(lines, repeat)
+
+    per_line = 1e6 / len(lines)
+    print(f" process: legacy {legacy * per_line:.2f} us/line, "
+          f"fast {fast * per_line:.2f} us/line, {legacy / fast:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,97 @@
+"""TokenCoalescer / with_flush_ticks：合并后的内容与逐 token 输出一致，上游停顿时按窗口冲刷"""
+
+import asyncio
+
+from app.services.grok.utils.coalesce import (
+    FLUSH_TICK,
+    TokenCoalescer,
+    with_flush_ticks,
+)
+
+
+async def _upstream(items, pause_after=None, pause=0.0):
+    for i, item in enumerate(items):
+        if pause_after is not None and i == pause_after:
+            await asyncio.sleep(pause)
+        yield item
+
+
+async def _coalesced(items, coalescer, **kwargs):
+    """与 StreamProcessor 相同的合并循环，返回输出的帧"""
+    frames = []
+    async for item in with_flush_ticks(_upstream(items, **kwargs), coalescer):
+        if item is FLUSH_TICK:
+            if coalescer.pending:
+                frames.append(coalescer.take())
+            continue
+        if coalescer.add(item):
+            frames.append(coalescer.take())
+    if coalescer.pending:
+        frames.append(coalescer.take())
+    return frames
+
+
+def test_from_config_window():
+    assert TokenCoalescer.from_config(0) is None
+    assert TokenCoalescer.from_config("bad") is None
+    coalescer = TokenCoalescer.from_config(50)
+    assert coalescer is not None and coalescer.window == 0.05
+
+
+def test_size_threshold_flushes():
+    coalescer = TokenCoalescer(10_000, max_bytes=5)
+    assert not coalescer.add("ab")
+    assert coalescer.add("cde")
+    assert coalescer.take() == "abcde"
+    assert not coalescer.pending
+    assert coalescer.timeout() is None
+
+
+def test_size_threshold_counts_utf8_bytes():
+    # 两个汉字为 6 字节，按字符数计则不会触发
+    coalescer = TokenCoalescer(10_000, max_bytes=6)
+    assert not coalescer.add("你")
+    assert coalescer.add("好")
+    assert coalescer.take() == "你好"
+
+
+def test_content_is_preserved():
+    tokens = [f"t{i} " for i in range(200)]
+    frames = asyncio.run(_coalesced(tokens, TokenCoalescer(10_000, max_bytes=64)))
+    assert "".join(frames) == "".join(tokens)
+    assert len(frames) < len(tokens)
+    assert all(len(frame) < 64 + 5 for frame in frames)
+
+
+def test_pause_flushes_within_window():
+    tokens = ["a", "b", "c", "d"]
+    frames = asyncio.run(
+        _coalesced(tokens, TokenCoalescer(20), pause_after=2, pause=0.2)
+    )
+    # 停顿前的内容在窗口到期时单独输出，不等到上游恢复
+    assert frames[0] == "ab"
+    assert "".join(frames) == "abcd"
+
+
+def test_pending_read_survives_ticks():
+    reads = []
+
+    async def upstream():
+        for item in ["x", "y"]:
+            reads.append(item)
+            await asyncio.sleep(0.1)
+            yield item
+
+    async def run():
+        coalescer = TokenCoalescer(10)
+        coalescer.add("buffered")
+        items = []
+        async for item in with_flush_ticks(upstream(), coalescer):
+            if item is FLUSH_TICK:
+                coalescer.take()
+                continue
+            items.append(item)
+        return items
+
+    assert asyncio.run(run()) == ["x", "y"]
+    assert reads == ["x", "y"]
@@ -0,0 +1,149 @@
+"""对冲请求：胜出方输出完整流，落败或失败的一方被关闭并回调清理"""
+
+import asyncio
+
+import pytest
+
+from app.services.grok.utils.hedge import (
+    FirstLineLatency,
+    await_first_line,
+    hedge_stream,
+)
+
+
+class FakeStream:
+    """首行前等待 delay 秒，可在首行处抛出异常"""
+
+    def __init__(self, lines, delay=0.0, error=None):
+        self.lines = lines
+        self.delay = delay
+        self.error = error
+        self.closed = False
+
+    async def _gen(self):
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for line in self.lines:
+                yield line
+        finally:
+            self.closed = True
+
+    def __call__(self):
+        return self._gen()
+
+
+async def _collect(stream):
+    return [line async for line in stream]
+
+
+def _hedge(primary, hedge, delay=0.02):
+    discarded = []
+    started = []
+
+    async def start_hedge():
+        started.append(True)
+        return hedge() if hedge else None
+
+    async def on_discard(index, error, elapsed):
+        discarded.append((index, type(error).__name__ if error else None))
+
+    async def run():
+        index, stream = await hedge_stream(
+            primary(), start_hedge, delay, on_discard, FirstLineLatency()
+        )
+        return index, await _collect(stream)
+
+    return run, discarded, started
+
+
+def test_fast_primary_does_not_hedge():
+    primary = FakeStream(["a", "b"])
+    run, discarded, started = _hedge(primary, FakeStream(["x"]))
+    assert asyncio.run(run()) == (0, ["a", "b"])
+    assert not started
+    assert discarded == []
+
+
+def test_hedge_wins_and_primary_is_closed():
+    primary = FakeStream(["slow"], delay=1.0)
+    hedge = FakeStream(["h1", "h2"])
+    run, discarded, started = _hedge(primary, hedge)
+    assert asyncio.run(run()) == (1, ["h1", "h2"])
+    assert started
+    assert discarded == [(0, None)]
+    assert primary.closed
+
+
+def test_primary_wins_and_hedge_is_discarded():
+    primary = FakeStream(["p"], delay=0.05)
+    hedge = FakeStream(["late"], delay=1.0)
+    run, discarded, _ = _hedge(primary, hedge)
+    assert asyncio.run(run()) == (0, ["p"])
+    assert discarded == [(1, None)]
+    assert hedge.closed
+
+
+def test_failed_hedge_is_reported_when_primary_wins():
+    primary = FakeStream(["p"], delay=0.05)
+    hedge = FakeStream([], error=ValueError("hedge down"))
+    run, discarded, _ = _hedge(primary, hedge)
+    assert asyncio.run(run()) == (0, ["p"])
+    assert discarded == [(1, "ValueError")]
+
+
+def test_all_failed_raises_primary_error():
+    primary = FakeStream([], delay=0.05, error=KeyError("primary"))
+    hedge = FakeStream([], error=ValueError("hedge"))
+    run, discarded, _ = _hedge(primary, hedge)
+    with pytest.raises(KeyError):
+        asyncio.run(run())
+    # 主请求的失败由调用方处理，不经 on_discard
+    assert discarded == [(1, "ValueError")]
+
+
+def test_no_hedge_token_waits_for_primary():
+    primary = FakeStream(["p"], delay=0.05)
+    run, discarded, started = _hedge(primary, None)
+    assert asyncio.run(run()) == (0, ["p"])
+    assert started
+    assert discarded == []
+
+
+def test_cancel_cleans_up_hedge():
+    primary = FakeStream(["p"], delay=1.0)
+    hedge = FakeStream(["h"], delay=1.0)
+    run, discarded, _ = _hedge(primary, hedge)
+
+    async def cancel_midway():
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_midway())
+    assert discarded == [(1, None)]
+    assert primary.closed and hedge.closed
+
+
+def test_hedge_delay_uses_percentile_after_warmup():
+    latency = FirstLineLatency()
+    assert latency.hedge_delay(95, 0.5) == 3.0
+    for i in range(100):
+        latency.record(i / 100)
+    assert latency.hedge_delay(95, 0.5) == pytest.approx(0.94)
+    assert latency.hedge_delay(10, 0.5) == 0.5
+
+
+def test_await_first_line_raises_before_streaming():
+    async def run():
+        stream = await await_first_line(FakeStream(["a", "b"])())
+        assert await _collect(stream) == ["a", "b"]
+        failing = FakeStream([], error=PermissionError("403"))
+        with pytest.raises(PermissionError):
+            await await_first_line(failing())
+        assert failing.closed
+
+    asyncio.run(run())
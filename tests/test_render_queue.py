@@ -0,0 +1,102 @@
+"""ImageRenderQueue：并发渲染，按提交顺序输出，失败跳过，取消时清理"""
+
+import asyncio
+
+from app.services.grok.utils.render_queue import ImageRenderQueue
+
+DELAYS = {"a": 0.15, "b": 0.01, "c": 0.08, "d": 0.02}
+
+
+def _url(name: str) -> str:
+    return f"https://assets.grok.com/users/u/{name}/content"
+
+
+def _renderer(active=None, peak=None, fail=()):
+    async def render(url: str, image_id: str) -> str:
+        if active is not None:
+            active.append(image_id)
+            peak.append(len(active))
+        try:
+            await asyncio.sleep(DELAYS[image_id])
+            if image_id in fail:
+                raise RuntimeError(f"render {image_id} failed")
+            return f"![{image_id}]({url})"
+        finally:
+            if active is not None:
+                active.remove(image_id)
+
+    return render
+
+
+def _sequential(names, fail=()):
+    """旧版逐张串行渲染的结果"""
+    return [f"![{n}]({_url(n)})" for n in names if n not in fail]
+
+
+def test_drain_keeps_submission_order():
+    async def run():
+        queue = ImageRenderQueue(_renderer(), limit=4)
+        for name in DELAYS:
+            queue.submit(_url(name))
+        return await queue.drain()
+
+    assert asyncio.run(run()) == _sequential(DELAYS)
+
+
+def test_ready_only_returns_completed_prefix():
+    async def run():
+        queue = ImageRenderQueue(_renderer(), limit=4)
+        for name in DELAYS:
+            queue.submit(_url(name))
+        await asyncio.sleep(0.05)
+        # b、d 已完成，但 a 未完成时不能越过 a 输出
+        early = queue.ready()
+        await asyncio.sleep(0.15)
+        later = queue.ready()
+        return early, later, queue.pending
+
+    early, later, pending = asyncio.run(run())
+    assert early == []
+    assert later == _sequential(DELAYS)
+    assert not pending
+
+
+def test_concurrency_limit_and_dedup():
+    active, peak = [], []
+
+    async def run():
+        queue = ImageRenderQueue(_renderer(active, peak), limit=2)
+        for name in list(DELAYS) + ["a", "b"]:
+            queue.submit(_url(name))
+        queue.submit("")
+        return await queue.drain()
+
+    assert asyncio.run(run()) == _sequential(DELAYS)
+    assert max(peak) == 2
+
+
+def test_failed_render_is_skipped():
+    async def run():
+        queue = ImageRenderQueue(_renderer(fail={"c"}), limit=4)
+        for name in DELAYS:
+            queue.submit(_url(name))
+        return await queue.drain()
+
+    assert asyncio.run(run()) == _sequential(DELAYS, fail={"c"})
+
+
+def test_cancel_stops_pending_renders():
+    active, peak = [], []
+
+    async def run():
+        queue = ImageRenderQueue(_renderer(active, peak), limit=4)
+        for name in DELAYS:
+            queue.submit(_url(name))
+        await asyncio.sleep(0.03)
+        queue.cancel()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return queue.pending
+
+    assert asyncio.run(run()) is False
+    assert active == []
@@ -0,0 +1,66 @@
+"""ChunkEncoder：模板拼接的字节与旧版整块 orjson 编码一致"""
+
+import orjson
+import pytest
+
+from app.services.grok.utils.sse import ChunkEncoder, sse_event
+
+CREATED = 1700000000
+MODEL = "grok-4"
+
+
+def _legacy(chunk_id, content="", role=None, finish=None, fingerprint=""):
+    """旧版 StreamProcessor._sse"""
+    delta = {}
+    if role:
+        delta["role"] = role
+        delta["content"] = ""
+    elif content:
+        delta["content"] = content
+    chunk = {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": CREATED,
+        "model": MODEL,
+        "system_fingerprint": fingerprint,
+        "choices": [
+            {"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish}
+        ],
+    }
+    return f"data: {orjson.dumps(chunk).decode()}\n\n".encode()
+
+
+@pytest.mark.parametrize(
+    "content", ["hi", "中文", 'quote " and \\ slash', "line\nbreak", "😀"]
+)
+def test_content_matches_legacy(content):
+    encoder = ChunkEncoder(MODEL, CREATED)
+    out = encoder.content(content, "resp-1", "fp")
+    assert out == _legacy("resp-1", content, fingerprint="fp")
+    assert encoder.chunk(content, response_id="resp-1", fingerprint="fp") == out
+
+
+def test_role_and_finish_match_legacy():
+    encoder = ChunkEncoder(MODEL, CREATED)
+    assert encoder.chunk(role="assistant", response_id="r") == _legacy(
+        "r", role="assistant"
+    )
+    assert encoder.chunk(finish="stop", response_id="r") == _legacy("r", finish="stop")
+    assert encoder.chunk(response_id="r") == _legacy("r")
+
+
+def test_envelope_follows_response_id():
+    encoder = ChunkEncoder(MODEL, CREATED)
+    before = orjson.loads(encoder.content("a")[6:])
+    assert before["id"].startswith("chatcmpl-")
+    assert orjson.loads(encoder.content("b")[6:])["id"] == before["id"]
+    assert orjson.loads(encoder.content("c", "resp-2")[6:])["id"] == "resp-2"
+
+
+def test_without_fingerprint():
+    encoder = ChunkEncoder(MODEL, CREATED, with_fingerprint=False)
+    assert "system_fingerprint" not in orjson.loads(encoder.content("a", "r")[6:])
+
+
+def test_sse_event():
+    assert sse_event("image", {"b": 1}) == b'event: image\ndata: {"b":1}\n\n'
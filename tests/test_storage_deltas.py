@@ -0,0 +1,132 @@
+"""Token 增量保存：合并结果与全量保存一致，读取失败时不覆盖文件"""
+
+import asyncio
+import copy
+
+import orjson
+import pytest
+
+from app.core import storage as storage_mod
+from app.core.storage import (
+    LocalStorage,
+    StorageError,
+    TokenChanges,
+    _merge_token_deltas,
+)
+from app.services.token import manager as manager_mod
+from app.services.token.manager import TokenManager
+from app.services.token.models import TokenInfo
+from app.services.token.pool import TokenPool
+
+BASE = {
+    "ssoBasic": [
+        {"token": "a", "quota": 80},
+        {"token": "b", "quota": 80},
+        {"token": "c", "quota": 80},
+    ],
+    "ssoSuper": [{"token": "s", "quota": 140}],
+}
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_mod, "TOKEN_FILE", tmp_path / "token.json")
+    monkeypatch.setattr(storage_mod, "LOCK_DIR", tmp_path / ".locks")
+    return LocalStorage()
+
+
+def _full_save_result(data, updated, deleted):
+    """旧版全量保存：在完整数据上修改后整体写回"""
+    data = copy.deepcopy(data)
+    for pool_name, tokens in deleted.items():
+        if pool_name in data:
+            data[pool_name] = [t for t in data[pool_name] if t["token"] not in tokens]
+    for pool_name, tokens in updated.items():
+        pool_list = data.setdefault(pool_name, [])
+        for t in tokens:
+            for i, old in enumerate(pool_list):
+                if old["token"] == t["token"]:
+                    pool_list[i] = t
+                    break
+            else:
+                pool_list.append(t)
+    return data
+
+
+def test_merge_matches_full_save():
+    updated = {
+        "ssoBasic": [{"token": "b", "quota": 12}, {"token": "d", "quota": 80}],
+        "ssoNew": [{"token": "n", "quota": 1}],
+    }
+    deleted = {"ssoBasic": ["a"], "ssoSuper": ["missing"], "ssoGone": ["x"]}
+    expected = _full_save_result(BASE, updated, deleted)
+    assert _merge_token_deltas(copy.deepcopy(BASE), updated, deleted) == expected
+
+
+def test_local_deltas_merge_into_file(local_storage):
+    async def run():
+        await local_storage.save_tokens(copy.deepcopy(BASE))
+        updated = {"ssoBasic": [{"token": "c", "quota": 0}]}
+        deleted = {"ssoSuper": ["s"]}
+        await local_storage.save_token_deltas(updated, deleted)
+        assert await local_storage.load_tokens() == _full_save_result(
+            BASE, updated, deleted
+        )
+
+    asyncio.run(run())
+
+
+def test_unreadable_file_is_not_overwritten(local_storage):
+    corrupted = b'{"ssoBasic": [{"token": "a"'
+    storage_mod.TOKEN_FILE.write_bytes(corrupted)
+
+    async def run():
+        assert await local_storage.load_tokens() == {}
+        with pytest.raises(StorageError):
+            await local_storage.save_token_deltas(
+                {"ssoBasic": [{"token": "b", "quota": 1}]}
+            )
+
+    asyncio.run(run())
+    assert storage_mod.TOKEN_FILE.read_bytes() == corrupted
+
+
+def test_manager_requeues_deltas_after_failed_save(local_storage, monkeypatch):
+    storage_mod.TOKEN_FILE.write_bytes(b"not json")
+    monkeypatch.setattr(manager_mod, "get_storage", lambda: local_storage)
+
+    mgr = TokenManager()
+    pool = TokenPool("ssoBasic")
+    pool.add(TokenInfo(token="a", quota=80))
+    mgr.pools[pool.name] = pool
+    mgr._mark_dirty("ssoBasic", "a")
+    mgr._mark_deleted("ssoBasic", "gone")
+
+    asyncio.run(mgr._save_deltas())
+
+    assert mgr._dirty_tokens == {"ssoBasic": {"a"}}
+    assert mgr._deleted_tokens == {"ssoBasic": {"gone"}}
+    assert storage_mod.TOKEN_FILE.read_bytes() == b"not json"
+
+    # 文件恢复后重试成功
+    storage_mod.TOKEN_FILE.write_bytes(orjson.dumps({"ssoBasic": []}))
+    asyncio.run(mgr._save_deltas())
+    assert mgr._dirty_tokens == {}
+    saved = orjson.loads(storage_mod.TOKEN_FILE.read_bytes())
+    assert [t["token"] for t in saved["ssoBasic"]] == ["a"]
+
+
+def test_remote_pool_move_leaves_old_pool():
+    mgr = TokenManager()
+    basic = TokenPool("ssoBasic")
+    info = TokenInfo(token="a", quota=80)
+    basic.add(info)
+    mgr.pools[basic.name] = basic
+    mgr._index["a"] = (basic, info)
+
+    changes = TokenChanges(updated={"ssoSuper": [{"token": "a", "quota": 140}]})
+    assert mgr._apply_changes(changes) == 1
+
+    assert basic.get("a") is None
+    pool, moved = mgr._index["a"]
+    assert pool is mgr.pools["ssoSuper"] and moved.quota == 140
@@ -0,0 +1,87 @@
+"""parse_token_line：快速路径的结果与完整 JSON 解析一致"""
+
+import json
+
+import orjson
+import pytest
+
+from app.services.grok.utils.stream_line import parse_token_line
+
+TOKENS = [
+    "hello",
+    "",
+    " leading space",
+    "中文 token",
+    'quote " inside',
+    "backslash \\ inside",
+    "ends with backslash \\",
+    'ends with quote "',
+    "\\\"",
+    "newline\nand\ttab",
+    "emoji 😀 and é",
+    "brace { and } in text",
+    '"responseId" in text',
+]
+
+
+def _line(token, **extra) -> bytes:
+    response = {"token": token}
+    response.update(extra)
+    return orjson.dumps({"result": {"response": response}})
+
+
+def _slow(line: bytes):
+    """旧版逐行完整解析"""
+    resp = orjson.loads(line).get("result", {}).get("response", {})
+    return resp.get("token"), bool(resp.get("isThinking"))
+
+
+@pytest.mark.parametrize("token", TOKENS)
+@pytest.mark.parametrize("thinking", [False, True])
+def test_matches_full_parse(token, thinking):
+    line = _line(token, isThinking=thinking, messageTag="final")
+    parsed = parse_token_line(line)
+    if parsed is None:
+        # 只允许因字符串中的 "{" 交给完整解析
+        assert "{" in token
+        return
+    assert parsed == _slow(line)
+
+
+@pytest.mark.parametrize("token", TOKENS)
+def test_ascii_escaped_json_matches(token):
+    # 上游也可能把非 ASCII 字符转义为 \uXXXX
+    line = json.dumps(
+        {"result": {"response": {"token": token, "isThinking": True}}},
+        separators=(",", ":"),
+    ).encode("ascii")
+    parsed = parse_token_line(line)
+    if parsed is None:
+        assert "{" in token
+        return
+    assert parsed == _slow(line)
+
+
+def test_unicode_escape_sequence():
+    line = b'{"result":{"response":{"token":"caf\\u00e9 \\"x\\"","isThinking":false}}}'
+    assert parse_token_line(line) == ("café \"x\"", False)
+
+
+def test_structured_lines_use_full_parse():
+    line = _line("", modelResponse={"message": "done"})
+    assert parse_token_line(line) is None
+    line = _line("t", llmInfo={"modelHash": "abc"})
+    assert parse_token_line(line) is None
+
+
+def test_response_id_only_when_needed():
+    line = _line("t", responseId="r-1")
+    assert parse_token_line(line) == ("t", False)
+    assert parse_token_line(line, need_response_id=True) is None
+
+
+def test_non_token_lines():
+    assert parse_token_line("not bytes") is None
+    assert parse_token_line(b'{"result":{"response":{"modelResponse":{}}}}') is None
+    assert parse_token_line(b'{"result":{"response":{"token":"unterminated') is None
+    assert parse_token_line(b'{"result":{"response":{"token":"bad \\q"}}}') is None
@@ -0,0 +1,99 @@
+"""TagFilter：任意切分的流式输入与整段输入、旧版正则实现结果一致"""
+
+import random
+import re
+
+import pytest
+
+from app.services.grok.utils.tag_filter import TagFilter
+
+TAGS = ["xaiartifact", "xai:tool_usage_card", "grok:render"]
+PLAIN_TAGS = ["xaiartifact", "grok:render"]
+
+SAMPLES = [
+    "plain text without tags",
+    "a <xaiartifact id=1>hidden</xaiartifact> b",
+    "a<grok:render type=\"x\"/>b",
+    "<xaiartifact>\nmulti\nline\n</xaiartifact>tail",
+    "x < y and <b>bold</b> stay",
+    "<grok:renderer>kept</grok:renderer>",
+    "one <grok:render a=1>r</grok:render> two <xaiartifact>s</xaiartifact> three",
+    "<xaiartifact title=\"a>b\">x</xaiartifact>",
+    "trailing <",
+    "unfinished <xai",
+]
+
+
+def _regex_filter(content: str, tags) -> str:
+    """旧版 CollectProcessor._filter_content（不含工具卡片替换）"""
+    result = content
+    for tag in tags:
+        pattern = rf"<{re.escape(tag)}[^>]*>.*?</{re.escape(tag)}>|<{re.escape(tag)}[^>]*/>"
+        result = re.sub(pattern, "", result, flags=re.DOTALL)
+    return result
+
+
+def _feed_all(parts, tags, replacements=None) -> str:
+    tag_filter = TagFilter(tags, replacements)
+    return "".join(tag_filter.feed(part) for part in parts) + tag_filter.finish()
+
+
+def _splits(text: str):
+    """两段切分的所有位置，加逐字符切分"""
+    for i in range(len(text) + 1):
+        yield [text[:i], text[i:]]
+    yield list(text)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_whole_text_matches_regex(text):
+    assert TagFilter(PLAIN_TAGS).filter(text) == _regex_filter(text, PLAIN_TAGS)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_split_feeds_match_whole_text(text):
+    expected = TagFilter(TAGS).filter(text)
+    for parts in _splits(text):
+        assert _feed_all(parts, TAGS) == expected, parts
+
+
+def test_random_splits_match_regex():
+    # 旧正则会把自闭合标签与同前缀的其他标签当作开标签一直吞到后面的闭标签，拼接时排除这两类样本
+    rng = random.Random(0)
+    text = "".join(s for s in SAMPLES[:8] if "/>" not in s and "renderer" not in s) * 3
+    expected = _regex_filter(text, PLAIN_TAGS)
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(text)), 12))
+        parts = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        assert _feed_all(parts, PLAIN_TAGS) == expected
+
+
+def test_self_closing_does_not_swallow_following_block():
+    text = "a<grok:render/>b<grok:render>c</grok:render>d"
+    assert TagFilter(TAGS).filter(text) == "abd"
+
+
+def test_orphan_closing_tag_removed():
+    assert TagFilter(TAGS).filter("a</xaiartifact>b") == "ab"
+
+
+def test_unclosed_block_dropped_at_finish():
+    tag_filter = TagFilter(TAGS)
+    assert tag_filter.feed("keep <xaiartifact>never closed") == "keep "
+    assert tag_filter.finish() == ""
+
+
+def test_replacement_on_own_line_across_splits():
+    card = "<xai:tool_usage_card><name>search</name></xai:tool_usage_card>"
+    text = f"before{card}after"
+    replacements = {"xai:tool_usage_card": lambda raw: f"[{len(raw)}]\n"}
+    expected = f"before\n[{len(card)}]\nafter"
+    assert TagFilter(TAGS, replacements).filter(text) == expected
+    for parts in _splits(text):
+        assert _feed_all(parts, TAGS, replacements) == expected, parts
+
+
+def test_create_without_tags_returns_none():
+    assert TagFilter.create(None) is None
+    assert TagFilter.create([]) is None
+    assert TagFilter.create(["", 1]) is None
@@ -0,0 +1,21 @@
+"""TokenHealth 评分：首字节耗时相同时，流式总耗时更长的 Token 评分更差"""
+
+from app.services.token.health import TokenHealth
+
+
+def _health(ttfb, latency):
+    health = TokenHealth()
+    health.observe(ttfb=ttfb)
+    health.observe(latency=latency)
+    return health
+
+
+def test_slow_stream_scores_worse():
+    fast = _health(0.5, 5.0)
+    stalled = _health(0.5, 60.0)
+    now = max(fast.updated_at, stalled.updated_at)
+    assert stalled.score(now) > fast.score(now)
+
+
+def test_empty_health_scores_zero():
+    assert TokenHealth().score() == 0.0
@@ -0,0 +1,95 @@
+"""TokenManager 租约：按租约句柄结算，过期回收后结算不影响其他请求"""
+
+import asyncio
+
+import pytest
+
+from app.services.token.manager import TokenManager
+from app.services.token.models import EFFORT_COST, EffortType, TokenInfo
+from app.services.token.pool import TokenPool
+
+TOKEN = "lease-test-token"
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    mgr = TokenManager()
+    pool = TokenPool("ssoBasic")
+    info = TokenInfo(token=TOKEN, quota=80)
+    pool.add(info)
+    mgr.pools[pool.name] = pool
+    mgr._index[TOKEN] = (pool, info)
+    mgr.initialized = True
+    # 不落盘
+    monkeypatch.setattr(mgr, "_schedule_save", lambda: None)
+    return mgr
+
+
+def _pool(mgr: TokenManager) -> TokenPool:
+    return mgr.pools["ssoBasic"]
+
+
+def test_rollback_releases_only_its_own_lease(manager):
+    async def run():
+        low = manager.reserve(TOKEN, EffortType.LOW)
+        high = manager.reserve(TOKEN, EffortType.HIGH)
+        assert _pool(manager).inflight(TOKEN) == 2
+        assert _pool(manager).reserved(TOKEN) == (
+            EFFORT_COST[EffortType.LOW] + EFFORT_COST[EffortType.HIGH]
+        )
+
+        # 后借出的请求先结束：只释放自己的预留
+        assert manager.rollback(high)
+        assert _pool(manager).inflight(TOKEN) == 1
+        assert _pool(manager).reserved(TOKEN) == EFFORT_COST[EffortType.LOW]
+
+        # 重复结算无效
+        assert not manager.rollback(high)
+        assert _pool(manager).inflight(TOKEN) == 1
+
+        assert manager.rollback(low)
+        assert _pool(manager).inflight(TOKEN) == 0
+        assert manager._leases == {}
+
+    asyncio.run(run())
+
+
+def test_commit_consumes_lease_effort(manager):
+    async def run():
+        lease = manager.reserve(TOKEN, EffortType.HIGH)
+        assert await manager.commit(lease)
+        info = manager._index[TOKEN][1]
+        assert info.quota == 80 - EFFORT_COST[EffortType.HIGH]
+        assert _pool(manager).inflight(TOKEN) == 0
+        assert _pool(manager).reserved(TOKEN) == 0
+
+    asyncio.run(run())
+
+
+def test_settling_swept_lease_keeps_other_reservations(manager):
+    async def run():
+        stale = manager.reserve(TOKEN, EffortType.LOW)
+        live = manager.reserve(TOKEN, EffortType.LOW)
+        stale.expires_at = 0
+
+        assert manager._sweep_expired() == 1
+        assert _pool(manager).inflight(TOKEN) == 1
+
+        # 已回收的租约结算：仍扣减配额，但不释放仍在进行的请求
+        assert await manager.commit(stale)
+        assert not manager.rollback(stale)
+        assert _pool(manager).inflight(TOKEN) == 1
+        assert list(manager._leases[TOKEN]) == [live]
+
+        assert manager.rollback(live)
+        assert _pool(manager).inflight(TOKEN) == 0
+
+    asyncio.run(run())
+
+
+def test_reserve_unknown_token_returns_none(manager):
+    async def run():
+        assert manager.reserve("missing-token") is None
+        assert manager._leases == {}
+
+    asyncio.run(run())
@@ -0,0 +1,48 @@
+"""refresh_cooling_tokens：只有成功取得配额的 Token 计入 refreshed"""
+
+import asyncio
+
+from app.core.exceptions import UpstreamException
+from app.services.token import manager as manager_mod
+from app.services.token.manager import TokenManager
+from app.services.token.models import TokenInfo, TokenStatus
+from app.services.token.pool import TokenPool
+
+RESULTS = {
+    "ok": {"remainingTokens": 40},
+    "throttled": UpstreamException("rate limited", details={"status": 429}),
+    "broken": UpstreamException("bad gateway", details={"status": 502}),
+}
+
+
+class FakeUsageService:
+    async def get(self, token: str):
+        result = RESULTS[token]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_failed_probes_are_not_counted_as_refreshed(monkeypatch):
+    monkeypatch.setattr(manager_mod, "UsageService", FakeUsageService)
+    mgr = TokenManager()
+    monkeypatch.setattr(mgr, "_schedule_save", lambda: None)
+
+    async def no_save():
+        return None
+
+    monkeypatch.setattr(mgr, "_save_deltas", no_save)
+    pool = TokenPool("ssoBasic")
+    for token in RESULTS:
+        info = TokenInfo(token=token, quota=0, status=TokenStatus.COOLING)
+        pool.add(info)
+        mgr._index[token] = (pool, info)
+    mgr.pools[pool.name] = pool
+
+    result = asyncio.run(mgr.refresh_cooling_tokens())
+
+    assert result["checked"] == 3
+    assert result["refreshed"] == 1
+    assert result["recovered"] == 1
+    assert pool.get("ok").quota == 40
+    assert pool.get("throttled").status == TokenStatus.COOLING